@@ -0,0 +1,96 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SOUNDS = {
+    "grab": "grab.wav",
+    "drop": "drop.wav",
+    "success": "success.wav",
+    "level_up": "level_up.wav",
+    "game_over": "game_over.wav",
+}
+
+IMAGES = {
+    "welcome": "interfazHome.jpg",
+}
+
+
+# Carga central de sonidos e imágenes. preload_*() decodifica los archivos en un
+# pool de hilos mientras el juego sigue; sound()/image() devuelven el recurso
+# por clave (esperando solo si aún se está cargando) o None si falta. Un archivo
+# que no se pudo cargar se avisa una vez y no se vuelve a intentar.
+class AssetManager:
+    def __init__(self, base_dir=ASSET_DIR, workers=4):
+        self.base_dir = base_dir
+        self.missing = set()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self._lock = threading.Lock()
+        self._futures = {}
+        # Superficies ya escaladas y convertidas al formato de la pantalla
+        self._surfaces = {}
+
+    def _load(self, path, loader):
+        try:
+            return loader(path)
+        except (pygame.error, OSError) as e:
+            with self._lock:
+                if path not in self.missing:
+                    self.missing.add(path)
+                    print(f"Aviso: no se pudo cargar {os.path.basename(path)} ({e})")
+            return None
+
+    def _request(self, kind, key, filename, loader):
+        with self._lock:
+            future = self._futures.get((kind, key))
+            if future is None:
+                path = os.path.join(self.base_dir, filename)
+                future = self._futures[(kind, key)] = self._pool.submit(self._load, path, loader)
+        return future
+
+    # Los sonidos necesitan el mixer iniciado (se hace al arrancar, en segundo plano)
+    def preload_sounds(self, sounds=SOUNDS):
+        if pygame.mixer.get_init():
+            for key, filename in sounds.items():
+                self._request("sound", key, filename, pygame.mixer.Sound)
+        return self
+
+    def preload_images(self, images=IMAGES):
+        for key, filename in images.items():
+            self._request("image", key, filename, pygame.image.load)
+        return self
+
+    def sound(self, key):
+        if key not in SOUNDS or not pygame.mixer.get_init():
+            return None
+        return self._request("sound", key, SOUNDS[key], pygame.mixer.Sound).result()
+
+    def play(self, key):
+        sound = self.sound(key)
+        if sound:
+            sound.play()
+
+    # Imagen escalada a size y convertida con convert()/convert_alpha() al formato
+    # de la ventana. Sin ventana de pygame (canvas.TextureCanvas no usa set_mode)
+    # no hay formato al que convertir y se entrega tal cual.
+    def image(self, key, size=None, alpha=False):
+        cache_key = (key, size, alpha)
+        surface = self._surfaces.get(cache_key)
+        if surface is not None:
+            return surface
+        if key not in IMAGES:
+            return None
+        decoded = self._request("image", key, IMAGES[key], pygame.image.load).result()
+        if decoded is None:
+            return None
+        if size is not None and decoded.get_size() != tuple(size):
+            decoded = pygame.transform.scale(decoded, size)
+        surface = decoded
+        if pygame.display.get_surface() is not None:
+            surface = decoded.convert_alpha() if alpha else decoded.convert()
+        self._surfaces[cache_key] = surface
+        return surface
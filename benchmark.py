@@ -0,0 +1,347 @@
+import os
+
+# Sin ventana ni audio reales: el benchmark debe correr igual en cualquier máquina
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+import pygame
+
+import menu
+from gestures import GestureEngine
+from kinematics import KinematicsStream
+from landmarks import HandFrame
+from canvas import SoftwareCanvas, TextureCanvas
+from particles import ParticleSystem
+from profiler import FrameProfiler
+from render import CameraSurface
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, TOWER_Y
+from sources import FrameSource, open_source
+from tracking import HandTracker, HandResults
+
+
+# Mano sintética: la muñeca gira despacio alrededor del centro y el índice
+# apunta en una dirección que rota, así la serpiente cambia de rumbo; la pinza
+# se abre y se cierra, así los bloques se agarran y se sueltan
+def synthetic_landmarks(frames, fps=30.0):
+    t = np.arange(frames, dtype=np.float32) / fps
+    wrist = np.stack([0.5 + 0.2 * np.cos(t * 0.7), 0.6 + 0.2 * np.sin(t * 0.7), np.zeros_like(t)], axis=1)
+    angle = t * 0.9
+    tip = wrist + np.stack([0.2 * np.cos(angle), 0.2 * np.sin(angle), np.zeros_like(t)], axis=1)
+    weights = np.linspace(0.0, 1.0, 21, dtype=np.float32)[None, :, None]
+    landmarks = wrist[:, None, :] + (tip - wrist)[:, None, :] * weights
+    # El punto 8 (punta del índice) es el extremo del dedo
+    landmarks[:, 8] = tip
+    # La mitad del tiempo el pulgar (punto 4) toca el índice: pinza cerrada
+    pinch = np.sin(t * 0.5) > 0
+    landmarks[pinch, 4] = tip[pinch] + 0.005
+    timestamps = t.astype(np.float64)
+    return timestamps, landmarks.astype(np.float32)
+
+
+# Reemplazo de MediaPipe: devuelve los landmarks sintéticos en orden, sin inferir
+class StubHands:
+    def __init__(self, landmarks):
+        self.landmarks = landmarks
+        self.index = 0
+
+    def process(self, rgb):
+        points = self.landmarks[self.index % len(self.landmarks)]
+        self.index += 1
+        return HandResults([HandFrame(points)])
+
+    def close(self):
+        pass
+
+
+# Cámara sintética de reproducción: frames de ruido fijos y un número exacto de
+# lecturas, de modo que el bucle de juego procesa exactamente `frames` frames
+class SyntheticCamera(FrameSource):
+    replay = True
+
+    def __init__(self, frames, size=(480, 640), seed=0):
+        super().__init__()
+        rng = np.random.default_rng(seed)
+        self.images = [rng.integers(0, 256, (*size, 3), dtype=np.uint8) for _ in range(4)]
+        self.frames = frames
+        self.index = 0
+
+    def read(self):
+        if self.index >= self.frames:
+            self.finished = True
+            return False, None
+        self.index += 1
+        return True, self.images[self.index % len(self.images)]
+
+
+# Mide fn() (que ejecuta `batch` operaciones) `samples` veces tras calentar
+def measure(fn, samples, batch=1, warmup=5):
+    for _ in range(warmup):
+        fn()
+    latencies = np.empty(samples)
+    start = time.perf_counter()
+    for i in range(samples):
+        t0 = time.perf_counter()
+        fn()
+        latencies[i] = (time.perf_counter() - t0) / batch
+    total = time.perf_counter() - start
+    return summarize(latencies, samples * batch / total)
+
+
+def summarize(latencies, ops_per_s):
+    p50, p95 = np.percentile(latencies, (50, 95)) * 1e6
+    return {"ops_per_s": float(ops_per_s), "p50_us": float(p50), "p95_us": float(p95)}
+
+
+def bench_snake_update(samples):
+    snake = menu.Snake()
+    directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+    rng = random.Random(0)
+
+    def run():
+        for _ in range(100):
+            if rng.random() < 0.1:
+                snake.change_direction(rng.choice(directions))
+            if not snake.update():
+                snake.reset()
+        menu.effects.clear()
+    return measure(run, samples, batch=100)
+
+
+def bench_food_spawn(samples):
+    snake = menu.Snake()
+    food = menu.Food()
+    rng = random.Random(0)
+
+    def run():
+        for _ in range(100):
+            if food.positions:
+                food.positions.remove(rng.choice(food.positions))
+            food.spawn_food(snake)
+    return measure(run, samples, batch=100)
+
+
+def bench_particles(samples):
+    effects = ParticleSystem(4096)
+    surface = pygame.Surface((menu.WIDTH, menu.HEIGHT))
+    rng = random.Random(0)
+
+    def run():
+        effects.emit(40, rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT),
+                     (255, 200, 50), speed=3)
+        effects.update()
+        effects.draw(surface)
+    # Llenar hasta el régimen estable antes de medir
+    for _ in range(60):
+        run()
+    return measure(run, samples)
+
+
+def bench_block_draw(samples):
+    menu.current_theme = "Clásico"
+    block = menu.Block()
+    block.grabbed = True
+    surface = pygame.Surface((menu.WIDTH, menu.HEIGHT))
+    step = [0]
+
+    def run():
+        step[0] += 1
+        block.rotation = (step[0] % 20) - 10
+        block.scale = 1.0 + (step[0] % 10) / 100
+        block.draw(surface)
+    return measure(run, samples)
+
+
+def bench_tower_zone(samples):
+    menu.current_theme = "Clásico"
+    block = menu.Block()
+    canvas = SoftwareCanvas(pygame.Surface((menu.WIDTH, menu.HEIGHT)))
+    return measure(lambda: menu.draw_tower_zone(canvas, block, TOWER_Y), samples)
+
+
+# Un frame de la Torre de Bloques en cada backend de canvas.py: fondo de cámara
+# nuevo, zona de la torre, bloque girando, partículas, textos y el velo de fin
+# de juego. sdl2-software usa el renderer por software de SDL (sin GPU ni
+# pantalla); se incluye la presentación.
+def bench_canvas(samples, backend):
+    if backend == "software":
+        canvas = SoftwareCanvas(pygame.Surface((menu.WIDTH, menu.HEIGHT)))
+    else:
+        canvas = TextureCanvas((menu.WIDTH, menu.HEIGHT), software=True)
+    menu.current_theme = "Clásico"
+    block = menu.Block()
+    effects = ParticleSystem(1024)
+    frame = np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    camera_rect = pygame.Rect((menu.WIDTH - SCREEN_WIDTH) // 2, (menu.HEIGHT - SCREEN_HEIGHT) // 2,
+                              SCREEN_WIDTH, SCREEN_HEIGHT)
+    text = menu.render_text("Puntuación: 10", 30, (255, 255, 255))
+    step = [0]
+
+    def run():
+        step[0] += 1
+        block.rotation = (step[0] % 20) - 10
+        block.scale = 1.0 + (step[0] % 10) / 100
+        effects.emit(10, 500, 300, (255, 200, 50), speed=3)
+        effects.update()
+        canvas.camera(frame, camera_rect.size)
+        canvas.draw_camera(camera_rect)
+        menu.draw_tower_zone(canvas, block, TOWER_Y)
+        block.render(canvas)
+        effects.draw(canvas)
+        canvas.blit(text, (20, 20))
+        canvas.fill((0, 0, 0, 180))
+        if canvas.accelerated:
+            canvas.flip()
+    for _ in range(30):
+        run()
+    return measure(run, samples)
+
+
+def bench_camera_surface(samples):
+    camera = CameraSurface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    frame = np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    return measure(lambda: camera.update(frame), samples)
+
+
+def bench_gestures(samples, landmarks):
+    engine = GestureEngine(2)
+    frames = [HandFrame(points) for points in landmarks[:samples + 10]]
+    step = [0]
+
+    def run():
+        step[0] += 1
+        engine.update([frames[step[0] % len(frames)], frames[(step[0] + 5) % len(frames)]])
+    return measure(run, samples)
+
+
+# Análisis de movimiento en vivo: una muestra por frame a 30 fps; cada 15
+# frames incluye el análisis de la ventana (FFT)
+def bench_kinematics(samples, landmarks):
+    stream = KinematicsStream()
+    frames = [HandFrame(points) for points in landmarks[:samples + 10]]
+    step = [0]
+
+    def run():
+        step[0] += 1
+        stream.update(step[0] / 30.0, frames[step[0] % len(frames)])
+    # Llenar la primera ventana antes de medir
+    for _ in range(90):
+        run()
+    return measure(run, samples)
+
+
+def bench_capture(samples, landmarks):
+    tracker = HandTracker(SyntheticCamera(samples + 10), StubHands(landmarks), draw=menu.draw_hand)
+    return measure(tracker.capture_once, samples)
+
+
+# Bucle de juego completo: fuente de reproducción sin tiempo real, un frame por
+# vuelta; la latencia es el tiempo de trabajo de cada frame según el perfilador
+def bench_loop(play, frames, landmarks, source_path=None):
+    if source_path:
+        source = open_source(source_path, realtime=False)
+    else:
+        source = SyntheticCamera(frames)
+    menu.hands = StubHands(landmarks)
+    menu.profiler = FrameProfiler(window=frames)
+    start = time.perf_counter()
+    play(source, interactive=False)
+    total = time.perf_counter() - start
+    stats = menu.profiler.stages["frame"]
+    latencies = stats.samples[:min(stats.count, len(stats.samples))] / 1000.0
+    menu.profiler = FrameProfiler(enabled=False)
+    return summarize(latencies, stats.count / total)
+
+
+def run_benchmarks(samples, frames, source_path=None, only=None):
+    menu.init_display()
+    _, landmarks = synthetic_landmarks(max(samples, frames) + 10)
+    benchmarks = {
+        "snake.update": lambda: bench_snake_update(samples),
+        "food.spawn_food": lambda: bench_food_spawn(samples),
+        "particles": lambda: bench_particles(samples),
+        "block.draw": lambda: bench_block_draw(samples),
+        "draw_tower_zone": lambda: bench_tower_zone(samples),
+        "camera_surface": lambda: bench_camera_surface(samples),
+        "canvas.software": lambda: bench_canvas(samples, "software"),
+        "canvas.sdl2-sw": lambda: bench_canvas(samples, "sdl2-software"),
+        "gestures": lambda: bench_gestures(samples, landmarks),
+        "kinematics": lambda: bench_kinematics(samples, landmarks),
+        "tracker.capture": lambda: bench_capture(samples, landmarks),
+        "loop.blocks": lambda: bench_loop(menu.play_blocks, frames, landmarks, source_path),
+        "loop.snake": lambda: bench_loop(menu.play_snake, frames, landmarks, source_path),
+    }
+    results = {}
+    for name, bench in benchmarks.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        random.seed(0)
+        np.random.seed(0)
+        results[name] = bench()
+    return results
+
+
+# Compara la latencia p50 con la línea base; devuelve los nombres que empeoraron
+# más de la tolerancia
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f'{"componente":<18}{"ops/s":>12}{"p50 µs":>10}{"p95 µs":>10}{"base p50":>10}{"cambio":>9}')
+    for name, result in results.items():
+        line = f'{name:<18}{result["ops_per_s"]:12.0f}{result["p50_us"]:10.1f}{result["p95_us"]:10.1f}'
+        reference = baseline.get(name)
+        if reference:
+            change = result["p50_us"] / reference["p50_us"] - 1
+            line += f'{reference["p50_us"]:10.1f}{change:+9.0%}'
+            if change > tolerance:
+                line += "  REGRESIÓN"
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de las rutas críticas de los juegos")
+    parser.add_argument("--samples", type=int, default=500, help="mediciones por componente")
+    parser.add_argument("--frames", type=int, default=600, help="frames de cada bucle de juego completo")
+    parser.add_argument("--source", help="sesión grabada (.lmk/.npz) para los bucles completos")
+    parser.add_argument("--only", nargs="*", help="medir solo los componentes con estos prefijos")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="archivo de línea base")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="guardar los resultados como nueva línea base")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="empeoramiento relativo de p50 aceptado antes de marcar regresión")
+    args = parser.parse_args(argv)
+    # Sin línea base no hay con qué comparar: un resultado "sin regresiones" no
+    # significaría nada, así que se avisa antes de medir
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        parser.error(f"no existe la línea base {args.baseline}; generarla primero con --save-baseline "
+                     "en la máquina de referencia (o indicar otra con --baseline)")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmarks(args.samples, args.frames, args.source, args.only)
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    missing = [name for name in results if baseline and name not in baseline]
+    if missing:
+        print(f"Aviso: sin línea base para {', '.join(missing)} (no se comparan)")
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Línea base guardada en {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+import weakref
+from functools import lru_cache
+
+import pygame
+
+from render import CameraSurface
+from sprites import transformed_sprite
+
+# Destinos de dibujo del tamaño de la ventana. SoftwareCanvas compone con
+# blits de pygame.Surface sobre la ventana, como siempre; TextureCanvas usa
+# pygame._sdl2.video: cada superficie se sube una sola vez como textura y el
+# Renderer (la GPU, o el renderer por software de SDL) hace el escalado, el giro
+# y la transparencia. Los dos ofrecen la parte de la interfaz de Surface que usa
+# el juego (blit, blits, fill, get_width...) más camera() y draw_camera() para
+# el fondo, outline() y circle(). En `surface` se sigue componiendo por software
+# lo que no pasa por el canvas (menús, Snake); flip() y update(rects) lo
+# presentan (render.DirtyRenderer los llama).
+
+# Modos de mezcla de SDL (SDL_BLENDMODE_BLEND y SDL_BLENDMODE_NONE)
+BLEND_MODE = 1
+NO_BLEND_MODE = 0
+
+
+# Rectángulo de `source` dibujado en dest (posición o rectángulo, como Surface.blit)
+def _placement(source, dest):
+    if len(dest) == 2:
+        return source.get_rect(topleft=dest)
+    return source.get_rect(topleft=pygame.Rect(dest).topleft)
+
+
+@lru_cache(maxsize=32)
+def _translucent(size, color):
+    overlay = pygame.Surface(size, pygame.SRCALPHA)
+    overlay.fill(color)
+    return overlay
+
+
+@lru_cache(maxsize=32)
+def _circle_sprite(radius, color, width):
+    sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, color, (radius, radius), radius, width)
+    return sprite
+
+
+class SoftwareCanvas:
+    accelerated = False
+
+    def __init__(self, surface):
+        self.surface = surface
+        self._camera = None
+
+    def get_size(self):
+        return self.surface.get_size()
+
+    def get_width(self):
+        return self.surface.get_width()
+
+    def get_height(self):
+        return self.surface.get_height()
+
+    # dest: posición o rectángulo del sprite sin transformar; angle (grados,
+    # antihorario) y scale se aplican alrededor de su centro
+    def blit(self, source, dest, angle=0.0, scale=1.0):
+        if angle or scale != 1.0:
+            center = _placement(source, dest).center
+            source = transformed_sprite(source, angle, scale)
+            dest = source.get_rect(center=center)
+        return self.surface.blit(source, dest)
+
+    def blits(self, sequence, doreturn=True):
+        return self.surface.blits(sequence, doreturn=doreturn)
+
+    # Un color con alfa se mezcla con lo que hay debajo
+    def fill(self, color, rect=None):
+        rect = pygame.Rect(rect) if rect else self.surface.get_rect()
+        if len(color) == 4 and color[3] < 255:
+            return self.surface.blit(_translucent(rect.size, tuple(color)), rect)
+        return self.surface.fill(color, rect)
+
+    def outline(self, color, rect, width=1):
+        rect = pygame.Rect(rect)
+        if len(color) == 4 and color[3] < 255:
+            frame = pygame.Surface(rect.size, pygame.SRCALPHA)
+            pygame.draw.rect(frame, color, frame.get_rect(), width)
+            return self.surface.blit(frame, rect)
+        return pygame.draw.rect(self.surface, color, rect, width)
+
+    def circle(self, color, center, radius, width=0):
+        return pygame.draw.circle(self.surface, color, center, radius, width)
+
+    # Frame RGB nuevo de la cámara, redimensionado a `size` (ver CameraSurface)
+    def camera(self, frame_rgb, size):
+        if self._camera is None or self._camera.size != size:
+            self._camera = CameraSurface(size)
+        self._camera.update(frame_rgb)
+
+    def draw_camera(self, rect):
+        if self._camera is None:
+            return self.surface.fill((0, 0, 0), rect)
+        return self.surface.blit(self._camera.surface, rect)
+
+    def flip(self):
+        pygame.display.flip()
+
+    def update(self, rects):
+        pygame.display.update(rects)
+
+
+# Con software=True usa el renderer por software de SDL (máquinas sin GPU y
+# pruebas sin pantalla con SDL_VIDEODRIVER=dummy). Las superficies que se
+# dibujan no deben modificarse después: su textura se sube la primera vez y se
+# reutiliza mientras la superficie exista.
+class TextureCanvas:
+    accelerated = True
+
+    def __init__(self, size, title="", software=False, vsync=False):
+        from pygame._sdl2 import video
+        self._video = video
+        self.size = size
+        self.window = video.Window(title, size=size)
+        self.renderer = video.Renderer(self.window, accelerated=0 if software else -1, vsync=vsync)
+        self.surface = pygame.Surface(size)
+        # Copia en la GPU de `surface`: solo se suben las zonas que cambian
+        self._screen = video.Texture(self.renderer, size, streaming=True)
+        self._textures = weakref.WeakKeyDictionary()
+        self._camera = None
+        self._direct = False
+        self.uploads = 0
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def texture(self, surface):
+        texture = self._textures.get(surface)
+        if texture is None:
+            texture = self._textures[surface] = self._video.Texture.from_surface(self.renderer, surface)
+            self.uploads += 1
+        return texture
+
+    # Primer dibujo directo del frame: se parte de un fondo negro
+    def _begin(self):
+        if not self._direct:
+            self._direct = True
+            self.renderer.draw_blend_mode = NO_BLEND_MODE
+            self.renderer.draw_color = (0, 0, 0, 255)
+            self.renderer.clear()
+
+    def blit(self, source, dest, angle=0.0, scale=1.0):
+        self._begin()
+        rect = _placement(source, dest)
+        if scale != 1.0:
+            center = rect.center
+            rect = pygame.Rect(0, 0, int(rect.width * scale), int(rect.height * scale))
+            rect.center = center
+        # SDL gira en sentido horario y pygame.transform.rotate en antihorario
+        self.texture(source).draw(dstrect=rect, angle=-angle)
+        return rect
+
+    def blits(self, sequence, doreturn=True):
+        self._begin()
+        texture = self.texture
+        rects = []
+        for source, dest in sequence:
+            rect = _placement(source, dest)
+            texture(source).draw(dstrect=rect)
+            rects.append(rect)
+        return rects if doreturn else None
+
+    def _draw_color(self, color):
+        alpha = color[3] if len(color) == 4 else 255
+        self.renderer.draw_blend_mode = BLEND_MODE if alpha < 255 else NO_BLEND_MODE
+        self.renderer.draw_color = (*color[:3], alpha)
+
+    def fill(self, color, rect=None):
+        self._begin()
+        rect = pygame.Rect(rect) if rect else pygame.Rect((0, 0), self.size)
+        self._draw_color(color)
+        self.renderer.fill_rect(rect)
+        return rect
+
+    def outline(self, color, rect, width=1):
+        self._begin()
+        rect = pygame.Rect(rect)
+        self._draw_color(color)
+        for i in range(min(width, rect.width // 2, rect.height // 2)):
+            self.renderer.draw_rect(rect.inflate(-2 * i, -2 * i))
+        return rect
+
+    def circle(self, color, center, radius, width=0):
+        sprite = _circle_sprite(radius, tuple(color), width)
+        return self.blit(sprite, (center[0] - radius, center[1] - radius))
+
+    # El frame se sube tal cual a una textura de streaming; el escalado al
+    # tamaño de pantalla lo hace el renderer en draw_camera()
+    def camera(self, frame_rgb, size):
+        height, width = frame_rgb.shape[:2]
+        if self._camera is None or self._camera.get_rect().size != (width, height):
+            self._camera = self._video.Texture(self.renderer, (width, height), streaming=True)
+        self._camera.update(pygame.image.frombuffer(frame_rgb, (width, height), "RGB"))
+
+    def draw_camera(self, rect):
+        if self._camera is None:
+            return self.fill((0, 0, 0), rect)
+        self._begin()
+        self._camera.draw(dstrect=rect)
+        return pygame.Rect(rect)
+
+    def _present(self):
+        # Tras present() el contenido del backbuffer no está definido: lo
+        # compuesto por software se vuelve a dibujar entero (en la GPU es barato)
+        if not self._direct:
+            self._screen.draw()
+        self.renderer.present()
+        self._direct = False
+
+    def flip(self):
+        if not self._direct:
+            self._screen.update(self.surface)
+        self._present()
+
+    def update(self, rects):
+        if not self._direct:
+            bounds = self.surface.get_rect()
+            for rect in rects:
+                rect = bounds.clip(rect)
+                if rect.width and rect.height:
+                    self._screen.update(self.surface.subsurface(rect), area=rect)
+        self._present()
+
+    # Copia de lo que se va a presentar (pruebas y capturas de pantalla)
+    def snapshot(self):
+        return self.renderer.to_surface()
+
+
+# Ventana con el backend pedido: "software" (blits de Surface), "sdl2" (Renderer
+# de SDL, por GPU si hay) o "sdl2-software" (Renderer por software de SDL). Si
+# el Renderer no se puede crear se vuelve al dibujo por software.
+def open_canvas(size, title, backend="software"):
+    if backend != "software":
+        try:
+            return TextureCanvas(size, title, software=backend == "sdl2-software")
+        # Los errores de pygame._sdl2 derivan de RuntimeError, no de pygame.error
+        except (ImportError, RuntimeError, pygame.error) as e:
+            print(f"Aviso: no se pudo crear el renderer de SDL ({e}); se usa el dibujo por software")
+    surface = pygame.display.set_mode(size, pygame.DOUBLEBUF)
+    pygame.display.set_caption(title)
+    return SoftwareCanvas(surface)
@@ -0,0 +1,142 @@
+import math
+
+import numpy as np
+
+from landmarks import HandFrame
+
+
+# Filtros de landmarks: trabajan sobre el arreglo (21, 3) completo de una mano
+# en cada paso. update() incorpora una medición con su instante de captura y
+# predict() extrapola con la velocidad estimada hasta el instante pedido (como
+# mucho max_lead segundos), para dibujar la mano donde está ahora y no donde
+# estaba en la última inferencia.
+class OneEuroFilter:
+    def __init__(self, min_cutoff=1.5, beta=8.0, d_cutoff=1.0, max_lead=0.1):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.max_lead = max_lead
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = None
+        self.t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, x, t):
+        x = np.asarray(x, dtype=np.float32)
+        if self.value is None:
+            self.value = x.copy()
+            self.velocity = np.zeros_like(x)
+            self.t = t
+            return self.value
+        dt = max(t - self.t, 1e-3)
+        self.t = t
+        raw_velocity = (x - self.value) / dt
+        self.velocity += self._alpha(self.d_cutoff, dt) * (raw_velocity - self.velocity)
+        # Frecuencia de corte adaptativa: suaviza mucho en reposo (menos
+        # temblor) y poco en movimientos rápidos (menos retraso)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.velocity)
+        alpha = 1.0 / (1.0 + (1.0 / (2 * math.pi * cutoff)) / dt)
+        self.value += alpha * (x - self.value)
+        return self.value
+
+    def predict(self, t):
+        if self.value is None:
+            return None
+        lead = min(max(t - self.t, 0.0), self.max_lead)
+        return self.value + self.velocity * lead
+
+
+# Kalman de velocidad constante, independiente por coordenada. Las covarianzas
+# 2x2 de las 63 coordenadas se guardan como tres arreglos (p00, p01, p11).
+class KalmanFilter:
+    def __init__(self, process_noise=50.0, measurement_noise=1e-5, max_lead=0.1):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.max_lead = max_lead
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = None
+        self.t = None
+
+    def update(self, x, t):
+        x = np.asarray(x, dtype=np.float32)
+        if self.value is None:
+            self.value = x.copy()
+            self.velocity = np.zeros_like(x)
+            self.p00 = np.full_like(x, self.r)
+            self.p01 = np.zeros_like(x)
+            self.p11 = np.full_like(x, 1.0)
+            self.t = t
+            return self.value
+        dt = max(t - self.t, 1e-3)
+        self.t = t
+        q = self.q
+        # Predicción
+        self.value += self.velocity * dt
+        p00 = self.p00 + dt * (2 * self.p01 + dt * self.p11) + q * dt ** 3 / 3
+        p01 = self.p01 + dt * self.p11 + q * dt ** 2 / 2
+        p11 = self.p11 + q * dt
+        # Corrección con la medición
+        innovation = x - self.value
+        s = p00 + self.r
+        k0 = p00 / s
+        k1 = p01 / s
+        self.value += k0 * innovation
+        self.velocity += k1 * innovation
+        self.p00 = (1 - k0) * p00
+        self.p01 = (1 - k0) * p01
+        self.p11 = p11 - k1 * p01
+        return self.value
+
+    def predict(self, t):
+        if self.value is None:
+            return None
+        lead = min(max(t - self.t, 0.0), self.max_lead)
+        return self.value + self.velocity * lead
+
+
+FILTERS = {
+    "euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+# Etapa entre el seguimiento y la lógica de juego: un filtro por mano (por
+# posición en la lista de detecciones, o por jugador si la lista viene de
+# players.HandAssigner con None en los jugadores sin mano). Si una mano
+# desaparece su filtro se reinicia para no extrapolar posiciones viejas.
+class LandmarkSmoother:
+    def __init__(self, kind="euro", **options):
+        self.factory = FILTERS[kind]
+        self.options = options
+        self.filters = []
+
+    def update(self, hands, t):
+        while len(self.filters) < len(hands):
+            self.filters.append(self.factory(**self.options))
+        for hand_filter in self.filters[len(hands):]:
+            hand_filter.reset()
+        for hand_filter, hand in zip(self.filters, hands):
+            if hand is None:
+                hand_filter.reset()
+            else:
+                hand_filter.update(hand.points, t)
+
+    # Una entrada por filtro (None si no tiene mano), sin los None del final
+    def predict(self, t):
+        predicted = []
+        for hand_filter in self.filters:
+            points = hand_filter.predict(t)
+            predicted.append(None if points is None else HandFrame(points))
+        while predicted and predicted[-1] is None:
+            predicted.pop()
+        return predicted
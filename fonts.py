@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+import pygame
+
+
+# Registro compartido de fuentes: SysFont busca la fuente en el sistema cada vez
+# que se llama, así que cada combinación se construye una sola vez
+@lru_cache(maxsize=None)
+def get_font(size, bold=False, name="Arial"):
+    return pygame.font.SysFont(name, size, bold=bold)
+
+
+# Caché LRU de textos renderizados. Un texto solo se vuelve a renderizar cuando
+# cambia (por ejemplo, el valor de la puntuación). Las superficies devueltas son
+# compartidas: se pueden blitear pero no modificar.
+@lru_cache(maxsize=512)
+def render_text(text, size, color, bold=False, name="Arial"):
+    return get_font(size, bold, name).render(text, True, color)
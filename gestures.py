@@ -0,0 +1,152 @@
+import numpy as np
+
+from landmarks import WRIST, THUMB_TIP, INDEX_FINGER_TIP, MIDDLE_FINGER_MCP
+
+# Cadena de articulaciones de cada dedo desde la muñeca: pulgar, índice, medio,
+# anular y meñique
+FINGER_CHAINS = np.array([
+    (0, 1, 2, 3, 4),
+    (0, 5, 6, 7, 8),
+    (0, 9, 10, 11, 12),
+    (0, 13, 14, 15, 16),
+    (0, 17, 18, 19, 20),
+])
+INDEX = 1
+
+# Todos los vectores que se miden, como pares (origen, destino): las 4 falanges
+# de cada dedo, muñeca -> base del medio (tamaño de la mano), índice -> pulgar
+# (pinza) y muñeca -> punta del índice (hacia dónde apunta). Se calculan juntos
+# con un solo producto de matrices (+1 en el destino, -1 en el origen).
+VECTOR_FROM = np.concatenate([FINGER_CHAINS[:, :-1].ravel(), [WRIST, INDEX_FINGER_TIP, WRIST]])
+VECTOR_TO = np.concatenate([FINGER_CHAINS[:, 1:].ravel(), [MIDDLE_FINGER_MCP, THUMB_TIP, INDEX_FINGER_TIP]])
+VECTOR_MATRIX = np.zeros((len(VECTOR_FROM), 21), dtype=np.float32)
+VECTOR_MATRIX[np.arange(len(VECTOR_FROM)), VECTOR_TO] += 1
+VECTOR_MATRIX[np.arange(len(VECTOR_FROM)), VECTOR_FROM] -= 1
+SEGMENTS = FINGER_CHAINS.size - len(FINGER_CHAINS)
+
+# Medidas de todas las manos en una sola pasada. points: (n, 21, 3). Las
+# distancias se expresan en "tamaños de mano" (muñeca a base del dedo medio) para
+# no depender de lo lejos que esté la persona de la cámara.
+#  - bend (n, 5): flexión total de cada dedo en radianes (suma de los ángulos
+#    entre falanges consecutivas; ~0 estirado, >2 cerrado)
+#  - pinch (n,): distancia entre las puntas del pulgar y del índice
+#  - pointing (n, 2): vector muñeca -> punta del índice en el plano de la imagen
+def measure(points, x_scale=1.0):
+    vectors = VECTOR_MATRIX @ points
+    if x_scale != 1.0:
+        vectors[..., 0] *= x_scale
+    lengths = np.sqrt(np.einsum("...i,...i", vectors, vectors))
+    scale = np.maximum(lengths[:, SEGMENTS], 1e-6)
+    segments = vectors[:, :SEGMENTS].reshape(len(points), len(FINGER_CHAINS), -1, 3)
+    segment_lengths = lengths[:, :SEGMENTS].reshape(segments.shape[:3])
+    cos = np.einsum("...i,...i", segments[:, :, :-1], segments[:, :, 1:])
+    cos /= np.maximum(segment_lengths[:, :, :-1] * segment_lengths[:, :, 1:], 1e-12)
+    bend = np.arccos(np.minimum(np.maximum(cos, -1.0), 1.0)).sum(axis=-1)
+    pinch = lengths[:, SEGMENTS + 1] / scale
+    pointing = vectors[:, SEGMENTS + 2, :2] / scale[:, None]
+    return bend, pinch, pointing
+
+
+# Gesto de una mano en un frame. name: "pinch", "point", "open" o "none";
+# pointer: posición normalizada del cursor (punta del índice, o el punto medio
+# de la pinza mientras está cerrada); direction: dirección (dx, dy) a la que
+# apunta el índice o None si no apunta claramente a ningún lado.
+class Gesture:
+    __slots__ = ("name", "pinching", "extended", "pointer", "direction")
+
+    def __init__(self, name, pinching, extended, pointer, direction):
+        self.name = name
+        self.pinching = pinching
+        self.extended = extended
+        self.pointer = pointer
+        self.direction = direction
+
+
+# Clasificador de gestos con histéresis, un estado por mano (por posición en la
+# lista, o por jugador si viene de players.HandAssigner). Cada umbral tiene un
+# valor para entrar y otro para salir, así el temblor alrededor del límite no
+# hace parpadear el gesto: la pinza se cierra por debajo de pinch_on y solo se
+# abre por encima de pinch_off; un dedo cuenta como estirado por debajo de
+# extend_on y como doblado por encima de extend_off. La dirección solo cambia
+# a otro eje si lo supera por direction_margin.
+class GestureEngine:
+    def __init__(self, slots=1, pinch_on=0.35, pinch_off=0.55, extend_on=1.0, extend_off=1.6,
+                 direction_threshold=0.7, direction_margin=0.2):
+        self.pinch_on = pinch_on
+        self.pinch_off = pinch_off
+        self.extend_on = extend_on
+        self.extend_off = extend_off
+        self.direction_threshold = direction_threshold
+        self.direction_margin = direction_margin
+        self.slots = 0
+        self.pinching = np.zeros(0, dtype=bool)
+        self.extended = np.zeros((0, 5), dtype=bool)
+        self.directions = []
+        self._grow(slots)
+        self.gestures = [None] * slots
+
+    def _grow(self, slots):
+        if slots > self.slots:
+            extra = slots - self.slots
+            self.pinching = np.concatenate([self.pinching, np.zeros(extra, dtype=bool)])
+            self.extended = np.concatenate([self.extended, np.zeros((extra, 5), dtype=bool)])
+            self.directions += [None] * extra
+            self.slots = slots
+
+    def reset(self):
+        self.pinching[:] = False
+        self.extended[:] = False
+        self.directions = [None] * self.slots
+        self.gestures = [None] * self.slots
+
+    def _direction(self, vector, previous):
+        axis = int(abs(vector[1]) > abs(vector[0]))
+        value = vector[axis]
+        if abs(value) <= self.direction_threshold:
+            return None
+        candidate = (1 if value > 0 else -1, 0) if axis == 0 else (0, 1 if value > 0 else -1)
+        if previous is not None and candidate != previous:
+            held = vector[0] * previous[0] + vector[1] * previous[1]
+            if abs(value) - held < self.direction_margin:
+                return previous
+        return candidate
+
+    # hands: lista de HandFrame o None. Devuelve un Gesture (o None) por entrada.
+    def update(self, hands, x_scale=1.0):
+        self._grow(len(hands))
+        present = [i for i, hand in enumerate(hands) if hand is not None]
+        # Las manos que desaparecen empiezan de cero al volver
+        for i in range(self.slots):
+            if i >= len(hands) or hands[i] is None:
+                self.pinching[i] = False
+                self.extended[i] = False
+                self.directions[i] = None
+        gestures = [None] * len(hands)
+        if present:
+            points = np.stack([hands[i].points for i in present])
+            bend, pinch, pointing = measure(points, x_scale)
+            rows = np.array(present)
+            extended = (bend < self.extend_on) | (self.extended[rows] & (bend <= self.extend_off))
+            pinching = (pinch < self.pinch_on) | (self.pinching[rows] & (pinch <= self.pinch_off))
+            self.extended[rows] = extended
+            self.pinching[rows] = pinching
+            # Cursor: punta del índice, o punto medio de la pinza si está cerrada
+            tips = points[:, INDEX_FINGER_TIP, :2]
+            pointers = np.where(pinching[:, None], (tips + points[:, THUMB_TIP, :2]) / 2, tips).tolist()
+            pointing = pointing.tolist()
+            for k, (i, pinched, fingers) in enumerate(zip(present, pinching.tolist(), extended.tolist())):
+                if pinched:
+                    name = "pinch"
+                # Índice estirado y el resto de los dedos (sin el pulgar) doblados
+                elif fingers[INDEX] and not any(fingers[INDEX + 1:]):
+                    name = "point"
+                elif all(fingers[INDEX:]):
+                    name = "open"
+                else:
+                    name = "none"
+                direction = self._direction(pointing[k], self.directions[i])
+                if direction is not None:
+                    self.directions[i] = direction
+                gestures[i] = Gesture(name, pinched, fingers, tuple(pointers[k]), direction)
+        self.gestures = gestures
+        return gestures
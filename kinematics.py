@@ -0,0 +1,235 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from landmarks import INDEX_FINGER_TIP
+from recording import SessionReader
+
+# Métricas de movimiento a partir de la trayectoria de un landmark (por defecto
+# la punta del índice). Las posiciones se expresan en "altos de imagen" (x se
+# multiplica por el aspecto de la cámara) y el tiempo en segundos.
+#  - path_length: recorrido total; mean_velocity: recorrido / tiempo con mano
+#  - peak_velocity: velocidad máxima (derivada sobre la rejilla uniforme)
+#  - smoothness: log dimensionless jerk (LDLJ) de la velocidad por ventana;
+#    más cerca de 0 es más suave
+#  - tremor_hz / tremor_ratio: pico del espectro medio (Welch) en la banda de
+#    temblor (0 si no hay un pico claro) y fracción de la potencia en esa banda
+# La trayectoria se remuestrea a una rejilla uniforme de `rate` Hz y se analiza
+# en ventanas de `window` s cada `hop` s. El mismo window_metrics() procesa una
+# ventana en vivo (KinematicsStream) o miles a la vez en batch (analyze()).
+RATE = 30.0
+TREMOR_BAND = (3.0, 12.0)
+
+
+# Remuestreo lineal de (t, xy) a la rejilla uniforme `grid`; un punto de la
+# rejilla es válido si las muestras que lo rodean distan como mucho max_gap
+def resample(t, points, grid, max_gap):
+    values = np.empty((len(grid), 2))
+    values[:, 0] = np.interp(grid, t, points[:, 0])
+    values[:, 1] = np.interp(grid, t, points[:, 1])
+    after = np.clip(np.searchsorted(t, grid, side="right"), 1, len(t) - 1)
+    valid = (t[after] - t[after - 1] <= max_gap) & (grid >= t[0]) & (grid <= t[-1])
+    return values, valid
+
+
+# Medidas de W ventanas uniformes a la vez. windows: (W, N, 2) posiciones.
+# Devuelve peak_velocity (W,), smoothness (W,) y el espectro de potencia (W, F)
+def window_metrics(windows, rate):
+    dt = 1.0 / rate
+    n = windows.shape[1]
+    velocity = np.gradient(windows, dt, axis=1)
+    speed = np.sqrt((velocity ** 2).sum(axis=-1))
+    peak = speed.max(axis=1)
+    jerk = np.gradient(np.gradient(velocity, dt, axis=1), dt, axis=1)
+    duration = (n - 1) * dt
+    jerk_integral = (jerk ** 2).sum(axis=(1, 2)) * dt
+    with np.errstate(divide="ignore"):
+        smoothness = -np.log(np.maximum(duration ** 3 / np.maximum(peak, 1e-9) ** 2 * jerk_integral, 1e-12))
+    # Espectro sin la tendencia lineal de cada ventana (el desplazamiento
+    # voluntario) y con ventana de Hann
+    ramp = np.linspace(-1.0, 1.0, n)
+    centered = windows - windows.mean(axis=1, keepdims=True)
+    slope = np.einsum("wnc,n->wc", centered, ramp) / (ramp @ ramp)
+    detrended = centered - slope[:, None, :] * ramp[None, :, None]
+    spectrum = np.abs(np.fft.rfft(detrended * np.hanning(n)[None, :, None], axis=1)) ** 2
+    return peak, smoothness, spectrum.sum(axis=-1)
+
+
+# Frecuencia del pico en la banda y fracción de potencia en la banda. Sin un
+# pico claro (máximo local que sobresale `prominence` veces sobre la mediana de
+# la banda) la frecuencia es 0: ruido, o la cola del movimiento voluntario, que
+# cae de forma monótona desde el borde inferior.
+def tremor(spectrum, rate, n, band=TREMOR_BAND, prominence=4.0):
+    freqs = np.fft.rfftfreq(n, 1.0 / rate)
+    band_bins = np.flatnonzero((freqs >= band[0]) & (freqs <= band[1]))
+    total = spectrum[1:].sum()
+    if not len(band_bins) or total <= 0:
+        return 0.0, 0.0
+    power = spectrum[band_bins]
+    ratio = float(power.sum() / total)
+    peak = band_bins[np.argmax(power)]
+    is_local_max = spectrum[peak] > spectrum[peak - 1] and (peak + 1 == len(spectrum) or
+                                                           spectrum[peak] >= spectrum[peak + 1])
+    if not is_local_max or spectrum[peak] < prominence * np.median(power):
+        return 0.0, ratio
+    return float(freqs[peak]), ratio
+
+
+def _summary(path_length, active_time, peaks, smoothness, spectrum_sum, windows, rate, n, band):
+    tremor_hz, tremor_ratio = tremor(spectrum_sum, rate, n, band) if windows else (0.0, 0.0)
+    return {
+        "path_length": float(path_length),
+        "active_time": float(active_time),
+        "mean_velocity": float(path_length / active_time) if active_time else 0.0,
+        "peak_velocity": float(peaks),
+        "smoothness": float(smoothness / windows) if windows else 0.0,
+        "tremor_hz": tremor_hz,
+        "tremor_ratio": tremor_ratio,
+        "windows": int(windows),
+    }
+
+
+# Análisis en vivo de una mano: update() por cada frame nuevo. Las muestras se
+# guardan en un buffer circular de tamaño fijo y cada `hop` s se analiza la
+# última ventana, así el costo por frame está acotado sin importar cuánto dure
+# la sesión. Una mano que falta (None) corta el recorrido.
+class KinematicsStream:
+    def __init__(self, landmark=INDEX_FINGER_TIP, window=2.0, hop=0.5, rate=RATE, band=TREMOR_BAND,
+                 aspect=4 / 3, max_gap=0.2, max_input_rate=120.0):
+        self.landmark = landmark
+        self.window = window
+        self.hop = hop
+        self.rate = rate
+        self.band = band
+        self.scale = np.array([aspect, 1.0])
+        self.max_gap = max_gap
+        self.samples = int(round(window * rate))
+        self.capacity = int(window * max_input_rate) + 2
+        self.times = np.zeros(self.capacity)
+        self.points = np.zeros((self.capacity, 2))
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.index = 0
+        self.last_t = None
+        self.last_point = None
+        self.next_analysis = None
+        self.path_length = 0.0
+        self.active_time = 0.0
+        self.peak_velocity = 0.0
+        self.smoothness_sum = 0.0
+        self.spectrum_sum = np.zeros(self.samples // 2 + 1)
+        self.windows = 0
+
+    def update(self, t, hand):
+        if hand is None:
+            self.last_point = None
+            return
+        point = hand.points[self.landmark, :2] * self.scale
+        if self.last_point is not None and 0 < t - self.last_t <= self.max_gap:
+            self.path_length += float(np.hypot(*(point - self.last_point)))
+            self.active_time += t - self.last_t
+        self.last_t = t
+        self.last_point = point
+        self.times[self.index] = t
+        self.points[self.index] = point
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        if self.next_analysis is None:
+            self.next_analysis = t + self.window
+        elif t >= self.next_analysis:
+            self.next_analysis = t + self.hop
+            self._analyze(t)
+
+    def _analyze(self, now):
+        # Muestras del buffer en orden cronológico
+        order = (np.arange(self.index - self.count, self.index)) % self.capacity
+        t = self.times[order]
+        grid = now - (self.samples - 1 - np.arange(self.samples)) / self.rate
+        if t[0] > grid[0]:
+            return
+        values, valid = resample(t, self.points[order], grid, self.max_gap)
+        if not valid.all():
+            return
+        peak, smoothness, spectrum = window_metrics(values[None], self.rate)
+        self.peak_velocity = max(self.peak_velocity, float(peak[0]))
+        self.smoothness_sum += float(smoothness[0])
+        self.spectrum_sum += spectrum[0]
+        self.windows += 1
+
+    def summary(self):
+        return _summary(self.path_length, self.active_time, self.peak_velocity, self.smoothness_sum,
+                        self.spectrum_sum, self.windows, self.rate, self.samples, self.band)
+
+
+# Análisis de una sesión grabada completa de una vez. timestamps (n,),
+# landmarks (n, 21, 3) con NaN en los frames sin mano (SessionReader). Todas las
+# ventanas se procesan juntas, en bloques de `chunk` para acotar la memoria.
+def analyze(timestamps, landmarks, landmark=INDEX_FINGER_TIP, window=2.0, hop=0.5, rate=RATE,
+            band=TREMOR_BAND, aspect=4 / 3, max_gap=0.2, chunk=4096):
+    t = np.asarray(timestamps, dtype=np.float64)
+    points = np.asarray(landmarks[:, landmark, :2], dtype=np.float64) * (aspect, 1.0)
+    detected = ~np.isnan(points).any(axis=1)
+    t, points = t[detected], points[detected]
+    samples = int(round(window * rate))
+    if len(t) < 2:
+        return _summary(0.0, 0.0, 0.0, 0.0, np.zeros(samples // 2 + 1), 0, rate, samples, band)
+    dt = np.diff(t)
+    steps = (dt > 0) & (dt <= max_gap)
+    path_length = np.hypot(*np.diff(points, axis=0).T)[steps].sum()
+    active_time = dt[steps].sum()
+    grid = np.arange(t[0], t[-1], 1.0 / rate)
+    values, valid = resample(t, points, grid, max_gap)
+    peak_velocity, smoothness_sum, windows = 0.0, 0.0, 0
+    spectrum_sum = np.zeros(samples // 2 + 1)
+    if len(grid) >= samples:
+        stride = max(1, int(round(hop * rate)))
+        starts = np.arange(0, len(grid) - samples + 1, stride)
+        # Ventanas completas sin huecos, como vistas sobre la rejilla
+        invalid = np.concatenate([[0], np.cumsum(~valid)])
+        starts = starts[invalid[starts + samples] == invalid[starts]]
+        view = np.lib.stride_tricks.sliding_window_view(values, samples, axis=0)
+        for i in range(0, len(starts), chunk):
+            block = view[starts[i:i + chunk]].transpose(0, 2, 1)
+            peak, smoothness, spectrum = window_metrics(block, rate)
+            peak_velocity = max(peak_velocity, float(peak.max()))
+            smoothness_sum += float(smoothness.sum())
+            spectrum_sum += spectrum.sum(axis=0)
+        windows = len(starts)
+    return _summary(path_length, active_time, peak_velocity, smoothness_sum, spectrum_sum, windows,
+                    rate, samples, band)
+
+
+def load_session(path):
+    if path.endswith(".npz"):
+        data = np.load(path)
+        return np.asarray(data["timestamps"], dtype=np.float64), np.asarray(data["landmarks"], dtype=np.float32)
+    reader = SessionReader(path)
+    return reader.timestamps, reader.landmarks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Métricas de movimiento de una sesión grabada (.lmk/.npz)")
+    parser.add_argument("session", help="archivo de SessionRecorder (.lmk) o .npz")
+    parser.add_argument("--window", type=float, default=2.0, help="segundos por ventana de análisis")
+    parser.add_argument("--hop", type=float, default=0.5, help="segundos entre ventanas")
+    parser.add_argument("--rate", type=float, default=RATE, help="frecuencia de remuestreo en Hz")
+    args = parser.parse_args(argv)
+    timestamps, landmarks = load_session(args.session)
+    start = time.perf_counter()
+    summary = analyze(timestamps, landmarks, window=args.window, hop=args.hop, rate=args.rate)
+    elapsed = time.perf_counter() - start
+    duration = float(timestamps[-1] - timestamps[0]) if len(timestamps) > 1 else 0.0
+    summary["session_seconds"] = duration
+    summary["analysis_seconds"] = elapsed
+    summary["realtime_factor"] = duration / elapsed if elapsed else 0.0
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
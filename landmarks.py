@@ -0,0 +1,48 @@
+import numpy as np
+
+
+# Landmarks de una mano como un arreglo (21, 3) float32 de coordenadas
+# normalizadas (x, y, z). Cada detección de MediaPipe se convierte una sola vez
+# con hand_frame(); el resto del código (juegos, filtros, gestos, grabación)
+# trabaja con el arreglo en lugar de leer atributos del protobuf uno por uno.
+NUM_LANDMARKS = 21
+DIMS = 3
+
+WRIST = 0
+THUMB_TIP = 4
+INDEX_FINGER_MCP = 5
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_MCP = 9
+
+# Conexiones entre landmarks para dibujar el esqueleto (las de MediaPipe)
+HAND_CONNECTIONS = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+])
+
+
+class HandFrame:
+    __slots__ = ("points",)
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=np.float32).reshape(NUM_LANDMARKS, DIMS)
+
+    # Posición normalizada (x, y) de un landmark
+    def xy(self, index):
+        x, y = self.points[index, :2]
+        return float(x), float(y)
+
+
+# Convierte una mano de MediaPipe (o cualquier objeto con .landmark[i].x/y/z);
+# una HandFrame se devuelve tal cual
+def hand_frame(hand):
+    if hand is None or isinstance(hand, HandFrame):
+        return hand
+    return HandFrame([(p.x, p.y, p.z) for p in hand.landmark])
+
+
+def hand_frames(hands):
+    return [hand_frame(hand) for hand in hands or []]
@@ -1,27 +1,56 @@
 import cv2
-import mediapipe as mp
 import pygame
 import random
 import sys
-import math
 import numpy as np
 from pygame import mixer
-from pygame import gfxdraw
-from collections import deque
 import time
+import argparse
+from functools import lru_cache, partial
+from tracking import HandTracker, AdaptiveHands, BackgroundLoader
+from sources import open_source
+from landmarks import HAND_CONNECTIONS, INDEX_FINGER_TIP
+from gestures import GestureEngine
+from recording import SessionRecorder
+from metrics import MetricsStore
+from kinematics import KinematicsStream
+from filters import LandmarkSmoother
+from fonts import render_text
+from widgets import Menu, Button, Label
+from assets import AssetManager
+from players import HandAssigner, PLAYER_COLORS
+from particles import ParticleSystem
+from profiler import FrameProfiler
+from pacing import FramePacer
+from sprites import get_block_sprite, get_segment_sprite, CachedLayer
+from render import DirtyRenderer, wait_events, REDRAW_EVENTS
+from canvas import open_canvas
+from simulation import (WIDTH, HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT, TOWER_X, TOWER_Y, CELL,
+                        BlockState, BlocksGame, SnakeState, FoodState, SnakeGame, FixedTimestep, player_starts)
 
-# Inicialización de MediaPipe Hands
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5)
-mp_drawing = mp.solutions.drawing_utils
+# MediaPipe Hands se importa y se construye en segundo plano (ver start_warm_up):
+# importarlo tarda segundos y la ventana debe aparecer antes
+hands = None
+warm_up = None
+# Opciones de AdaptiveHands; None para inferir en cada frame completo
+adaptive_tracking = None
+# Filtro de landmarks entre el seguimiento y la lógica ("euro", "kalman" o None)
+landmark_filter = "euro"
+# Jugadores simultáneos: cada mano detectada se asigna a uno (players.HandAssigner)
+players = 1
+# Cómo se agarra un bloque: "pinch" (cerrar pulgar e índice sobre él) o "hover"
+# (basta con pasar el dedo por encima)
+grab_mode = "pinch"
 
-# Configuración de PyGame
-pygame.init()
-mixer.init()
-WIDTH, HEIGHT = 1280, 720
-SCREEN_WIDTH, SCREEN_HEIGHT = 1024, 768  # Para Torre de Bloques
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.DOUBLEBUF)
-pygame.display.set_caption("Juegos Combinados")
+# Configuración de PyGame: la ventana se abre en init_display(), no al importar.
+# El juego de bloques dibuja en `canvas` (canvas.py, por software o con el
+# renderer de SDL según --backend); menús y Snake componen en `screen`.
+screen = None
+canvas = None
+# Sonidos e imágenes, decodificados una sola vez
+assets = AssetManager()
+# Presentación por rectángulos sucios (se puede desactivar con --render full)
+renderer = DirtyRenderer()
 
 # Sistema de temas unificado
 THEMES = {
@@ -54,660 +83,919 @@ THEMES = {
 }
 
 # Variables globales para Torre de Bloques
-TOWER_X = SCREEN_WIDTH // 2 - 40
-TOWER_Y = SCREEN_HEIGHT // 2
 zone_glow_alpha = 0
 zone_pulse_direction = 1
 target_block_ghost = None
 current_theme = "Neon"
 difficulty = "Normal"
 
-# Clase de partícula compartida
-class Particle:
-    def __init__(self, x, y, color, velocity=(0, 0), lifetime=30, size=None):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.velocity = list(velocity)
-        self.lifetime = lifetime
-        self.age = 0
-        self.size = size if size else random.randint(3, 8)
-        
-    def update(self):
-        self.x += self.velocity[0]
-        self.y += self.velocity[1]
-        self.velocity[1] += 0.1  # Gravedad
-        self.age += 1
-        self.size = max(0, self.size * 0.95)
-        
-    def draw(self, surface):
-        alpha = min(255, int(255 * (1 - self.age/self.lifetime)))
-        color = (*self.color[:3], alpha)
-        gfxdraw.filled_circle(surface, int(self.x), int(self.y), int(self.size), color)
+# Sistema de partículas compartido por ambos juegos
+effects = ParticleSystem(4096)
+# Tiempos por etapa del bucle de juego (F3 muestra el overlay)
+profiler = FrameProfiler(enabled=False)
+# Métricas de las partidas del paciente (--db); desactivado hasta main()
+metrics = MetricsStore(None)
+# Ritmo de lógica, dibujo e inferencia (--fps, --inference-rate, --low-power)
+pacer = FramePacer()
 
-# Clase para el juego de bloques
-class Block:
+# Clase para el juego de bloques: la lógica está en simulation.BlockState
+class Block(BlockState):
     def __init__(self, width=80, height=30, color=None):
-        self.width = width
-        self.height = height
-        self.spawn_position(width, height)
-        self.color = color if color else random.choice(THEMES[current_theme]["colors"])
-        self.grabbed = False
-        self.attempts = 0
-        self.rotation = 0
-        self.target_rotation = 0
-        self.scale = 1.0
-        self.target_scale = 1.0
-        self.particles = []
-        
-    def spawn_position(self, width, height):
-        while True:
-            x = random.randint(50, SCREEN_WIDTH - 50 - width)
-            y = random.randint(50, SCREEN_HEIGHT // 2 - 50)
-            distance_to_tower = math.sqrt((x - TOWER_X)**2 + (y - TOWER_Y)**2)
-            if distance_to_tower > 200:
-                break
-        self.x = x
-        self.y = y
-    
+        super().__init__(width, height, color)
+        if color is None:
+            self.color = random.choice(THEMES[current_theme]["colors"])
+
     def add_particles(self, count=10):
-        for _ in range(count):
-            self.particles.append(Particle(
-                self.x + random.randint(0, self.width),
-                self.y + random.randint(0, self.height),
-                self.color,
-                (random.uniform(-1, 1), random.uniform(-1, 1)),
-                random.randint(20, 40)
-            ))
-    
-    def update(self):
-        self.rotation += (self.target_rotation - self.rotation) * 0.1
-        self.scale += (self.target_scale - self.scale) * 0.1
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.age >= particle.lifetime:
-                self.particles.remove(particle)
-    
-    def draw(self, surface):
-        for particle in self.particles:
-            particle.draw(surface)
-        block_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        pygame.draw.rect(block_surface, self.color, (0, 0, self.width, self.height))
-        pygame.draw.rect(block_surface, (0, 0, 0), (0, 0, self.width, self.height), 2)
-        scaled_width = int(self.width * self.scale)
-        scaled_height = int(self.height * self.scale)
-        scaled_surface = pygame.transform.scale(block_surface, (scaled_width, scaled_height))
-        rotated_surface = pygame.transform.rotate(scaled_surface, self.rotation)
-        rotated_rect = rotated_surface.get_rect(center=(self.x + self.width//2, self.y + self.height//2))
-        surface.blit(rotated_surface, rotated_rect)
-        font = pygame.font.SysFont('Arial', 20)
-        attempts_text = font.render(str(self.attempts), True, (0, 0, 0))
-        text_rect = attempts_text.get_rect(center=(self.x + self.width//2, self.y + self.height//2))
+        effects.emit(count, self.x, self.y, self.color, speed=1, spread=(self.width, self.height))
+
+    def get_sprite(self):
+        sprite = get_block_sprite(self.width, self.height, self.color, self.rotation, self.scale)
+        return sprite, sprite.get_rect(center=(self.x + self.width//2, self.y + self.height//2))
+
+    def bounds(self):
+        return self.get_sprite()[1].union((self.x, self.y, self.width, self.height))
+
+    # offset: esquina de la superficie destino cuando se dibuja en una capa
+    def draw(self, surface, offset=(0, 0)):
+        sprite, rect = self.get_sprite()
+        surface.blit(sprite, rect.move(-offset[0], -offset[1]))
+        attempts_text = render_text(str(self.attempts), 20, (0, 0, 0))
+        text_rect = attempts_text.get_rect(center=(self.x + self.width//2 - offset[0], self.y + self.height//2 - offset[1]))
         surface.blit(attempts_text, text_rect)
-    
-    def is_over(self, pos):
-        return (self.x <= pos[0] <= self.x + self.width and 
-                self.y <= pos[1] <= self.y + self.height)
-
-# Clase para la serpiente
-class Snake:
-    def __init__(self):
-        self.reset()
-        
-    def reset(self):
-        self.positions = deque([(WIDTH//2, HEIGHT//2)])
-        self.direction = (1, 0)
-        self.length = 3
-        self.score = 0
-        self.speed = 10
-        self.level = 1
-        self.growth_pending = 0
-        self.trail_particles = []
-        
-    def get_head_position(self):
-        return self.positions[0]
-    
+
+    # Bloque en juego sobre un canvas (canvas.py): el giro y la escala los hace
+    # el backend a partir del sprite sin transformar
+    def render(self, canvas):
+        sprite = get_block_sprite(self.width, self.height, self.color)
+        canvas.blit(sprite, (self.x, self.y), self.rotation, self.scale)
+        attempts_text = render_text(str(self.attempts), 20, (0, 0, 0))
+        canvas.blit(attempts_text, attempts_text.get_rect(center=(self.x + self.width//2, self.y + self.height//2)))
+
+# Clase para la serpiente: la lógica está en simulation.SnakeState
+class Snake(SnakeState):
+    # color: color propio del jugador; None para el del tema
+    def __init__(self, start=None, color=None):
+        self.color = color
+        super().__init__(start)
+
     def update(self):
         head = self.get_head_position()
-        x, y = self.direction
-        new_head = (
-            (head[0] + (x * 20)) % WIDTH,
-            (head[1] + (y * 20)) % HEIGHT
-        )
-        if new_head in list(self.positions)[1:]:
+        if not super().update():
             return False
-        self.positions.appendleft(new_head)
-        if self.growth_pending > 0:
-            self.growth_pending -= 1
-        else:
-            if len(self.positions) > self.length:
-                self.positions.pop()
         if random.random() < 0.3:
-            self.trail_particles.append(Particle(
-                head[0] + 10, head[1] + 10,
-                THEMES[current_theme]["trail"],
-                (random.uniform(-1, 1), random.uniform(-1, 1)),
-                random.randint(20, 40)
-            ))
+            effects.emit(1, head[0] + 10, head[1] + 10, THEMES[current_theme]["trail"], speed=1)
         return True
-    
-    def change_direction(self, direction):
-        if (direction[0] * -1, direction[1] * -1) != self.direction:
-            self.direction = direction
-    
-    def draw(self, surface):
-        for particle in self.trail_particles[:]:
-            particle.update()
-            particle.draw(surface)
-            if particle.age >= particle.lifetime:
-                self.trail_particles.remove(particle)
+
+    # Dibuja cada segmento interpolado entre su posición anterior (previous) y
+    # la actual según alpha; los saltos de borde a borde no se interpolan
+    def draw(self, surface, previous=None, alpha=1.0):
+        color = self.color or THEMES[current_theme]["snake"]
+        length = len(self.positions)
+        sprites = []
         for i, p in enumerate(self.positions):
-            alpha = 255 - int(200 * (i / len(self.positions)))
-            color = (*THEMES[current_theme]["snake"], alpha)
-            pygame.draw.rect(surface, color, (p[0], p[1], 20, 20), border_radius=4)
-            border_color = (min(color[0]+50, 255), min(color[1]+50, 255), min(color[2]+50, 255))
-            pygame.draw.rect(surface, border_color, (p[0], p[1], 20, 20), 2, border_radius=4)
-
-# Clase para la comida
-class Food:
-    def __init__(self):
-        self.positions = []
-        self.particles = []
-        
-    def spawn_food(self, snake_positions):
-        available_positions = [
-            (x, y) for x in range(20, WIDTH-20, 20) 
-            for y in range(20, HEIGHT-20, 20)
-            if (x, y) not in snake_positions
-        ]
-        if available_positions and (not self.positions or random.random() < 0.1):
-            self.positions.append(random.choice(available_positions))
-    
+            if previous is not None and alpha < 1.0 and i < len(previous):
+                q = previous[i]
+                if abs(p[0] - q[0]) <= CELL and abs(p[1] - q[1]) <= CELL:
+                    p = (q[0] + (p[0] - q[0]) * alpha, q[1] + (p[1] - q[1]) * alpha)
+            sprites.append((get_segment_sprite(CELL, color, 255 - int(200 * (i / length))), p))
+        return surface.blits(sprites)
+
+# Clase para la comida: la lógica está en simulation.FoodState
+class Food(FoodState):
     def draw(self, surface):
-        for particle in self.particles[:]:
-            particle.update()
-            particle.draw(surface)
-            if particle.age >= particle.lifetime:
-                self.particles.remove(particle)
-        for pos in self.positions:
-            pygame.draw.rect(surface, THEMES[current_theme]["food"], (pos[0], pos[1], 20, 20), border_radius=10)
+        return [pygame.draw.rect(surface, THEMES[current_theme]["food"], (pos[0], pos[1], 20, 20), border_radius=10)
+                for pos in self.positions]
 
 # Funciones auxiliares
-def cv2_to_pygame(image):
-    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    return pygame.image.frombuffer(image.tobytes(), image.shape[1::-1], "RGB")
-
-def get_hand_landmarks(frame):
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(frame_rgb)
-    if results.multi_hand_landmarks:
-        return results.multi_hand_landmarks[0]
-    return None
+def init_display(backend="software"):
+    global screen, canvas
+    if screen is None:
+        # Solo los módulos necesarios para la ventana; el audio se inicia en segundo plano
+        pygame.display.init()
+        pygame.font.init()
+        canvas = open_canvas((WIDTH, HEIGHT), "Juegos Combinados", backend)
+        screen = canvas.surface
+        renderer.canvas = canvas if canvas.accelerated else None
+    return screen
 
-def get_finger_direction(landmarks):
-    wrist = landmarks.landmark[0]
-    index_tip = landmarks.landmark[8]
-    dx = index_tip.x - wrist.x
-    dy = index_tip.y - wrist.y
-    threshold = 0.1
-    if abs(dx) > abs(dy):
-        if dx > threshold:
-            return (1, 0)
-        elif dx < -threshold:
-            return (-1, 0)
-    else:
-        if dy > threshold:
-            return (0, 1)
-        elif dy < -threshold:
-            return (0, -1)
-    return None
+def load_hands():
+    import mediapipe as mp
+    model = mp.solutions.hands.Hands(max_num_hands=players, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    # La primera inferencia inicializa el grafo de MediaPipe: hacerla ya, en vacío
+    model.process(np.zeros((240, 320, 3), dtype=np.uint8))
+    return model
+
+def warm_up_subsystems(load_model=True):
+    try:
+        mixer.init()
+        assets.preload_sounds()
+    except pygame.error:
+        pass
+    return load_hands() if load_model else None
+
+# Carga el audio y el modelo de manos mientras se muestran los menús. Sin
+# load_model (landmarks del servicio de seguimiento) el modelo no se carga.
+def start_warm_up(load_model=True):
+    global warm_up
+    if warm_up is None:
+        assets.preload_images()
+        warm_up = BackgroundLoader(partial(warm_up_subsystems, load_model), name="warm-up").start()
+    return warm_up
+
+# Modelo que usa cada partida: el global o un envoltorio adaptativo nuevo (tiene
+# estado propio de la mano seguida)
+def tracking_model():
+    global hands
+    if hands is None:
+        # Si el juego empieza antes de que termine la carga, se espera aquí
+        hands = start_warm_up().get() or load_hands()
+    if adaptive_tracking is None:
+        return hands
+    return AdaptiveHands(hands, **adaptive_tracking)
+
+def make_smoother():
+    return LandmarkSmoother(landmark_filter) if landmark_filter else None
+
+# Seguimiento de toda la sesión: la cámara y el hilo de captura se mantienen
+# entre juegos (abrir una webcam USB puede tardar segundos) y solo se pausan
+# fuera de ellos. Con otra fuente se cierra el anterior y se crea uno nuevo.
+session_tracker = None
+
+def start_tracking(source=None, draw=None, recorder=None):
+    global session_tracker
+    if session_tracker is not None and source is not None and session_tracker.source is not source:
+        stop_tracking()
+    if session_tracker is None:
+        if source is None:
+            source = open_source(0)
+        if not source.isOpened():
+            print("Error: No se pudo abrir la cámara")
+            return None
+        # Las fuentes con landmarks propios (grabaciones, servicio) no usan el modelo
+        model = None if source.provides_landmarks else tracking_model()
+        session_tracker = HandTracker(source, model).start()
+    # Los cambios se hacen con la captura detenida entre dos frames
+    session_tracker.pause()
+    session_tracker.draw = draw
+    session_tracker.recorder = recorder
+    session_tracker.profiler = profiler
+    session_tracker.interval = pacer.inference_interval
+    session_tracker.reset()
+    session_tracker.resume()
+    return session_tracker
+
+def pause_tracking():
+    if session_tracker is not None:
+        session_tracker.pause()
+        session_tracker.recorder = None
+
+def stop_tracking():
+    global session_tracker
+    if session_tracker is not None:
+        session_tracker.close()
+        session_tracker = None
+
+# Instante de un frame. En reproducción el reloj es el de la grabación (el
+# instante grabado de cada frame, con sus huecos; si la fuente no lo tiene, un
+# frame cada 1/fps), no el de la máquina, que con --fast va mucho más rápido y
+# cambia de una ejecución a otra: así el resultado es determinista.
+def frame_time(tracker, tracked):
+    if not tracker.synchronous:
+        return tracked.timestamp
+    if tracked.source_time is not None:
+        return tracked.source_time
+    return tracked.seq / getattr(tracker.source, "fps", 30.0)
+
+# Manos de un frame ya filtradas y extrapoladas al instante actual (en
+# reproducción, al del frame). Con assigner la lista va por jugador (None si ese
+# jugador no tiene mano); el reparto también usa el reloj de frame_time().
+def current_hands(tracker, tracked, smoother, is_new, assigner=None):
+    detected = tracked.landmarks
+    t = frame_time(tracker, tracked)
+    if assigner is not None:
+        if is_new:
+            assigner.assign(detected, tracked.handedness, t)
+        detected = assigner.slots
+    if smoother is None:
+        return detected
+    if is_new:
+        smoother.update(detected, t)
+    return smoother.predict(t if tracker.synchronous else time.perf_counter())
+
+# Dibuja el esqueleto de la mano (HandFrame) sobre el frame RGB
+def draw_hand(frame, hand):
+    h, w = frame.shape[:2]
+    pixels = (hand.points[:, :2] * (w, h)).astype(np.int32)
+    cv2.polylines(frame, pixels[HAND_CONNECTIONS], False, (255, 0, 0), 2)
+    for x, y in pixels:
+        cv2.circle(frame, (int(x), int(y)), 3, (255, 0, 0), -1)
 
 # Funciones específicas de Torre de Bloques
-def draw_button(surface, text, rect, color, hover_color, text_color=(255, 255, 255)):
-    mouse_pos = pygame.mouse.get_pos()
-    is_hovered = rect.collidepoint(mouse_pos)
-    button_color = hover_color if is_hovered else color
-    pygame.draw.rect(surface, button_color, rect, border_radius=10)
-    pygame.draw.rect(surface, (0, 0, 0), rect, 2, border_radius=10)
-    font = pygame.font.SysFont('Arial', 24)
-    text_surface = font.render(text, True, text_color)
-    text_rect = text_surface.get_rect(center=rect.center)
-    surface.blit(text_surface, text_rect)
-    return is_hovered
-
-def draw_tower_zone(surface, current_block, tower_height):
+# canvas: canvas.SoftwareCanvas o canvas.TextureCanvas
+def draw_tower_zone(canvas, current_block, tower_height):
     global zone_glow_alpha, zone_pulse_direction, target_block_ghost
-    pygame.draw.rect(surface, (180, 180, 180), (TOWER_X, tower_height, current_block.width, TOWER_Y - tower_height))
+    canvas.fill((180, 180, 180), (TOWER_X, tower_height, current_block.width, TOWER_Y - tower_height))
     zone_glow_alpha += zone_pulse_direction * 3
     if zone_glow_alpha > 150 or zone_glow_alpha < 0:
         zone_pulse_direction *= -1
     zone_glow_alpha = max(0, min(150, zone_glow_alpha))
-    glow_surface = pygame.Surface((current_block.width + 4, TOWER_Y - tower_height + 4), pygame.SRCALPHA)
     glow_color = (100, 255, 100, int(zone_glow_alpha))
-    pygame.draw.rect(glow_surface, glow_color, (0, 0, current_block.width + 4, TOWER_Y - tower_height + 4), 4)
-    surface.blit(glow_surface, (TOWER_X - 2, tower_height - 2))
+    canvas.outline(glow_color, (TOWER_X - 2, tower_height - 2, current_block.width + 4, TOWER_Y - tower_height + 4), 4)
     if target_block_ghost is None:
         target_block_ghost = pygame.Surface((current_block.width, current_block.height), pygame.SRCALPHA)
         pygame.draw.rect(target_block_ghost, (*current_block.color[:3], 80), (0, 0, current_block.width, current_block.height))
-    surface.blit(target_block_ghost, (TOWER_X, tower_height - current_block.height))
-    font = pygame.font.SysFont('Arial', 22, bold=True)
-    text = font.render("¡COLÓCAME AQUÍ!", True, (255, 255, 255))
+    canvas.blit(target_block_ghost, (TOWER_X, tower_height - current_block.height))
+    text = render_text("¡COLÓCAME AQUÍ!", 22, (255, 255, 255), bold=True)
     text_rect = text.get_rect(center=(TOWER_X + current_block.width//2, tower_height - 30))
-    surface.blit(text, text_rect)
-
-def draw_menu_blocks():
-    global current_theme, difficulty
-    screen.fill(THEMES[current_theme]["bg"])
-    title_font = pygame.font.SysFont('Arial', 60)
-    title_text = title_font.render("Torre de Bloques Mágica", True, (0, 0, 0))
-    title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, 100))
-    screen.blit(title_text, title_rect)
-    easy_rect = pygame.Rect(SCREEN_WIDTH//2 - 150, 200, 300, 50)
-    normal_rect = pygame.Rect(SCREEN_WIDTH//2 - 150, 270, 300, 50)
-    hard_rect = pygame.Rect(SCREEN_WIDTH//2 - 150, 340, 300, 50)
-    easy_color = (100, 200, 100) if difficulty == "Fácil" else (150, 150, 150)
-    normal_color = (100, 150, 200) if difficulty == "Normal" else (150, 150, 150)
-    hard_color = (200, 100, 100) if difficulty == "Difícil" else (150, 150, 150)
-    if draw_button(screen, "Fácil", easy_rect, easy_color, (120, 220, 120)):
-        if pygame.mouse.get_pressed()[0]:
-            difficulty = "Fácil"
-    if draw_button(screen, "Normal", normal_rect, normal_color, (120, 170, 220)):
-        if pygame.mouse.get_pressed()[0]:
-            difficulty = "Normal"
-    if draw_button(screen, "Difícil", hard_rect, hard_color, (220, 120, 120)):
-        if pygame.mouse.get_pressed()[0]:
-            difficulty = "Difícil"
-    theme_y = 440
+    canvas.blit(text, text_rect)
+
+# Menú de la Torre de Bloques (widgets.Menu): dificultad, tema y "Comenzar",
+# que devuelve "start". Se arma una vez por partida; cada botón cambia su
+# estado y solo ese botón se vuelve a pintar.
+def build_blocks_menu():
+    menu = Menu((WIDTH, HEIGHT), THEMES[current_theme]["bg"])
+    menu.add(Label(render_text("Torre de Bloques Mágica", 60, (0, 0, 0)), (SCREEN_WIDTH//2, 100)))
+    difficulty_buttons = {}
+    theme_buttons = {}
+
+    def choose_difficulty(name):
+        global difficulty
+        difficulty = name
+        for key, button in difficulty_buttons.items():
+            button.set_selected(key == name)
+
+    def choose_theme(name):
+        global current_theme
+        current_theme = name
+        for key, button in theme_buttons.items():
+            button.set_selected(key == name)
+        menu.set_background(THEMES[name]["bg"])
+
+    levels = [("Fácil", (100, 200, 100), (120, 220, 120)),
+              ("Normal", (100, 150, 200), (120, 170, 220)),
+              ("Difícil", (200, 100, 100), (220, 120, 120))]
+    for i, (name, selected_color, hover_color) in enumerate(levels):
+        button = Button((SCREEN_WIDTH//2 - 150, 200 + i*70, 300, 50), name, (150, 150, 150), hover_color,
+                        partial(choose_difficulty, name), selected_color=selected_color)
+        button.set_selected(difficulty == name)
+        difficulty_buttons[name] = menu.add(button)
     for i, theme in enumerate(["Clásico", "Nocturno", "Naturaleza"]):
-        theme_rect = pygame.Rect(SCREEN_WIDTH//2 - 150 + (i-1)*160, theme_y, 140, 50)
-        theme_color = THEMES[theme]["colors"][0] if current_theme != theme else THEMES[theme]["colors"][2]
-        if draw_button(screen, theme, theme_rect, theme_color, THEMES[theme]["colors"][1]):
-            if pygame.mouse.get_pressed()[0]:
-                current_theme = theme
-    start_rect = pygame.Rect(SCREEN_WIDTH//2 - 100, 520, 200, 60)
-    if draw_button(screen, "Comenzar", start_rect, (100, 200, 100), (120, 220, 120)):
-        if pygame.mouse.get_pressed()[0]:
-            return False
-    return True
+        colors = THEMES[theme]["colors"]
+        button = Button((SCREEN_WIDTH//2 - 150 + (i-1)*160, 440, 140, 50), theme, colors[0], colors[1],
+                        partial(choose_theme, theme), selected_color=colors[2])
+        button.set_selected(current_theme == theme)
+        theme_buttons[theme] = menu.add(button)
+    menu.add(Button((SCREEN_WIDTH//2 - 100, 520, 200, 60), "Comenzar", (100, 200, 100), (120, 220, 120),
+                    lambda: "start"))
+    return menu
 
-# Funciones específicas de Snake
-def show_start_screen_snake():
-    title_font = pygame.font.SysFont('Arial', 80, bold=True)
-    subtitle_font = pygame.font.SysFont('Arial', 30)
-    title_text = title_font.render("SNAKE VISION", True, (0, 255, 0))
-    subtitle_text = subtitle_font.render("Usa tu mano para controlar la serpiente", True, (200, 200, 200))
-    start_text = subtitle_font.render("Presiona ESPACIO para comenzar", True, (255, 255, 255))
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
+# Posición en pantalla de la punta del índice de la primera mano, para elegir
+# en los menús con la mano (ver widgets.Menu.point)
+def menu_pointer(hands_now, size=(WIDTH, HEIGHT)):
+    hand = next((hand for hand in hands_now or [] if hand is not None), None)
+    if hand is None:
+        return None
+    x, y = hand.xy(INDEX_FINGER_TIP)
+    return int(x * size[0]), int(y * size[1])
+
+# Manos para los menús fuera de los juegos. Usa el seguimiento de la sesión en
+# cuanto el modelo está cargado, sin esperarlo (hasta entonces solo hay mouse);
+# devuelve None si no hay seguimiento. Las reproducciones no se consumen aquí.
+def menu_hands(source):
+    if source is None or source.replay or not source.isOpened():
+        return None
+    if session_tracker is None or session_tracker.source is not source:
+        if not source.provides_landmarks and not (warm_up is not None and warm_up.ready):
+            return None
+        if start_tracking(source) is None:
+            return None
+    session_tracker.resume()
+    tracked = session_tracker.latest()
+    return tracked.landmarks if tracked else []
+
+# Pantalla estática: se pinta una vez y luego se duerme esperando eventos hasta
+# que se pulse ESPACIO (o pasen max_duration segundos). Solo se repinta si el
+# sistema lo pide (ventana expuesta o restaurada).
+def wait_for_space(draw, max_duration=None):
+    draw()
+    renderer.invalidate()
+    renderer.present()
+    deadline = time.time() + max_duration if max_duration else None
+    while True:
+        timeout = 0
+        if deadline:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            timeout = max(1, int(remaining * 1000))
+        redraw = False
+        for event in wait_events(timeout):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                waiting = False
+                return
+            if event.type in REDRAW_EVENTS:
+                redraw = True
+        if redraw:
+            draw()
+            renderer.invalidate()
+            renderer.present()
+
+# Funciones específicas de Snake
+def show_start_screen_snake():
+    title_text = render_text("SNAKE VISION", 80, (0, 255, 0), bold=True)
+    subtitle_text = render_text("Usa tu mano para controlar la serpiente", 30, (200, 200, 200))
+    start_text = render_text("Presiona ESPACIO para comenzar", 30, (255, 255, 255))
+    def draw():
         screen.fill(THEMES[current_theme]["bg"])
         screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, HEIGHT//3))
         screen.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, HEIGHT//2))
         screen.blit(start_text, (WIDTH//2 - start_text.get_width()//2, HEIGHT//2 + 100))
-        pygame.display.flip()
-        pygame.time.delay(30)
+    wait_for_space(draw)
 
 def show_game_over_screen_snake(score, level):
-    font_large = pygame.font.SysFont('Arial', 72, bold=True)
-    font_medium = pygame.font.SysFont('Arial', 36)
-    game_over_text = font_large.render("GAME OVER", True, (255, 0, 0))
-    score_text = font_medium.render(f"Puntuación final: {score}", True, (255, 255, 255))
-    level_text = font_medium.render(f"Nivel alcanzado: {level}", True, (255, 255, 255))
-    restart_text = font_medium.render("Presiona ESPACIO para reiniciar", True, (200, 200, 200))
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                waiting = False
+    game_over_text = render_text("GAME OVER", 72, (255, 0, 0), bold=True)
+    score_text = render_text(f"Puntuación final: {score}", 36, (255, 255, 255))
+    level_text = render_text(f"Nivel alcanzado: {level}", 36, (255, 255, 255))
+    restart_text = render_text("Presiona ESPACIO para reiniciar", 36, (200, 200, 200))
+    def draw():
         screen.fill(THEMES[current_theme]["bg"])
         screen.blit(game_over_text, (WIDTH//2 - game_over_text.get_width()//2, HEIGHT//3))
         screen.blit(score_text, (WIDTH//2 - score_text.get_width()//2, HEIGHT//2))
         screen.blit(level_text, (WIDTH//2 - level_text.get_width()//2, HEIGHT//2 + 50))
         screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 120))
-        pygame.display.flip()
-        pygame.time.delay(30)
+    wait_for_space(draw)
 
-# Nueva función para la pantalla de bienvenida
-def show_welcome_screen():
-    try:
-        # Intentar cargar la imagen
-        welcome_image = pygame.image.load("interfazHome.jpg")
-        welcome_image = pygame.transform.scale(welcome_image, (WIDTH, HEIGHT))
-    except pygame.error:
+# Imagen de bienvenida ya decodificada y escalada; se reutiliza en cada vuelta al menú
+@lru_cache(maxsize=1)
+def welcome_background():
+    welcome_image = assets.image("welcome", (WIDTH, HEIGHT))
+    if welcome_image is None:
         # Si no se puede cargar la imagen, crear una pantalla de bienvenida simple
         welcome_image = pygame.Surface((WIDTH, HEIGHT))
         welcome_image.fill(THEMES["Neon"]["bg"])
-        title_font = pygame.font.SysFont('Arial', 80, bold=True)
-        subtitle_font = pygame.font.SysFont('Arial', 40)
-        title_text = title_font.render("Bienvenido a Juegos Combinados", True, (255, 255, 255))
-        subtitle_text = subtitle_font.render("Presiona ESPACIO para continuar", True, (200, 200, 200))
+        title_text = render_text("Bienvenido a Juegos Combinados", 80, (255, 255, 255), bold=True)
+        subtitle_text = render_text("Presiona ESPACIO para continuar", 40, (200, 200, 200))
         title_rect = title_text.get_rect(center=(WIDTH//2, HEIGHT//3))
         subtitle_rect = subtitle_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 100))
         welcome_image.blit(title_text, title_rect)
         welcome_image.blit(subtitle_text, subtitle_rect)
+    return welcome_image
 
-    waiting = True
-    start_time = time.time()
-    max_duration = 5  # Mostrar la pantalla durante 5 segundos como máximo
-    while waiting and (time.time() - start_time) < max_duration:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                waiting = False
-        screen.blit(welcome_image, (0, 0))
-        pygame.display.flip()
-        pygame.time.delay(30)
+# Nueva función para la pantalla de bienvenida
+def show_welcome_screen():
+    welcome_image = welcome_background()
+    # Mostrar la pantalla durante 5 segundos como máximo
+    wait_for_space(lambda: screen.blit(welcome_image, (0, 0)), max_duration=5)
+
+# Menú principal (widgets.Menu). on_click de los juegos devuelve su nombre;
+# los demás botones actúan y el menú sigue abierto.
+def build_game_selection():
+    menu = Menu((WIDTH, HEIGHT), THEMES["Neon"]["bg"])
+    title_text = render_text("Selecciona un juego", 60, (255, 255, 255), bold=True)
+    menu.add(Label(title_text, (WIDTH//2, HEIGHT//3 + title_text.get_height()//2)))
+
+    def choose_game(name, theme):
+        global current_theme
+        current_theme = theme
+        return name
+
+    def toggle_theme():
+        global current_theme
+        current_theme = "Retro" if current_theme == "Neon" else "Neon"
+        theme_button.set_text(f"Tema Snake: {current_theme}")
+
+    def open_support():
+        import webbrowser
+        webbrowser.open("https://neurogame.vercel.app/support")
 
-# Menú principal
-def show_game_selection():
+    # Snake siempre con un tema válido para Snake; Bloques empieza en Clásico
+    menu.add(Button((WIDTH//2 - 150, HEIGHT//2 - 100, 300, 50), "Snake", (0, 255, 0), (120, 255, 120),
+                    partial(choose_game, "snake", "Neon"), text_color=(0, 0, 0), font_size=60, bold=True,
+                    border=0, radius=0))
+    menu.add(Button((WIDTH//2 - 150, HEIGHT//2 + 50, 300, 50), "Bloques", (255, 0, 0), (255, 120, 120),
+                    partial(choose_game, "blocks", "Clásico"), text_color=(0, 0, 0), font_size=60, bold=True,
+                    border=0, radius=0))
+    theme_button = menu.add(Button((WIDTH//2 - 100, HEIGHT//2 + 150, 200, 50), f"Tema Snake: {current_theme}",
+                                   (100, 100, 100), (150, 150, 150), toggle_theme))
+    menu.add(Button((WIDTH//2 - 100, HEIGHT - 100, 200, 50), "Soporte", (100, 100, 200), (150, 150, 250),
+                    open_support))
+    return menu
+
+# source: fuente ya abierta para elegir también con la mano (dejando el dedo
+# sobre un botón); sin ella solo con el mouse
+def show_game_selection(source=None):
     global current_theme
     current_theme = "Neon"  # Tema inicial para el menú
-    font = pygame.font.SysFont('Arial', 60, bold=True)
-    title_text = font.render("Selecciona un juego", True, (255, 255, 255))
-    snake_button = pygame.Rect(WIDTH//2 - 150, HEIGHT//2 - 100, 300, 50)
-    blocks_button = pygame.Rect(WIDTH//2 - 150, HEIGHT//2 + 50, 300, 50)
-    theme_rect = pygame.Rect(WIDTH//2 - 100, HEIGHT//2 + 150, 200, 50)
-    support_rect = pygame.Rect(WIDTH//2 - 100, HEIGHT - 100, 200, 50)  # Botón de soporte
-    while True:
-        screen.fill(THEMES["Neon"]["bg"])
-        screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, HEIGHT//3))
-        pygame.draw.rect(screen, (0, 255, 0), snake_button)
-        pygame.draw.rect(screen, (255, 0, 0), blocks_button)
-        snake_text = font.render("Snake", True, (0, 0, 0))
-        blocks_text = font.render("Bloques", True, (0, 0, 0))
-        screen.blit(snake_text, (snake_button.centerx - snake_text.get_width()//2, snake_button.centery - snake_text.get_height()//2))
-        screen.blit(blocks_text, (blocks_button.centerx - blocks_text.get_width()//2, blocks_button.centery - blocks_text.get_height()//2))
-        if draw_button(screen, f"Tema Snake: {current_theme}", theme_rect, (100, 100, 100), (150, 150, 150)):
-            if pygame.mouse.get_pressed()[0]:
-                current_theme = "Retro" if current_theme == "Neon" else "Neon"
-        # Botón de soporte
-        if draw_button(screen, "Soporte", support_rect, (100, 100, 200), (150, 150, 250)):
-            if pygame.mouse.get_pressed()[0]:
-                import webbrowser
-                webbrowser.open("https://neurogame.vercel.app/support")
-                pygame.time.wait(200)  # Evitar múltiples clics rápidos
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if snake_button.collidepoint(event.pos):
-                    current_theme = "Neon"  # Asegurar tema válido para Snake
-                    return "snake"
-                elif blocks_button.collidepoint(event.pos):
-                    current_theme = "Clásico"  # Tema inicial para Bloques
-                    return "blocks"
+    menu = build_game_selection()
+    polling = source is not None and not source.replay
+    try:
+        while True:
+            hands_now = menu_hands(source)
+            choice = menu.point(menu_pointer(hands_now))
+            menu.present(screen, renderer)
+            # Sin seguimiento el menú duerme hasta el próximo evento; con la mano
+            # se consulta la cámara a 30 FPS (y más despacio mientras carga el modelo)
+            timeout = 33 if hands_now is not None else 250 if polling else 0
+            for event in wait_events(timeout):
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                if event.type in REDRAW_EVENTS:
+                    menu.invalidate()
+                choice = menu.handle(event) or choice
+            if choice:
+                return choice
+    finally:
+        pause_tracking()
+
+# Dato numérico de cada evento de BlocksGame para las métricas: intentos del
+# bloque al soltarlo o colocarlo, nivel alcanzado o puntuación final
+def event_value(name, data):
+    if name in ("drop", "place"):
+        return data.attempts
+    if name in ("level_up", "game_over"):
+        return data
+    return None
+
+# Análisis de movimiento con los landmarks sin filtrar de cada jugador (el
+# filtro suavizaría justo el temblor que se quiere medir). Llamar solo con
+# frames nuevos y después de current_hands(), que reparte las manos.
+def update_motion(motion, tracker, tracked, assigner):
+    detected = assigner.slots if assigner is not None else tracked.landmarks
+    t = frame_time(tracker, tracked)
+    with profiler.stage("kinematics"):
+        for player, stream in enumerate(motion):
+            stream.update(t, detected[player] if player < len(detected) else None)
+
+# Cierra la sesión de métricas guardando antes el resumen de movimiento de cada
+# jugador; los análisis empiezan de cero para la sesión siguiente
+def end_session(session, motion, score, level, duration=None):
+    if not session.ended:
+        for player, stream in enumerate(motion):
+            session.kinematics(player, stream.summary())
+        session.end(score, level, duration)
+    for stream in motion:
+        stream.reset()
 
 # Juego de bloques
-def play_blocks():
+# source: fuente de frames (por defecto la cámara 0). Con interactive=False se
+# omite el menú para poder reproducir sesiones grabadas sin intervención.
+# recorder: SessionRecorder opcional que guarda los landmarks de cada frame.
+def play_blocks(source=None, interactive=True, recorder=None):
     global current_theme, difficulty, zone_glow_alpha, zone_pulse_direction, target_block_ghost
     current_theme = "Clásico"
     difficulty = "Normal"
     zone_glow_alpha = 0
     zone_pulse_direction = 1
     target_block_ghost = None
-    grab_sound = drop_sound = success_sound = level_up_sound = game_over_sound = None
-    try:
-        if pygame.mixer.get_init():
-            grab_sound = mixer.Sound('grab.wav') if pygame.mixer.get_init() else None
-            drop_sound = mixer.Sound('drop.wav') if pygame.mixer.get_init() else None
-            success_sound = mixer.Sound('success.wav') if pygame.mixer.get_init() else None
-            level_up_sound = mixer.Sound('level_up.wav') if pygame.mixer.get_init() else None
-            game_over_sound = mixer.Sound('game_over.wav') if pygame.mixer.get_init() else None
-    except:
-        pass
-    current_block = Block()
-    tower = []
-    tower_height = TOWER_Y
-    max_tower_height = TOWER_Y - 200
-    game_over = False
-    score = 0
-    high_score = 0
-    level = 1
-    block_width_decrease = 5
-    game_start_time = time.time()
-    particles = []
-    show_menu = True
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("Error: No se pudo abrir la cámara")
+    # La lógica del juego (simulation.BlocksGame) avanza a paso fijo; aquí solo
+    # se le pasa la posición del cursor y la pinza, y se reacciona a sus eventos
+    game = BlocksGame(block_factory=Block)
+    game.high_score = metrics.high_score("blocks")
+    timestep = FixedTimestep(pacer.logic_rate)
+    # Los bloques colocados no cambian: se componen en una capa que solo se
+    # rehace cuando la torre cambia
+    tower_layer = CachedLayer()
+    effects.clear()
+    show_menu = interactive
+    menu_drawn = False
+    blocks_menu = build_blocks_menu()
+    # La captura y MediaPipe corren en otro hilo; aquí solo se usa el último resultado
+    tracker = start_tracking(source, draw=draw_hand, recorder=recorder)
+    if tracker is None:
         return
+    # La sesión de métricas solo se abre si hay seguimiento
+    session = metrics.start_session("blocks", players)
+    # Velocidad, suavidad y temblor de cada jugador a partir de sus landmarks
+    motion = [KinematicsStream() for _ in range(players)]
+    smoother = make_smoother()
+    assigner = HandAssigner(players) if players > 1 else None
+    gestures = GestureEngine(players)
+    x_scale = getattr(tracker.source, "tiles", 1)
+    # Jugador que tiene agarrado el bloque: solo su mano lo mueve
+    holder = 0
+    # El fondo de cámara lo escala el canvas (por software o en la GPU)
+    camera_rect = pygame.Rect((WIDTH - SCREEN_WIDTH) // 2, (HEIGHT - SCREEN_HEIGHT) // 2, SCREEN_WIDTH, SCREEN_HEIGHT)
+    bg_seq = 0
     running = True
-    clock = pygame.time.Clock()
+    # En reproducción sin tiempo real no se limita la velocidad
+    pacer.start(realtime=not tracker.synchronous)
+    last_time = time.perf_counter()
     try:
         while running:
-            ret, frame = cap.read()
-            if not ret:
-                print("Error: No se pudo leer el frame de la cámara")
-                continue
-            frame = cv2.flip(frame, 1)
-            h, w, _ = frame.shape
-            landmarks = get_hand_landmarks(frame)
-            if landmarks:
-                mp_drawing.draw_landmarks(frame, landmarks, mp_hands.HAND_CONNECTIONS)
-            bg = cv2_to_pygame(frame)
-            bg = pygame.transform.scale(bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
-            for event in pygame.event.get():
+            profiler.begin_frame()
+            # Una reproducción no avanza con el menú abierto: no se consume la
+            # grabación y el bucle duerme hasta el próximo evento (pintado el menú)
+            menu_idle = show_menu and tracker.synchronous
+            if menu_idle:
+                tracker.pause()
+            elif tracker.paused:
+                tracker.resume()
+            tracked = tracker.latest()
+            if tracker.finished:
+                running = False
+            hands_now = []
+            if tracked and not menu_idle:
+                is_new = tracked.seq != bg_seq
+                hands_now = current_hands(tracker, tracked, smoother, is_new, assigner)
+                # Solo convertir el fondo cuando llega un frame nuevo
+                if is_new:
+                    bg_seq = tracked.seq
+                    update_motion(motion, tracker, tracked, assigner)
+                    with profiler.stage("background"):
+                        canvas.camera(tracked.frame, camera_rect.size)
+            events = (wait_events(0 if menu_drawn else 1) if menu_idle else pygame.event.get())
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_r and (game_over or show_menu):
-                        current_block = Block(80 - (level-1)*block_width_decrease)
-                        tower = []
-                        tower_height = TOWER_Y
-                        game_over = False
-                        score = 0
-                        level = 1
-                        game_start_time = time.time()
+                    if event.key == pygame.K_r and (game.game_over or show_menu):
+                        end_session(session, motion, game.score, game.level, game.elapsed)
+                        session = metrics.start_session("blocks", players)
+                        game.reset()
+                        tower_layer.invalidate()
                         show_menu = False
                         target_block_ghost = None
                     elif event.key == pygame.K_m:
                         show_menu = not show_menu
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle_overlay()
                     elif event.key == pygame.K_ESCAPE:
                         running = False
             if show_menu:
-                show_menu = draw_menu_blocks()
-                pygame.display.flip()
-                clock.tick(30)
-                continue
-            if not game_over and landmarks:
-                index_tip = landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                hand_x = int(index_tip.x * SCREEN_WIDTH)
-                hand_y = int(index_tip.y * SCREEN_HEIGHT)
-                if current_block.is_over((hand_x, hand_y)) or current_block.grabbed:
-                    if not current_block.grabbed:
-                        current_block.grabbed = True
-                        current_block.add_particles(15)
-                        current_block.target_rotation = random.uniform(-10, 10)
-                        current_block.target_scale = 1.1
-                        if grab_sound: grab_sound.play()
-                    current_block.x = hand_x - current_block.width//2
-                    current_block.y = hand_y - current_block.height//2
-                    if (abs(current_block.x + current_block.width/2 - (TOWER_X + current_block.width/2)) <= 20 and 
-                        abs(current_block.y - (tower_height - current_block.height)) <= 10):
-                        tower.append(current_block)
-                        tower_height -= current_block.height
-                        score += max(1, 5 - current_block.attempts)
-                        for _ in range(50):
-                            particles.append(Particle(
-                                TOWER_X + current_block.width//2,
-                                tower_height,
-                                (255, 255, 100)
-                            ))
-                        if success_sound: success_sound.play()
-                        for block in tower:
-                            block.y += 5
-                        current_block.grabbed = False
-                        if tower_height <= max_tower_height:
-                            level += 1
-                            if level > 10:
-                                game_over = True
-                                if game_over_sound: game_over_sound.play()
-                                high_score = max(high_score, score)
-                            else:
-                                tower_height = TOWER_Y
-                                tower = []
-                                if level_up_sound: level_up_sound.play()
-                        block_width = max(30, 80 - (level-1)*block_width_decrease)
-                        current_block = Block(block_width)
-                        current_block.grabbed = False
-                        target_block_ghost = None
+                # El menú se pinta completo al entrar y después solo los botones
+                # que cambian; la cámara sigue activa para elegir con la mano
+                if not menu_drawn:
+                    blocks_menu.invalidate()
+                    menu_drawn = True
+                choice = blocks_menu.point(menu_pointer(hands_now))
+                for event in events:
+                    if event.type in REDRAW_EVENTS:
+                        blocks_menu.invalidate()
+                    choice = blocks_menu.handle(event) or choice
+                if choice != "start":
+                    blocks_menu.present(screen, renderer)
+                    if not menu_idle:
+                        pacer.wait(30)
+                    last_time = time.perf_counter()
+                    continue
+                show_menu = False
+            menu_drawn = False
+            cursors = {}
+            pointers = {}
+            grips = {}
+            with profiler.stage("gestures"):
+                for player, gesture in enumerate(gestures.update(hands_now[:players], x_scale)):
+                    if gesture:
+                        x, y = pointers[player] = gesture.pointer
+                        cursors[player] = (int(x * SCREEN_WIDTH), int(y * SCREEN_HEIGHT))
+                        grips[player] = gesture.pinching if grab_mode == "pinch" else None
+            if not game.current_block.grabbed:
+                # Lo agarra el primer jugador que cierre la pinza (o pase el
+                # dedo, en modo hover) sobre el bloque
+                holder = next((player for player, pos in cursors.items()
+                               if game.current_block.is_over(pos) and grips[player] is not False),
+                              next(iter(cursors), 0))
+            hand = cursors.get(holder)
+            grip = grips.get(holder)
+            now = time.perf_counter()
+            # En reproducción cada frame equivale a un paso exacto
+            elapsed = timestep.dt if tracker.synchronous else now - last_time
+            last_time = now
+            with profiler.stage("logic"):
+                for _ in range(timestep.advance(elapsed)):
+                    for name, block in game.step(hand, timestep.dt, grip):
+                        session.log(name, holder, pointers.get(holder), event_value(name, block))
+                        if name == "grab":
+                            block.add_particles(15)
+                            assets.play("grab")
+                        elif name == "drop":
+                            block.add_particles(10)
+                            assets.play("drop")
+                        elif name == "place":
+                            tower_layer.invalidate()
+                            target_block_ghost = None
+                            effects.emit(50, TOWER_X + block.width//2, block.y - 5, (255, 255, 100), lifetime=30)
+                            assets.play("success")
+                        elif name == "level_up":
+                            tower_layer.invalidate()
+                            assets.play("level_up")
+                        elif name == "game_over":
+                            end_session(session, motion, game.score, game.level, game.elapsed)
+                            assets.play("game_over")
+            current_block = game.current_block
+            with profiler.stage("draw"):
+                canvas.draw_camera(camera_rect)
+                draw_tower_zone(canvas, current_block, game.tower_height)
+                tower_layer.draw(canvas, game.tower)
+                current_block.render(canvas)
+                # Cursor de cada mano; relleno mientras la pinza está cerrada
+                for player, pos in cursors.items():
+                    canvas.circle(PLAYER_COLORS[player], pos, 12, 0 if grips[player] else 3)
+                    if players > 1:
+                        label = render_text(f'J{player + 1}', 20, PLAYER_COLORS[player])
+                        canvas.blit(label, (pos[0] + 14, pos[1] - 10))
+            with profiler.stage("particles"):
+                effects.budget = pacer.particle_budget(effects.capacity)
+                effects.update()
+                effects.draw(canvas)
+            elapsed_time = game.elapsed
+            with profiler.stage("text"):
+                info_texts = [
+                    f'Puntuación: {game.score}',
+                    f'Récord: {game.high_score}',
+                    f'Nivel: {game.level}',
+                    f'Intentos: {current_block.attempts}',
+                    f'Tiempo: {int(elapsed_time)}s'
+                ]
+                canvas.fill((0, 0, 0), (10, 10, 300, 180))
+                for i, text in enumerate(info_texts):
+                    text_surface = render_text(text, 30, (255, 255, 255))
+                    canvas.blit(text_surface, (20, 20 + i * 30))
+                if grab_mode == "pinch":
+                    instructions = [
+                        'Instrucciones:',
+                        'Junta pulgar e índice sobre el bloque',
+                        'y arrástralo a la zona gris',
+                        'Presiona M para menú, R para reiniciar'
+                    ]
                 else:
-                    if current_block.grabbed:
-                        current_block.grabbed = False
-                        current_block.attempts += 1
-                        current_block.target_rotation = 0
-                        current_block.target_scale = 1.0
-                        current_block.add_particles(10)
-                        if drop_sound: drop_sound.play()
-            for particle in particles[:]:
-                particle.update()
-                if particle.age >= particle.lifetime:
-                    particles.remove(particle)
-            current_block.update()
-            screen.blit(bg, ((WIDTH - SCREEN_WIDTH) // 2, (HEIGHT - SCREEN_HEIGHT) // 2))
-            draw_tower_zone(screen, current_block, tower_height)
-            for block in tower:
-                block.draw(screen)
-            current_block.draw(screen)
-            for particle in particles:
-                particle.draw(screen)
-            font = pygame.font.SysFont('Arial', 30)
-            elapsed_time = time.time() - game_start_time
-            info_texts = [
-                f'Puntuación: {score}',
-                f'Récord: {high_score}',
-                f'Nivel: {level}',
-                f'Intentos: {current_block.attempts}',
-                f'Tiempo: {int(elapsed_time)}s'
-            ]
-            pygame.draw.rect(screen, (0, 0, 0, 128), (10, 10, 300, 180))
-            for i, text in enumerate(info_texts):
-                text_surface = font.render(text, True, (255, 255, 255))
-                screen.blit(text_surface, (20, 20 + i * 30))
-            instruction_font = pygame.font.SysFont('Arial', 20)
-            instructions = [
-                'Instrucciones:',
-                'Mueve el dedo índice sobre el bloque',
-                'para arrastrarlo a la zona gris',
-                'Presiona M para menú, R para reiniciar'
-            ]
-            for i, text in enumerate(instructions):
-                text_surface = instruction_font.render(text, True, (255, 255, 255))
-                screen.blit(text_surface, (20, 180 + i * 20))
-            if game_over:
-                overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 180))
-                screen.blit(overlay, (0, 0))
-                font_large = pygame.font.SysFont('Arial', 50)
-                game_over_text = font_large.render('¡Juego Completado!', True, (255, 255, 255))
-                score_text = font.render(f'Puntuación final: {score}', True, (255, 255, 255))
-                time_text = font.render(f'Tiempo: {int(elapsed_time)} segundos', True, (255, 255, 255))
-                restart_text = font.render('Presiona R para reiniciar', True, (255, 255, 255))
-                text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 80))
-                score_rect = score_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 20))
-                time_rect = time_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20))
-                restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 80))
-                screen.blit(game_over_text, text_rect)
-                screen.blit(score_text, score_rect)
-                screen.blit(time_text, time_rect)
-                screen.blit(restart_text, restart_rect)
-            pygame.display.flip()
-            clock.tick(60)
+                    instructions = [
+                        'Instrucciones:',
+                        'Mueve el dedo índice sobre el bloque',
+                        'para arrastrarlo a la zona gris',
+                        'Presiona M para menú, R para reiniciar'
+                    ]
+                for i, text in enumerate(instructions):
+                    text_surface = render_text(text, 20, (255, 255, 255))
+                    canvas.blit(text_surface, (20, 180 + i * 20))
+                if game.game_over:
+                    canvas.fill((0, 0, 0, 180))
+                    game_over_text = render_text('¡Juego Completado!', 50, (255, 255, 255))
+                    score_text = render_text(f'Puntuación final: {game.score}', 30, (255, 255, 255))
+                    time_text = render_text(f'Tiempo: {int(elapsed_time)} segundos', 30, (255, 255, 255))
+                    restart_text = render_text('Presiona R para reiniciar', 30, (255, 255, 255))
+                    text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 80))
+                    score_rect = score_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 20))
+                    time_rect = time_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20))
+                    restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 80))
+                    canvas.blit(game_over_text, text_rect)
+                    canvas.blit(score_text, score_rect)
+                    canvas.blit(time_text, time_rect)
+                    canvas.blit(restart_text, restart_rect)
+            profiler.draw(canvas)
+            # El fondo de cámara cambia en cada frame: siempre se presenta completo
+            renderer.invalidate()
+            with profiler.stage("display.flip"):
+                renderer.present()
+            profiler.end_frame()
+            pacer.wait()
     finally:
-        cap.release()
+        end_session(session, motion, game.score, game.level, game.elapsed)
+        pause_tracking()
 
 # Juego de la serpiente
-def play_snake():
+def play_snake(source=None, interactive=True, recorder=None):
     global current_theme
     current_theme = "Neon"  # Forzar tema válido para Snake
-    snake = Snake()
-    food = Food()
-    clock = pygame.time.Clock()
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("Error: No se pudo abrir la cámara")
+    # La serpiente avanza según su velocidad dentro de simulation.SnakeGame; el
+    # dibujo va al ritmo de pacer e interpola entre la posición anterior y la actual
+    # Con varios jugadores cada uno tiene su serpiente (y color) y comparten la comida
+    if players > 1:
+        food = Food()
+        games = [SnakeGame(snake_factory=partial(Snake, start, PLAYER_COLORS[player]), food_factory=Food, food=food)
+                 for player, start in enumerate(player_starts(players))]
+    else:
+        games = [SnakeGame(snake_factory=Snake, food_factory=Food)]
+    game = games[0]
+    timestep = FixedTimestep(pacer.logic_rate)
+    effects.clear()
+    tracker = start_tracking(source, recorder=recorder)
+    if tracker is None:
         return
-    show_start_screen_snake()
+    if interactive:
+        tracker.pause()
+        show_start_screen_snake()
+        tracker.resume()
+    renderer.invalidate()
+    smoother = make_smoother()
+    assigner = HandAssigner(players) if players > 1 else None
+    gestures = GestureEngine(players)
+    x_scale = getattr(tracker.source, "tiles", 1)
+    last_seq = 0
+    directions = [None] * players
+    # Posición normalizada de la mano de cada jugador, para las métricas
+    pointers = [None] * players
+    session = metrics.start_session("snake", players)
+    # Mejor (puntuación, nivel) de la sesión: en grupo las serpientes se reinician al chocar
+    best = (0, 1)
+    record = metrics.high_score("snake")
+    motion = [KinematicsStream() for _ in range(players)]
     running = True
+    # En reproducción sin tiempo real no se limita la velocidad
+    pacer.start(realtime=not tracker.synchronous)
+    last_time = time.perf_counter()
     try:
         while running:
+            profiler.begin_frame()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         running = False
-            ret, frame = cap.read()
-            if not ret:
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle_overlay()
+                        renderer.invalidate()
+            tracked = tracker.latest()
+            if tracker.finished:
+                running = False
+            if tracked and tracked.seq != last_seq:
+                last_seq = tracked.seq
+                hands_now = current_hands(tracker, tracked, smoother, True, assigner)[:players]
+                update_motion(motion, tracker, tracked, assigner)
+                with profiler.stage("gestures"):
+                    for player, gesture in enumerate(gestures.update(hands_now, x_scale)):
+                        pointers[player] = gesture.pointer if gesture else None
+                        if gesture:
+                            directions[player] = gesture.direction or directions[player]
+            now = time.perf_counter()
+            elapsed = timestep.dt if tracker.synchronous else now - last_time
+            last_time = now
+            with profiler.stage("logic"):
+                death = None
+                for _ in range(timestep.advance(elapsed)):
+                    for player, player_game in enumerate(games):
+                        for name, data in player_game.step(directions[player], timestep.dt):
+                            if name == "eat":
+                                session.log("eat", player, pointers[player], player_game.snake.score)
+                                effects.emit(20, data[0] + 10, data[1] + 10, THEMES[current_theme]["food"], speed=3)
+                            elif name == "level_up":
+                                session.log("level_up", player, pointers[player], data)
+                            elif name == "death":
+                                session.log("death", player, pointers[player], data[0])
+                                best = max(best, data)
+                                death = data
+                        # En grupo, quien choca vuelve a empezar sin detener a los demás
+                        if death and players > 1:
+                            head = player_game.snake.get_head_position()
+                            effects.emit(30, head[0] + 10, head[1] + 10, PLAYER_COLORS[player], speed=3)
+                            player_game.reset()
+                            death = None
+                    directions = [None] * players
+                    if death:
+                        break
+            if death:
+                end_session(session, motion, *death)
+                record = max(record, death[0])
+                if interactive:
+                    tracker.pause()
+                    show_game_over_screen_snake(*death)
+                    tracker.resume()
+                session = metrics.start_session("snake", players)
+                best = (0, 1)
+                game.reset()
+                effects.clear()
+                renderer.invalidate()
+                pacer.start()
+                last_time = time.perf_counter()
                 continue
-            frame = cv2.flip(frame, 1)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = hands.process(frame_rgb)
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    direction = get_finger_direction(hand_landmarks)
-                    if direction:
-                        snake.change_direction(direction)
-            if not snake.update():
-                show_game_over_screen_snake(snake.score, snake.level)
-                snake.reset()
-                food = Food()
-                continue
-            head_pos = snake.get_head_position()
-            for food_pos in food.positions[:]:
-                if head_pos == food_pos:
-                    food.positions.remove(food_pos)
-                    snake.growth_pending += 1
-                    snake.score += 10 * snake.level
-                    for _ in range(20):
-                        food.particles.append(Particle(
-                            food_pos[0] + 10, food_pos[1] + 10,
-                            THEMES[current_theme]["food"],
-                            (random.uniform(-3, 3), random.uniform(-3, 3)),
-                            random.randint(20, 40)
-                        ))
-                    if snake.score >= snake.level * 50:
-                        snake.level += 1
-                        snake.speed += 1
-                    break
-            food.spawn_food(snake.positions)
-            screen.fill(THEMES[current_theme]["bg"])
-            food.draw(screen)
-            snake.draw(screen)
-            font = pygame.font.SysFont('Arial', 30)
-            score_text = font.render(f'Puntuación: {snake.score}', True, (255, 255, 255))
-            level_text = font.render(f'Nivel: {snake.level}', True, (255, 255, 255))
-            screen.blit(score_text, (20, 20))
-            screen.blit(level_text, (20, 50))
-            pygame.display.flip()
-            clock.tick(snake.speed)
+            food = game.food
+            bg_color = THEMES[current_theme]["bg"]
+            if renderer.needs_full_redraw:
+                screen.fill(bg_color)
+            else:
+                # Borrar solo donde había objetos y HUD en el frame anterior
+                for layer in ("objects", "hud"):
+                    for rect in renderer.previous_rects(layer):
+                        screen.fill(bg_color, rect)
+            with profiler.stage("particles"):
+                effects.budget = pacer.particle_budget(effects.capacity)
+                effects.update()
+                renderer.mark("objects", effects.draw(screen))
+            with profiler.stage("draw"):
+                renderer.mark("objects", food.draw(screen))
+                for player_game in games:
+                    renderer.mark("objects", player_game.snake.draw(screen, player_game.previous_positions,
+                                                                    player_game.alpha))
+            with profiler.stage("text"):
+                if players > 1:
+                    for player, player_game in enumerate(games):
+                        snake = player_game.snake
+                        player_text = render_text(f'J{player + 1}: {snake.score} (Nivel {snake.level})', 30,
+                                                  PLAYER_COLORS[player])
+                        renderer.mark("hud", screen.blit(player_text, (20, 20 + player * 30)))
+                else:
+                    snake = game.snake
+                    score_text = render_text(f'Puntuación: {snake.score}', 30, (255, 255, 255))
+                    level_text = render_text(f'Nivel: {snake.level}', 30, (255, 255, 255))
+                    record_text = render_text(f'Récord: {max(record, snake.score)}', 30, (255, 255, 255))
+                    renderer.mark("hud", screen.blit(score_text, (20, 20)))
+                    renderer.mark("hud", screen.blit(level_text, (20, 50)))
+                    renderer.mark("hud", screen.blit(record_text, (20, 80)))
+            renderer.mark("hud", profiler.draw(screen))
+            with profiler.stage("display.flip"):
+                renderer.present()
+            profiler.end_frame()
+            pacer.wait()
     finally:
-        cap.release()
+        end_session(session, motion, *max([best] + [(g.snake.score, g.snake.level) for g in games]))
+        pause_tracking()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Juegos de rehabilitación controlados con la mano")
+    parser.add_argument("--source", default="0",
+                        help="índice de cámara, archivo de video, carpeta de imágenes, sesión .lmk/.npz "
+                             "o service[:DIRECCIÓN] para usar el servicio de seguimiento")
+    parser.add_argument("--game", choices=["snake", "blocks"],
+                        help="iniciar directamente un juego sin menús")
+    parser.add_argument("--loop", action="store_true", help="repetir la fuente al terminar")
+    parser.add_argument("--fast", action="store_true",
+                        help="reproducir la fuente sin esperar el tiempo real (benchmark)")
+    parser.add_argument("--record", help="grabar los landmarks de la sesión en un archivo .lmk")
+    parser.add_argument("--render", choices=["dirty", "full"], default="dirty",
+                        help="dirty: actualizar solo las zonas que cambian; full: flip completo cada frame")
+    parser.add_argument("--backend", choices=["software", "sdl2", "sdl2-software"], default="software",
+                        help="dibujo de la Torre de Bloques: software (blits de pygame), sdl2 (texturas en la "
+                             "GPU) o sdl2-software (renderer por software de SDL, sirve sin pantalla)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="seguimiento adaptativo: recorte alrededor de la mano, inferencia cada N frames")
+    parser.add_argument("--latency-budget", type=float, default=100,
+                        help="latencia máxima en ms entre inferencias en modo adaptativo")
+    parser.add_argument("--filter", choices=["euro", "kalman", "none"], default="euro",
+                        help="filtro de suavizado y predicción de landmarks")
+    parser.add_argument("--players", type=int, choices=range(1, len(PLAYER_COLORS) + 1), default=1,
+                        help="jugadores simultáneos (una mano cada uno); con --source 0,1 cada cámara ocupa una franja")
+    parser.add_argument("--grab", choices=["pinch", "hover"], default="pinch",
+                        help="pinch: agarrar bloques cerrando pulgar e índice; hover: pasando el dedo por encima")
+    parser.add_argument("--db", default="neurogame.db",
+                        help="base de datos SQLite donde se guardan las métricas de cada partida "
+                             "(vacío para no guardar)")
+    parser.add_argument("--patient", default="invitado", help="paciente al que se asignan las partidas")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="FPS máximos de dibujo (bajan solos si la máquina no llega)")
+    parser.add_argument("--inference-rate", type=float, default=0,
+                        help="inferencias de la mano por segundo (0: todas las que dé la cámara)")
+    parser.add_argument("--low-power", action="store_true",
+                        help="bajo consumo para portátiles a batería: 30 FPS, 15 inferencias por segundo "
+                             "y menos partículas")
+    parser.add_argument("--seed", type=int, help="semilla aleatoria para reproducciones deterministas")
+    parser.add_argument("--profile", metavar="ARCHIVO",
+                        help="medir los tiempos de cada etapa y guardarlos al salir (.csv o .json)")
+    return parser.parse_args(argv)
 
 # Función principal
-def main():
-    global current_theme
+def main(argv=None):
+    global current_theme, adaptive_tracking, landmark_filter, players, grab_mode, metrics, pacer
+    args = parse_args(argv)
+    players = args.players
+    grab_mode = args.grab
+    # Primero la ventana; MediaPipe y el audio se cargan mientras tanto
+    init_display(args.backend)
+    start_warm_up(load_model=not args.source.startswith("service"))
+    landmark_filter = None if args.filter == "none" else args.filter
+    if args.adaptive:
+        adaptive_tracking = {"latency_budget": args.latency_budget / 1000}
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+    renderer.enabled = args.render == "dirty"
+    profiler.enabled = bool(args.profile)
+    pacer = FramePacer(render_rate=args.fps, inference_rate=args.inference_rate or None, low_power=args.low_power)
+    profiler.budget_ms = 1000.0 / pacer.render_rate
     current_theme = "Neon"
-    while True:
-        show_welcome_screen()
-        selected_game = show_game_selection()
-        if selected_game == "snake":
-            play_snake()
-        elif selected_game == "blocks":
-            play_blocks()
+    recorder = SessionRecorder(args.record) if args.record else None
+    metrics = MetricsStore(args.db or None, patient=args.patient)
+    try:
+        if args.game:
+            source = open_source(args.source, loop=args.loop, realtime=not args.fast)
+            if args.game == "snake":
+                play_snake(source, interactive=False, recorder=recorder)
+            else:
+                play_blocks(source, interactive=False, recorder=recorder)
+            return
+        source = None
+        while True:
+            show_welcome_screen()
+            # La cámara se abre una sola vez (y ya sirve para elegir en el menú
+            # con la mano); una grabación se vuelve a abrir cuando terminó
+            if source is None or source.finished:
+                source = open_source(args.source, loop=args.loop, realtime=not args.fast)
+            selected_game = show_game_selection(source)
+            if selected_game == "snake":
+                play_snake(source, recorder=recorder)
+            elif selected_game == "blocks":
+                play_blocks(source, recorder=recorder)
+    finally:
+        stop_tracking()
+        if recorder:
+            recorder.close()
+        metrics.close()
+        if args.profile:
+            profiler.export(args.profile)
 
 if __name__ == "__main__":
     main()
-pygame.quit()
+    pygame.quit()
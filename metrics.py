@@ -0,0 +1,280 @@
+import argparse
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+
+# Métricas de las sesiones para el seguimiento del terapeuta. Cada partida es
+# una fila de `sessions` y cada acción relevante (agarrar, soltar, colocar,
+# comer, chocar...) una fila de `events` con su instante y la posición
+# normalizada de la mano; `kinematics` guarda el resumen de movimiento de cada
+# jugador (kinematics.py). El juego solo encola; un hilo aparte escribe por
+# lotes en una transacción, así el bucle de juego nunca espera al disco.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    patient TEXT NOT NULL,
+    game TEXT NOT NULL,
+    day TEXT NOT NULL,
+    started REAL NOT NULL,
+    players INTEGER NOT NULL DEFAULT 1,
+    ended REAL,
+    duration REAL,
+    score INTEGER,
+    level INTEGER
+);
+CREATE TABLE IF NOT EXISTS events (
+    session TEXT NOT NULL REFERENCES sessions(id),
+    t REAL NOT NULL,
+    kind TEXT NOT NULL,
+    player INTEGER NOT NULL DEFAULT 0,
+    x REAL,
+    y REAL,
+    value REAL
+);
+CREATE TABLE IF NOT EXISTS kinematics (
+    session TEXT NOT NULL REFERENCES sessions(id),
+    player INTEGER NOT NULL DEFAULT 0,
+    path_length REAL,
+    active_time REAL,
+    mean_velocity REAL,
+    peak_velocity REAL,
+    smoothness REAL,
+    tremor_hz REAL,
+    tremor_ratio REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_patient_day ON sessions(patient, day, game);
+CREATE INDEX IF NOT EXISTS events_session_kind ON events(session, kind);
+CREATE INDEX IF NOT EXISTS kinematics_session ON kinematics(session);
+"""
+
+# Resumen por día y juego de un paciente; los conteos de eventos salen del
+# índice (session, kind)
+DAILY_QUERY = """
+WITH counts AS (
+    SELECT session,
+           SUM(kind = 'grab') AS grabs,
+           SUM(kind = 'drop') AS drops,
+           SUM(kind = 'place') AS placements,
+           SUM(kind = 'eat') AS eats,
+           SUM(kind = 'death') AS deaths
+    FROM events
+    WHERE session IN (SELECT id FROM sessions WHERE patient = :patient)
+    GROUP BY session
+),
+motion AS (
+    SELECT session, AVG(mean_velocity) AS mean_velocity, MAX(peak_velocity) AS peak_velocity,
+           AVG(smoothness) AS smoothness, AVG(NULLIF(tremor_hz, 0)) AS tremor_hz
+    FROM kinematics
+    WHERE session IN (SELECT id FROM sessions WHERE patient = :patient)
+    GROUP BY session
+)
+SELECT s.day, s.game, COUNT(*) AS sessions, COALESCE(SUM(s.duration), 0) / 60.0 AS minutes,
+       MAX(s.score) AS best, AVG(s.score) AS mean_score, MAX(s.level) AS level,
+       COALESCE(SUM(c.grabs), 0) AS grabs, COALESCE(SUM(c.drops), 0) AS drops,
+       COALESCE(SUM(c.placements), 0) AS placements, COALESCE(SUM(c.eats), 0) AS eats,
+       COALESCE(SUM(c.deaths), 0) AS deaths,
+       AVG(m.mean_velocity) AS mean_velocity, MAX(m.peak_velocity) AS peak_velocity,
+       AVG(m.smoothness) AS smoothness, AVG(m.tremor_hz) AS tremor_hz
+FROM sessions s LEFT JOIN counts c ON c.session = s.id LEFT JOIN motion m ON m.session = s.id
+WHERE s.patient = :patient AND (:game IS NULL OR s.game = :game)
+GROUP BY s.day, s.game
+ORDER BY s.day, s.game
+"""
+
+PATIENTS_QUERY = """
+SELECT patient, COUNT(*) AS sessions, MIN(day) AS first_day, MAX(day) AS last_day,
+       COALESCE(SUM(duration), 0) / 60.0 AS minutes
+FROM sessions
+GROUP BY patient
+ORDER BY patient
+"""
+
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    # WAL: las consultas del terapeuta no bloquean al escritor
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# Una partida. log() y end() solo encolan; end() se puede llamar varias veces
+# (cuenta la primera).
+class MetricsSession:
+    def __init__(self, store, game, players=1):
+        self.store = store
+        self.game = game
+        self.id = uuid.uuid4().hex
+        self.started = time.time()
+        self.ended = False
+        store._put(("session", (self.id, store.patient, game, datetime.now().strftime("%Y-%m-%d"),
+                                self.started, players)))
+
+    # position: (x, y) normalizado de la mano o None
+    def log(self, kind, player=0, position=None, value=None):
+        x, y = position if position else (None, None)
+        self.store._put(("event", (self.id, time.time(), kind, player, x, y, value)))
+
+    # summary: resultado de kinematics.KinematicsStream.summary() de un jugador
+    def kinematics(self, player, summary):
+        self.store._put(("kinematics", (self.id, player, summary["path_length"], summary["active_time"],
+                                        summary["mean_velocity"], summary["peak_velocity"],
+                                        summary["smoothness"], summary["tremor_hz"], summary["tremor_ratio"])))
+
+    def end(self, score, level, duration=None):
+        if self.ended:
+            return
+        self.ended = True
+        now = time.time()
+        duration = now - self.started if duration is None else duration
+        self.store._put(("end", (now, duration, score, level, self.id)))
+        with self.store._lock:
+            if score > self.store.high_scores.get(self.game, 0):
+                self.store.high_scores[self.game] = score
+
+
+# Almacén SQLite de las métricas de un paciente. Con path=None queda
+# desactivado (no escribe nada), como FrameProfiler(enabled=False).
+class MetricsStore:
+    def __init__(self, path=None, patient="invitado", flush_interval=1.0, batch_size=500):
+        self.path = path
+        self.patient = patient
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.enabled = path is not None
+        self.high_scores = {}
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._ready = threading.Event()
+        self._thread = None
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+            self._thread.start()
+        else:
+            self._ready.set()
+
+    def _put(self, item):
+        if self.enabled:
+            self._queue.put(item)
+
+    def start_session(self, game, players=1):
+        return MetricsSession(self, game, players)
+
+    # Récord del paciente en el juego; solo espera la primera lectura de la base
+    # (se hace al abrirla, en el hilo escritor)
+    def high_score(self, game, timeout=1.0):
+        self._ready.wait(timeout)
+        with self._lock:
+            return self.high_scores.get(game, 0)
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            conn = connect(self.path)
+            rows = conn.execute("SELECT game, MAX(score) FROM sessions WHERE patient = ? GROUP BY game",
+                                (self.patient,)).fetchall()
+            with self._lock:
+                for game, score in rows:
+                    self.high_scores[game] = max(score or 0, self.high_scores.get(game, 0))
+        except sqlite3.Error as e:
+            print(f"Aviso: no se pudo abrir la base de métricas ({e})")
+            self.enabled = False
+            self._ready.set()
+            return
+        self._ready.set()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Juntar lo que llegue durante flush_interval en una sola transacción
+            deadline = time.perf_counter() + self.flush_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+            self._write(conn, batch)
+        conn.close()
+
+    def _write(self, conn, batch):
+        sessions = [row for kind, row in batch if kind == "session"]
+        events = [row for kind, row in batch if kind == "event"]
+        ends = [row for kind, row in batch if kind == "end"]
+        motion = [row for kind, row in batch if kind == "kinematics"]
+        try:
+            with conn:
+                conn.executemany("INSERT INTO sessions (id, patient, game, day, started, players) "
+                                 "VALUES (?, ?, ?, ?, ?, ?)", sessions)
+                conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", events)
+                conn.executemany("INSERT INTO kinematics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", motion)
+                conn.executemany("UPDATE sessions SET ended = ?, duration = ?, score = ?, level = ? "
+                                 "WHERE id = ?", ends)
+        except sqlite3.Error as e:
+            # Un error de disco no debe tumbar el juego: se descarta el lote
+            self.errors += 1
+            if self.errors == 1:
+                print(f"Aviso: no se pudieron guardar las métricas ({e})")
+
+
+# Consultas de resumen (abren su propia conexión: se pueden usar con el juego
+# abierto)
+def daily_summary(path, patient, game=None):
+    conn = connect(path)
+    try:
+        return [dict(row) for row in conn.execute(DAILY_QUERY, {"patient": patient, "game": game})]
+    finally:
+        conn.close()
+
+
+def patients(path):
+    conn = connect(path)
+    try:
+        return [dict(row) for row in conn.execute(PATIENTS_QUERY)]
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resumen de las métricas guardadas por paciente y día")
+    parser.add_argument("--db", default="neurogame.db", help="base de datos de métricas")
+    parser.add_argument("--patient", help="paciente a resumir (sin él se listan los pacientes)")
+    parser.add_argument("--game", choices=["blocks", "snake"])
+    args = parser.parse_args(argv)
+    if not args.patient:
+        print(f'{"paciente":<20}{"sesiones":>10}{"minutos":>10}  {"desde":<12}{"hasta":<12}')
+        for row in patients(args.db):
+            print(f'{row["patient"]:<20}{row["sessions"]:>10}{row["minutes"]:>10.1f}  '
+                  f'{row["first_day"]:<12}{row["last_day"]:<12}')
+        return 0
+    print(f'{"día":<12}{"juego":<8}{"sesiones":>9}{"minutos":>9}{"récord":>8}{"media":>8}{"nivel":>7}'
+          f'{"agarres":>9}{"caídas":>8}{"torre":>7}{"comidas":>9}{"choques":>9}'
+          f'{"vel. media":>11}{"vel. pico":>10}{"suavidad":>9}{"temblor Hz":>11}')
+    for row in daily_summary(args.db, args.patient, args.game):
+        print(f'{row["day"]:<12}{row["game"]:<8}{row["sessions"]:>9}{row["minutes"]:>9.1f}'
+              f'{row["best"] or 0:>8}{row["mean_score"] or 0:>8.1f}{row["level"] or 0:>7}'
+              f'{row["grabs"]:>9}{row["drops"]:>8}{row["placements"]:>7}{row["eats"]:>9}{row["deaths"]:>9}'
+              f'{row["mean_velocity"] or 0:>11.3f}{row["peak_velocity"] or 0:>10.3f}'
+              f'{row["smoothness"] or 0:>9.2f}{row["tremor_hz"] or 0:>11.1f}')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import time
+
+from simulation import TICK_RATE
+
+# Límites del modo de bajo consumo (portátiles a batería)
+LOW_POWER = {"render_rate": 30, "inference_rate": 15, "particles": 0.5}
+
+
+# Duerme hasta `deadline` (time.perf_counter): el sleep del sistema cubre casi
+# todo y los últimos `spin` segundos se esperan activamente, porque el sleep
+# puede despertar tarde. Con spin=0 solo se duerme.
+def sleep_until(deadline, spin=0.001):
+    remaining = deadline - time.perf_counter()
+    if remaining > spin:
+        time.sleep(remaining - spin)
+    while time.perf_counter() < deadline:
+        pass
+
+
+# Ritmo de los bucles de juego. La lógica avanza a paso fijo (logic_rate, ver
+# simulation.FixedTimestep), el dibujo a render_rate y el seguimiento de la mano
+# a inference_rate (None: lo que dé la cámara), cada uno por su lado. wait()
+# cierra cada frame: mide cuánto tardó el trabajo y duerme hasta el siguiente.
+# Si el trabajo no entra en el presupuesto durante `patience` frames seguidos se
+# degrada la calidad, primero con menos partículas y después con menos FPS de
+# dibujo; cuando vuelve a sobrar tiempo se recupera en orden inverso.
+class FramePacer:
+    def __init__(self, render_rate=60, logic_rate=TICK_RATE, inference_rate=None, min_render_rate=20,
+                 min_particles=0.25, spin=0.001, patience=30, low_power=False):
+        self.target_render_rate = render_rate
+        self.logic_rate = logic_rate
+        self.target_inference_rate = inference_rate
+        self.min_render_rate = min_render_rate
+        self.min_particles = min_particles
+        self.target_spin = spin
+        self.patience = patience
+        # Sin tiempo real (reproducción con --fast) no se duerme ni se degrada
+        self.realtime = True
+        self.set_low_power(low_power)
+
+    def set_low_power(self, enabled):
+        self.low_power = enabled
+        if enabled:
+            self.max_render_rate = min(self.target_render_rate, LOW_POWER["render_rate"])
+            self.max_particles = LOW_POWER["particles"]
+            self.inference_rate = min(self.target_inference_rate or LOW_POWER["inference_rate"],
+                                      LOW_POWER["inference_rate"])
+            # Sin espera activa: el procesador duerme todo lo posible
+            self.spin = 0.0
+        else:
+            self.max_render_rate = self.target_render_rate
+            self.max_particles = 1.0
+            self.inference_rate = self.target_inference_rate
+            self.spin = self.target_spin
+        self.reset()
+
+    # Segundos mínimos entre inferencias (HandTracker.interval); 0 sin límite
+    @property
+    def inference_interval(self):
+        return 1.0 / self.inference_rate if self.inference_rate else 0.0
+
+    def reset(self):
+        self.render_rate = self.max_render_rate
+        # Fracción del presupuesto de partículas (ParticleSystem.budget)
+        self.particles = self.max_particles
+        self.work = None
+        self.degradations = 0
+        self._over = 0
+        self._under = 0
+        self.start()
+
+    # Al empezar un bucle o volver de una pantalla que lo detuvo: el tiempo
+    # transcurrido no cuenta como trabajo ni como atraso
+    def start(self, realtime=None):
+        if realtime is not None:
+            self.realtime = realtime
+        self._deadline = None
+        self._frame_start = time.perf_counter()
+
+    # rate: otro ritmo para este frame (menús); esos frames no se miden
+    def wait(self, rate=None):
+        now = time.perf_counter()
+        if not self.realtime:
+            self._frame_start = now
+            return
+        if rate is None:
+            self._adapt(now - self._frame_start)
+        period = 1.0 / (rate or self.render_rate)
+        deadline = (self._deadline or self._frame_start) + period
+        if deadline < now:
+            # Atrasado: empezar de nuevo desde ahora en lugar de acumular la deuda
+            deadline = now
+        else:
+            sleep_until(deadline, self.spin)
+        self._deadline = deadline
+        self._frame_start = time.perf_counter()
+
+    def _adapt(self, work):
+        self.work = work if self.work is None else self.work + 0.1 * (work - self.work)
+        if self.work > 0.95 / self.render_rate:
+            self._under = 0
+            self._over += 1
+            if self._over >= self.patience:
+                self._over = 0
+                self._degrade()
+        elif self.work < 0.6 / self._upgrade_rate():
+            self._over = 0
+            self._under += 1
+            # Se recupera más despacio de lo que se degrada, para no oscilar
+            if self._under >= 4 * self.patience:
+                self._under = 0
+                self._recover()
+        else:
+            self._over = 0
+            self._under = 0
+
+    def _upgrade_rate(self):
+        return min(self.max_render_rate, round(self.render_rate * 4 / 3))
+
+    def _degrade(self):
+        if self.particles > self.min_particles:
+            self.particles = max(self.min_particles, self.particles / 2)
+        elif self.render_rate > self.min_render_rate:
+            self.render_rate = max(self.min_render_rate, round(self.render_rate * 3 / 4))
+        else:
+            return
+        self.degradations += 1
+
+    def _recover(self):
+        if self.render_rate < self.max_render_rate:
+            self.render_rate = self._upgrade_rate()
+        elif self.particles < self.max_particles:
+            self.particles = min(self.max_particles, self.particles * 2)
+
+    def particle_budget(self, capacity):
+        return int(capacity * self.particles)
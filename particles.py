@@ -0,0 +1,110 @@
+import numpy as np
+import pygame
+from pygame import gfxdraw
+
+
+# Sistema de partículas vectorizado: todas las partículas viven en arreglos
+# NumPy preasignados (estructura de arreglos) y se actualizan en un solo paso.
+# Las partículas vivas ocupan siempre las primeras `count` posiciones. budget
+# limita cuántas pueden estar vivas a la vez (pacing.FramePacer lo baja cuando
+# los frames no entran en su presupuesto); las que no caben no se emiten.
+class ParticleSystem:
+    ALPHA_LEVELS = 16
+
+    def __init__(self, capacity=4096, gravity=0.1, shrink=0.95):
+        self.capacity = capacity
+        self.gravity = gravity
+        self.shrink = shrink
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.lifetime = np.ones(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.int32)  # índice en la paleta
+        self.count = 0
+        self.budget = capacity
+        self._palette = {}
+        self._colors = []
+        self._sprites = {}
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def _color_index(self, color):
+        color = tuple(color[:3])
+        if color not in self._palette:
+            self._palette[color] = len(self._colors)
+            self._colors.append(color)
+        return self._palette[color]
+
+    # Emite `count` partículas desde (x, y). speed: velocidad máxima por eje
+    # (uniforme en [-speed, speed]); lifetime: entero o rango (min, max);
+    # spread: ancho y alto del área de origen a partir de (x, y).
+    def emit(self, count, x, y, color, speed=0.0, lifetime=(20, 40), spread=(0, 0)):
+        count = min(count, min(self.budget, self.capacity) - self.count)
+        if count <= 0:
+            return
+        s = slice(self.count, self.count + count)
+        self.pos[s, 0] = x + np.random.randint(0, spread[0] + 1, count)
+        self.pos[s, 1] = y + np.random.randint(0, spread[1] + 1, count)
+        self.vel[s] = np.random.uniform(-speed, speed, (count, 2))
+        self.age[s] = 0
+        if isinstance(lifetime, tuple):
+            self.lifetime[s] = np.random.randint(lifetime[0], lifetime[1] + 1, count)
+        else:
+            self.lifetime[s] = lifetime
+        self.size[s] = np.random.randint(3, 9, count)
+        self.color[s] = self._color_index(color)
+        self.count += count
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        self.pos[:n] += self.vel[:n]
+        self.vel[:n, 1] += self.gravity
+        self.age[:n] += 1
+        self.size[:n] *= self.shrink
+        alive = self.age[:n] < self.lifetime[:n]
+        if alive.all():
+            return
+        # Compactar las vivas al principio en O(n)
+        keep = np.flatnonzero(alive)
+        k = len(keep)
+        for array in (self.pos, self.vel, self.age, self.lifetime, self.size, self.color):
+            array[:k] = array[keep]
+        self.count = k
+
+    def _sprite(self, key):
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            rest, level = divmod(key, self.ALPHA_LEVELS)
+            radius, color_index = divmod(rest, 1024)
+            color = self._colors[color_index]
+            alpha = min(255, (level + 1) * 256 // self.ALPHA_LEVELS)
+            sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+            gfxdraw.filled_circle(sprite, radius, radius, radius, (*color, alpha))
+            self._sprites[key] = sprite
+        return sprite
+
+    # Dibujo por lotes: cada partícula se cuantiza a (radio, color, nivel de
+    # alfa), se reutiliza un sprite precalculado y todo se envía en un solo
+    # blits(). Devuelve el rectángulo que envuelve a todas las partículas.
+    def draw(self, surface):
+        n = self.count
+        if not n:
+            return None
+        radius = self.size[:n].astype(np.int32)
+        fade = 1.0 - self.age[:n] / self.lifetime[:n]
+        level = np.clip((fade * self.ALPHA_LEVELS).astype(np.int32), 0, self.ALPHA_LEVELS - 1)
+        keys = (radius * 1024 + self.color[:n]) * self.ALPHA_LEVELS + level
+        corners = (self.pos[:n] - radius[:, None]).astype(np.int32)
+        sprite = self._sprite
+        surface.blits([(sprite(key), (x, y)) for key, (x, y) in zip(keys.tolist(), corners.tolist())],
+                      doreturn=False)
+        left, top = corners.min(axis=0).tolist()
+        right, bottom = (corners + 2 * radius[:, None] + 1).max(axis=0).tolist()
+        return pygame.Rect(left, top, right - left, bottom - top)
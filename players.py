@@ -0,0 +1,77 @@
+import math
+
+import numpy as np
+
+
+# Colores de cada jugador (cursor, serpiente y marcador)
+PLAYER_COLORS = [(0, 255, 0), (255, 140, 0), (0, 200, 255), (255, 0, 200)]
+
+# Muñeca y bases de los dedos: el centro de la palma se mueve menos que la punta
+PALM_POINTS = np.array([0, 5, 9, 13, 17])
+
+
+def palm_center(hand):
+    x, y = hand.points[PALM_POINTS, :2].mean(axis=0)
+    return float(x), float(y)
+
+
+# Identidad estable de cada mano entre frames. Cada jugador conserva la última
+# posición de su palma y su lateralidad ("Left"/"Right" de MediaPipe); en cada
+# frame las detecciones se reparten por cercanía (con penalización si la
+# lateralidad no coincide). Un jugador que pierde la mano conserva su lugar
+# durante `timeout` segundos para recuperarla al volver a aparecer cerca.
+class HandAssigner:
+    def __init__(self, players, max_distance=0.25, handedness_penalty=0.1, timeout=2.0):
+        self.players = players
+        self.max_distance = max_distance
+        self.handedness_penalty = handedness_penalty
+        self.timeout = timeout
+        self.reset()
+
+    def reset(self):
+        # Por jugador: (x, y, lateralidad, último instante visto) o None
+        self.tracks = [None] * self.players
+        self.slots = [None] * self.players
+
+    def _cost(self, track, center, label):
+        cost = math.hypot(center[0] - track[0], center[1] - track[1])
+        if label and track[2] and label != track[2]:
+            cost += self.handedness_penalty
+        return cost
+
+    # hands: manos detectadas; handedness: etiquetas en el mismo orden (o None).
+    # Devuelve una lista de longitud `players` con la mano de cada jugador o None.
+    def assign(self, hands, handedness, t):
+        labels = list(handedness or []) + [None] * (len(hands) - len(handedness or []))
+        centers = [palm_center(hand) for hand in hands]
+        for player, track in enumerate(self.tracks):
+            if track is not None and t - track[3] > self.timeout:
+                self.tracks[player] = None
+        pairs = sorted(
+            (self._cost(track, center, label), player, index)
+            for player, track in enumerate(self.tracks) if track is not None
+            for index, (center, label) in enumerate(zip(centers, labels))
+        )
+        slots = [None] * self.players
+        assigned = {}
+        for cost, player, index in pairs:
+            if cost > self.max_distance or player in assigned or index in assigned.values():
+                continue
+            assigned[player] = index
+        # Manos nuevas: primero a jugadores sin rastro reciente, luego a los que
+        # solo la perdieron hace poco (prefiriendo la misma lateralidad)
+        for index, label in enumerate(labels):
+            if index in assigned.values():
+                continue
+            free = [p for p in range(self.players) if p not in assigned]
+            if not free:
+                break
+            player = min(free, key=lambda p: (self.tracks[p] is not None,
+                                              self.tracks[p] is not None and self.tracks[p][2] != label, p))
+            assigned[player] = index
+        for player, index in assigned.items():
+            center = centers[index]
+            self.tracks[player] = (center[0], center[1], labels[index], t)
+            slots[player] = hands[index]
+        self.slots = slots
+        return slots
@@ -0,0 +1,212 @@
+import csv
+import json
+import math
+import time
+
+import numpy as np
+import pygame
+
+from fonts import get_font
+
+
+# Histograma de toda la sesión en escala logarítmica: 20 intervalos por década
+# desde 0.01 ms hasta 10 s. Alcanza para p50/p95/p99 con ~12% de error sin
+# guardar cada muestra.
+BINS_PER_DECADE = 20
+MIN_MS = 0.01
+NUM_BINS = 6 * BINS_PER_DECADE + 2
+BIN_UPPER_MS = MIN_MS * 10 ** (np.arange(NUM_BINS) / BINS_PER_DECADE)
+PERCENTILES = (50, 95, 99)
+
+
+# Tiempos de una etapa: ventana circular de las últimas muestras (para el
+# overlay) y el histograma acumulado (para exportar)
+class StageStats:
+    __slots__ = ("samples", "index", "count", "total", "maximum", "histogram")
+
+    def __init__(self, window):
+        self.samples = np.zeros(window, dtype=np.float32)
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.histogram = np.zeros(NUM_BINS, dtype=np.int64)
+
+    def add(self, ms):
+        self.samples[self.index] = ms
+        self.index = (self.index + 1) % len(self.samples)
+        self.count += 1
+        self.total += ms
+        if ms > self.maximum:
+            self.maximum = ms
+        if ms <= MIN_MS:
+            self.histogram[0] += 1
+        else:
+            self.histogram[min(NUM_BINS - 1, int(math.log10(ms / MIN_MS) * BINS_PER_DECADE) + 1)] += 1
+
+    # Percentiles de la ventana reciente
+    def recent(self):
+        filled = self.samples[:min(self.count, len(self.samples))]
+        if not len(filled):
+            return (0.0,) * len(PERCENTILES)
+        return tuple(float(value) for value in np.percentile(filled, PERCENTILES))
+
+    # Percentiles de toda la sesión (cota superior del intervalo)
+    def overall(self):
+        if not self.count:
+            return (0.0,) * len(PERCENTILES)
+        cumulative = np.cumsum(self.histogram)
+        indexes = np.searchsorted(cumulative, [self.count * p / 100.0 for p in PERCENTILES])
+        return tuple(min(float(BIN_UPPER_MS[i]), self.maximum) for i in indexes)
+
+
+class _Timer:
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add((time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+# Perfilador por etapas del bucle de juego:
+#     with profiler.stage("logic"):
+#         ...
+# Cada etapa debe medirse siempre desde el mismo hilo (las del hilo de captura
+# y las del bucle principal tienen nombres distintos). Desactivado, stage()
+# devuelve un contexto vacío y no mide nada.
+class FrameProfiler:
+    def __init__(self, window=300, budget=1.0 / 60, enabled=True):
+        self.window = window
+        self.budget_ms = budget * 1000.0
+        self.enabled = enabled
+        self.show_overlay = False
+        self.reset()
+
+    def reset(self):
+        self.stages = {}
+        self.timers = {}
+        self.frames = 0
+        self.missed = 0
+        self.frame_start = None
+        self._overlay = None
+        self._overlay_frame = -1
+
+    def _stats(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(self.window)
+        return stats
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_TIMER
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = _Timer(self._stats(name))
+        return timer
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self._stats(name).add(seconds * 1000.0)
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter() if self.enabled else None
+
+    # Cierra el frame: el tiempo total de trabajo (sin la espera de
+    # pacer.wait) se compara con el presupuesto
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        ms = (time.perf_counter() - self.frame_start) * 1000.0
+        self.frame_start = None
+        self._stats("frame").add(ms)
+        self.frames += 1
+        if ms > self.budget_ms:
+            self.missed += 1
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            self.enabled = True
+        return self.show_overlay
+
+    def summary(self):
+        stages = {}
+        for name, stats in list(self.stages.items()):
+            p50, p95, p99 = stats.overall()
+            stages[name] = {
+                "count": stats.count,
+                "mean_ms": stats.total / stats.count if stats.count else 0.0,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "max_ms": stats.maximum,
+            }
+        return {"frames": self.frames, "missed": self.missed, "budget_ms": self.budget_ms, "stages": stages}
+
+    # Exporta el resumen a .json o .csv (según la extensión)
+    def export(self, path):
+        summary = self.summary()
+        if str(path).lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+                for name, row in summary["stages"].items():
+                    writer.writerow([name, row["count"]] + [f'{row[key]:.3f}' for key in
+                                                            ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")])
+                writer.writerow(["missed_frames", summary["missed"], "", "", "", "", ""])
+        else:
+            with open(path, "w") as f:
+                json.dump(summary, f, indent=2)
+
+    # Overlay con p50/p95/p99 recientes por etapa. Los textos se rehacen cada
+    # medio segundo para no gastar en el overlay lo que se intenta medir.
+    def draw(self, surface, position=None, refresh=30):
+        if not self.show_overlay:
+            return None
+        if self._overlay is None or self.frames - self._overlay_frame >= refresh:
+            self._overlay = self._render_overlay()
+            self._overlay_frame = self.frames
+        if position is None:
+            position = (surface.get_width() - self._overlay.get_width() - 10, 10)
+        return surface.blit(self._overlay, position)
+
+    def _render_overlay(self):
+        lines = [f'{"etapa":<14}{"p50":>7}{"p95":>7}{"p99":>7} ms']
+        for name, stats in list(self.stages.items()):
+            p50, p95, p99 = stats.recent()
+            lines.append(f'{name:<14}{p50:7.2f}{p95:7.2f}{p99:7.2f}')
+        lines.append(f'fuera de presupuesto: {self.missed}/{self.frames}')
+        # Sin pasar por la caché de textos: los números cambian en cada refresco
+        font = get_font(16, name="Courier New")
+        texts = [font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(text.get_width() for text in texts) + 16
+        height = sum(text.get_height() for text in texts) + 12
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 180))
+        y = 6
+        for text in texts:
+            overlay.blit(text, (8, y))
+            y += text.get_height()
+        return overlay
@@ -0,0 +1,167 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from landmarks import NUM_LANDMARKS, DIMS, hand_frame
+
+
+# Formato binario de sesión (.lmk):
+#   cabecera de 64 bytes (HEADER_DTYPE) seguida de registros de tamaño fijo
+#   (RECORD_DTYPE): t en float64 y [x0, y0, z0, ..., x20, y20, z20] en float32
+#   (260 bytes). t son segundos desde start_time; en float64 conservan la
+#   precisión aunque el archivo acumule sesiones de semanas. Los frames sin
+#   mano se guardan con NaN.
+# Al ser registros fijos el archivo solo crece por el final y se puede abrir con
+# np.memmap sin copiar nada, aunque contenga horas de sesiones. La versión 1
+# guardaba t en float32 (256 bytes por registro); se sigue pudiendo leer.
+MAGIC = b"NGLMK\x00\x00\x00"
+VERSION = 2
+RECORD_FLOATS = 1 + NUM_LANDMARKS * DIMS
+RECORD_DTYPE = np.dtype([("t", "<f8"), ("points", "<f4", (NUM_LANDMARKS, DIMS))])
+RECORD_DTYPES = {1: np.dtype([("t", "<f4"), ("points", "<f4", (NUM_LANDMARKS, DIMS))]), 2: RECORD_DTYPE}
+HEADER_SIZE = 64
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("num_landmarks", "<u4"),
+    ("dims", "<u4"),
+    ("record_floats", "<u4"),
+    ("start_time", "<f8"),
+    ("reserved", "V32"),
+])
+
+
+def landmarks_to_array(hand_landmarks):
+    if hand_landmarks is None:
+        return np.full((NUM_LANDMARKS, DIMS), np.nan, dtype=np.float32)
+    return hand_frame(hand_landmarks).points
+
+
+def _read_header(f):
+    header = np.frombuffer(f.read(HEADER_SIZE), dtype=HEADER_DTYPE, count=1)[0]
+    if (header["magic"] != MAGIC.rstrip(b"\x00") or header["record_floats"] != RECORD_FLOATS
+            or int(header["version"]) not in RECORD_DTYPES):
+        raise ValueError("Formato de sesión no reconocido")
+    return header
+
+
+def _header(start_time):
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["num_landmarks"] = NUM_LANDMARKS
+    header["dims"] = DIMS
+    header["record_floats"] = RECORD_FLOATS
+    header["start_time"] = start_time
+    return header.tobytes()
+
+
+# Reescribe una sesión de una versión anterior en el formato actual (antes de
+# seguir grabando en ella: los registros de un archivo son todos iguales)
+def _upgrade(path):
+    reader = SessionReader(path)
+    if reader.version == VERSION:
+        return
+    records = np.empty(len(reader), dtype=RECORD_DTYPE)
+    records["t"] = reader.timestamps
+    records["points"] = reader.landmarks
+    start_time = reader.start_time
+    del reader
+    with open(path + ".tmp", "wb") as f:
+        f.write(_header(start_time))
+        f.write(records.tobytes())
+    os.replace(path + ".tmp", path)
+
+
+# Grabador de sesiones: write() solo encola el registro, un hilo aparte lo
+# escribe en disco por lotes para no frenar nunca el bucle de juego
+class SessionRecorder:
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._clock_origin = time.perf_counter()
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE:
+            # Continuar una sesión existente respetando su start_time
+            _upgrade(path)
+            with open(path, "rb") as f:
+                header = _read_header(f)
+            self.start_time = float(header["start_time"])
+            self._clock_origin -= time.time() - self.start_time
+            self._file = open(path, "ab")
+            # Descartar un registro incompleto si el proceso anterior se cortó
+            size = os.path.getsize(path)
+            self._file.truncate(HEADER_SIZE + (size - HEADER_SIZE) // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize)
+        else:
+            self.start_time = time.time()
+            self._file = open(path, "wb")
+            self._file.write(_header(self.start_time))
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+
+    # timestamp en la escala de time.perf_counter()
+    def write(self, timestamp, hand_landmarks):
+        record = np.empty(1, dtype=RECORD_DTYPE)
+        record["t"] = timestamp - self._clock_origin
+        record["points"] = landmarks_to_array(hand_landmarks)
+        self._queue.put(record)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+    def _run(self):
+        last_flush = time.perf_counter()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if any(record is None for record in batch):
+                running = False
+                batch = [record for record in batch if record is not None]
+            if batch:
+                self._file.write(np.concatenate(batch).tobytes())
+            now = time.perf_counter()
+            if not running or now - last_flush >= self.flush_interval:
+                self._file.flush()
+                last_flush = now
+
+
+# Lectura sin copias: records, timestamps y landmarks son vistas sobre un memmap
+class SessionReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = _read_header(f)
+        self.start_time = float(header["start_time"])
+        self.version = int(header["version"])
+        dtype = RECORD_DTYPES[self.version]
+        count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        return self.records["t"]
+
+    @property
+    def landmarks(self):
+        return self.records["points"]
+
+    # Máscara de los frames en los que había una mano
+    @property
+    def detected(self):
+        return ~np.isnan(self.records["points"][:, 0, 0])
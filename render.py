@@ -0,0 +1,89 @@
+import cv2
+import numpy as np
+import pygame
+
+
+# Presentación por rectángulos sucios. Cada capa (fondo, objetos, HUD) anota
+# las zonas que cambió en el frame; present() actualiza en pantalla solo esas
+# zonas más las del frame anterior (donde estaban los objetos que se movieron).
+# Con enabled=False, o tras invalidate(), se hace un flip completo como antes.
+# canvas: destino que presenta (canvas.TextureCanvas); None para la ventana de
+# pygame.display.
+class DirtyRenderer:
+    LAYERS = ("background", "objects", "hud")
+
+    def __init__(self, enabled=True, canvas=None):
+        self.enabled = enabled
+        self.canvas = canvas
+        self.full = True
+        self.rects = {layer: [] for layer in self.LAYERS}
+        self.previous = {layer: [] for layer in self.LAYERS}
+
+    # Fuerza un redibujado y flip completos en el próximo frame
+    def invalidate(self):
+        self.full = True
+
+    # True si el frame actual debe redibujarse entero
+    @property
+    def needs_full_redraw(self):
+        return self.full or not self.enabled
+
+    def mark(self, layer, rects):
+        if rects is None:
+            return
+        if isinstance(rects, pygame.Rect):
+            self.rects[layer].append(rects)
+        else:
+            self.rects[layer].extend(r for r in rects if r)
+
+    # Zonas ocupadas por una capa en el frame anterior, para borrarlas
+    def previous_rects(self, layer):
+        return self.previous[layer]
+
+    def present(self):
+        display = self.canvas or pygame.display
+        if self.needs_full_redraw:
+            display.flip()
+            self.full = False
+        else:
+            dirty = []
+            for layer in self.LAYERS:
+                dirty.extend(self.previous[layer])
+                dirty.extend(self.rects[layer])
+            if dirty:
+                display.update(dirty)
+        self.previous, self.rects = self.rects, self.previous
+        for rects in self.rects.values():
+            rects.clear()
+
+
+# Espera bloqueando hasta el siguiente evento (o hasta timeout ms) y devuelve
+# los eventos pendientes. Las pantallas estáticas la usan para no redibujar
+# nada mientras no ocurra algo.
+def wait_events(timeout=0):
+    event = pygame.event.wait(timeout) if timeout else pygame.event.wait()
+    events = [event] if event.type != pygame.NOEVENT else []
+    events.extend(pygame.event.get())
+    return events
+
+
+# Eventos que obligan a volver a pintar una pantalla estática
+REDRAW_EVENTS = {pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED,
+                 pygame.WINDOWSIZECHANGED}
+
+
+# Fondo de cámara persistente: la superficie comparte memoria con un arreglo
+# preasignado y cada frame RGB se redimensiona directamente sobre él, sin crear
+# buffers ni superficies nuevas en cada vuelta del bucle
+class CameraSurface:
+    def __init__(self, size):
+        self.size = size
+        self.array = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self.array, size, "RGB")
+
+    def update(self, frame_rgb):
+        if frame_rgb.shape == self.array.shape:
+            np.copyto(self.array, frame_rgb)
+        else:
+            cv2.resize(frame_rgb, self.size, dst=self.array, interpolation=cv2.INTER_LINEAR)
+        return self.surface
@@ -0,0 +1,442 @@
+import argparse
+import json
+import math
+import random
+import time
+from collections import deque
+
+# Lógica pura de ambos juegos, sin pygame, ventana ni cámara. Cada juego avanza
+# con step() en pasos de tiempo fijos a partir de una entrada (posición de la
+# mano o dirección) y devuelve la lista de eventos del paso, que el bucle con
+# gráficos usa para sonidos y partículas. Así se pueden simular miles de
+# sesiones para ajustar la dificultad o comprobar regresiones.
+
+WIDTH, HEIGHT = 1280, 720
+SCREEN_WIDTH, SCREEN_HEIGHT = 1024, 768  # Para Torre de Bloques
+TOWER_X = SCREEN_WIDTH // 2 - 40
+TOWER_Y = SCREEN_HEIGHT // 2
+CELL = 20
+TICK_RATE = 60
+BLOCK_COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255)]
+
+
+# Acumulador de paso fijo: convierte el tiempo real transcurrido en un número
+# entero de pasos de simulación; alpha es la fracción sobrante para interpolar
+class FixedTimestep:
+    def __init__(self, rate=TICK_RATE, max_steps=5):
+        self.dt = 1.0 / rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, elapsed):
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            # La máquina no da abasto: descartar el atraso en lugar de acumularlo
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.dt
+
+
+# Torre de Bloques
+class BlockState:
+    def __init__(self, width=80, height=30, color=None):
+        self.width = width
+        self.height = height
+        self.spawn_position(width, height)
+        self.color = color if color else random.choice(BLOCK_COLORS)
+        self.grabbed = False
+        self.attempts = 0
+        self.rotation = 0
+        self.target_rotation = 0
+        self.scale = 1.0
+        self.target_scale = 1.0
+
+    def spawn_position(self, width, height):
+        while True:
+            x = random.randint(50, SCREEN_WIDTH - 50 - width)
+            y = random.randint(50, SCREEN_HEIGHT // 2 - 50)
+            distance_to_tower = math.sqrt((x - TOWER_X)**2 + (y - TOWER_Y)**2)
+            if distance_to_tower > 200:
+                break
+        self.x = x
+        self.y = y
+
+    def update(self):
+        self.rotation += (self.target_rotation - self.rotation) * 0.1
+        self.scale += (self.target_scale - self.scale) * 0.1
+
+    def is_over(self, pos):
+        return (self.x <= pos[0] <= self.x + self.width and
+                self.y <= pos[1] <= self.y + self.height)
+
+
+class BlocksGame:
+    def __init__(self, block_factory=BlockState, block_width_decrease=5, max_level=10, tower_limit=200):
+        self.block_factory = block_factory
+        self.block_width_decrease = block_width_decrease
+        self.max_level = max_level
+        self.max_tower_height = TOWER_Y - tower_limit
+        self.high_score = 0
+        self.reset()
+
+    def reset(self):
+        self.current_block = self.block_factory()
+        self.tower = []
+        self.tower_height = TOWER_Y
+        self.game_over = False
+        self.score = 0
+        self.level = 1
+        self.elapsed = 0.0
+        self.steps = 0
+
+    def block_width(self):
+        return max(30, 80 - (self.level-1)*self.block_width_decrease)
+
+    # hand: posición (x, y) del cursor en píxeles, o None si no hay mano.
+    # grip: si la pinza está cerrada (gestures.GestureEngine); con grip el bloque
+    # solo se agarra cerrando la pinza sobre él y se suelta al abrirla. Sin grip
+    # (None) basta con pasar el dedo por encima.
+    def step(self, hand, dt=1.0 / TICK_RATE, grip=None):
+        events = []
+        self.steps += 1
+        if not self.game_over:
+            self.elapsed += dt
+        block = self.current_block
+        if not self.game_over and hand is not None:
+            hand_x, hand_y = hand
+            if grip is None:
+                holding = block.is_over((hand_x, hand_y)) or block.grabbed
+            else:
+                holding = grip and (block.grabbed or block.is_over((hand_x, hand_y)))
+            if holding:
+                if not block.grabbed:
+                    block.grabbed = True
+                    block.target_rotation = random.uniform(-10, 10)
+                    block.target_scale = 1.1
+                    events.append(("grab", block))
+                block.x = hand_x - block.width//2
+                block.y = hand_y - block.height//2
+                if (abs(block.x + block.width/2 - (TOWER_X + block.width/2)) <= 20 and
+                        abs(block.y - (self.tower_height - block.height)) <= 10):
+                    self._place(block, events)
+            elif block.grabbed:
+                block.grabbed = False
+                block.attempts += 1
+                block.target_rotation = 0
+                block.target_scale = 1.0
+                events.append(("drop", block))
+        self.current_block.update()
+        return events
+
+    def _place(self, block, events):
+        self.tower.append(block)
+        self.tower_height -= block.height
+        self.score += max(1, 5 - block.attempts)
+        events.append(("place", block))
+        for placed in self.tower:
+            placed.y += 5
+        block.grabbed = False
+        if self.tower_height <= self.max_tower_height:
+            self.level += 1
+            if self.level > self.max_level:
+                self.game_over = True
+                self.high_score = max(self.high_score, self.score)
+                events.append(("game_over", self.score))
+            else:
+                self.tower_height = TOWER_Y
+                self.tower = []
+                events.append(("level_up", self.level))
+        self.current_block = self.block_factory(self.block_width())
+        self.current_block.grabbed = False
+
+
+# Celdas donde puede aparecer comida (cuadrícula de 20 px sin el borde)
+FOOD_CELLS = [(x, y) for x in range(CELL, WIDTH-CELL, CELL) for y in range(CELL, HEIGHT-CELL, CELL)]
+
+
+# Conjunto indexable de celdas libres: las libres ocupan las primeras `size`
+# posiciones de `cells` y `index` guarda dónde está cada celda, así que marcar
+# una celda como ocupada/libre (intercambio con la última libre) y elegir una
+# al azar cuestan O(1)
+class FreeCells:
+    def __init__(self, cells):
+        self.cells = list(cells)
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+        self.size = len(self.cells)
+
+    def __len__(self):
+        return self.size
+
+    def _swap(self, i, j):
+        a, b = self.cells[i], self.cells[j]
+        self.cells[i], self.cells[j] = b, a
+        self.index[a], self.index[b] = j, i
+
+    def discard(self, cell):
+        i = self.index.get(cell)
+        if i is not None and i < self.size:
+            self.size -= 1
+            self._swap(i, self.size)
+
+    def add(self, cell):
+        i = self.index.get(cell)
+        if i is not None and i >= self.size:
+            self._swap(i, self.size)
+            self.size += 1
+
+    def choice(self):
+        return self.cells[random.randrange(self.size)] if self.size else None
+
+
+# Snake
+class SnakeState:
+    # start: celda inicial de la cabeza (por defecto el centro)
+    def __init__(self, start=None):
+        self.start = start or (WIDTH//2, HEIGHT//2)
+        self.reset()
+
+    def reset(self):
+        self.positions = deque([self.start])
+        # Ocupación mantenida junto al deque para detectar choques en O(1)
+        self.occupied = set(self.positions)
+        self.free_cells = FreeCells(FOOD_CELLS)
+        for p in self.positions:
+            self.free_cells.discard(p)
+        self.direction = (1, 0)
+        self.last_move = self.direction
+        self.length = 3
+        self.score = 0
+        self.speed = 10
+        self.level = 1
+        self.growth_pending = 0
+
+    def get_head_position(self):
+        return self.positions[0]
+
+    def update(self):
+        head = self.get_head_position()
+        x, y = self.direction
+        new_head = (
+            (head[0] + (x * CELL)) % WIDTH,
+            (head[1] + (y * CELL)) % HEIGHT
+        )
+        if new_head in self.occupied:
+            return False
+        self.last_move = self.direction
+        self.positions.appendleft(new_head)
+        self.occupied.add(new_head)
+        self.free_cells.discard(new_head)
+        if self.growth_pending > 0:
+            self.growth_pending -= 1
+        else:
+            if len(self.positions) > self.length:
+                tail = self.positions.pop()
+                self.occupied.discard(tail)
+                self.free_cells.add(tail)
+        return True
+
+    # Se compara con el último movimiento real: varios cambios entre dos pasos
+    # no pueden hacer que la serpiente se dé la vuelta sobre sí misma
+    def change_direction(self, direction):
+        if (direction[0] * -1, direction[1] * -1) != self.last_move:
+            self.direction = direction
+
+
+class FoodState:
+    # Intentos al azar antes de recorrer todas las celdas libres
+    TRIES = 8
+
+    def __init__(self):
+        self.positions = []
+        # Serpientes que comparten esta comida (varios jugadores en el mismo tablero)
+        self.snakes = []
+
+    # Celda libre para todas las serpientes: se sortea entre las libres de
+    # `snake` (O(1)) descartando las que ocupan las demás; si el tablero está
+    # casi lleno se eligen entre todas las que quedan libres
+    def free_cell(self, snake):
+        others = [other.occupied for other in self.snakes if other is not snake]
+        for _ in range(self.TRIES):
+            cell = snake.free_cells.choice()
+            if cell is None or not any(cell in occupied for occupied in others):
+                return cell
+        free = snake.free_cells
+        cells = [cell for cell in free.cells[:len(free)] if not any(cell in occupied for occupied in others)]
+        return random.choice(cells) if cells else None
+
+    def spawn_food(self, snake):
+        if snake.free_cells and (not self.positions or random.random() < 0.1):
+            cell = self.free_cell(snake)
+            if cell is not None:
+                self.positions.append(cell)
+
+
+# food: comida compartida con otras partidas (varios jugadores en el mismo
+# tablero); si se indica, reset() no la reemplaza
+class SnakeGame:
+    def __init__(self, snake_factory=SnakeState, food_factory=FoodState, level_points=50, food=None):
+        self.food_factory = food_factory
+        self.level_points = level_points
+        self.shared_food = food
+        self.snake = snake_factory()
+        if food is not None:
+            food.snakes.append(self.snake)
+        self.reset()
+
+    def reset(self):
+        self.snake.reset()
+        self.food = self.shared_food if self.shared_food is not None else self.food_factory()
+        self.move_timer = 0.0
+        self.previous_positions = list(self.snake.positions)
+        self.steps = 0
+
+    # Fracción del tiempo hasta el próximo movimiento, para interpolar el dibujo
+    @property
+    def alpha(self):
+        return min(1.0, self.move_timer * self.snake.speed)
+
+    # direction: (dx, dy) indicado por la mano, o None para mantener el rumbo.
+    # La serpiente avanza una celda cada 1/speed segundos.
+    def step(self, direction=None, dt=1.0 / TICK_RATE):
+        events = []
+        self.steps += 1
+        snake = self.snake
+        if direction:
+            snake.change_direction(direction)
+        self.move_timer += dt
+        interval = 1.0 / snake.speed
+        if self.move_timer < interval:
+            return events
+        self.move_timer -= interval
+        self.previous_positions = list(snake.positions)
+        if not snake.update():
+            events.append(("death", (snake.score, snake.level)))
+            return events
+        events.append(("move", self.previous_positions[0]))
+        head_pos = snake.get_head_position()
+        if head_pos in self.food.positions:
+            self.food.positions.remove(head_pos)
+            snake.growth_pending += 1
+            snake.score += 10 * snake.level
+            events.append(("eat", head_pos))
+            if snake.score >= snake.level * self.level_points:
+                snake.level += 1
+                snake.speed += 1
+                events.append(("level_up", snake.level))
+        self.food.spawn_food(snake)
+        return events
+
+
+# Jugadores simulados para las sesiones sin pantalla. Son generadores que
+# producen la entrada de cada paso mirando el estado actual del juego.
+def blocks_player(game, rng, speed=12.0, jitter=4.0):
+    x, y = SCREEN_WIDTH / 2, SCREEN_HEIGHT - 100
+    while True:
+        block = game.current_block
+        if block.grabbed:
+            target = (TOWER_X + block.width / 2, game.tower_height - block.height / 2)
+        else:
+            target = (block.x + block.width / 2, block.y + block.height / 2)
+        dx, dy = target[0] - x, target[1] - y
+        distance = math.hypot(dx, dy)
+        if distance > speed:
+            dx, dy = dx / distance * speed, dy / distance * speed
+        x += dx + rng.gauss(0, jitter)
+        y += dy + rng.gauss(0, jitter)
+        yield (int(x), int(y))
+
+
+def snake_player(game, rng, error_rate=0.02):
+    while True:
+        snake = game.snake
+        head = snake.get_head_position()
+        direction = None
+        if game.food.positions:
+            fx, fy = min(game.food.positions, key=lambda p: abs(p[0] - head[0]) + abs(p[1] - head[1]))
+            if fx != head[0]:
+                direction = (1 if fx > head[0] else -1, 0)
+            elif fy != head[1]:
+                direction = (0, 1 if fy > head[1] else -1)
+        if rng.random() < error_rate:
+            direction = rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+        yield direction
+
+
+# Celdas de salida de cada jugador, repartidas en vertical
+def player_starts(players):
+    return [(WIDTH//2 // CELL * CELL, HEIGHT * (i + 1) // (players + 1) // CELL * CELL) for i in range(players)]
+
+
+# Ejecuta un juego con un flujo de entradas (una por paso) hasta agotar las
+# entradas, llegar a max_steps o terminar la partida
+def run(game, inputs, max_steps=None):
+    events = []
+    for i, value in enumerate(inputs):
+        if max_steps is not None and i >= max_steps:
+            break
+        step_events = game.step(value)
+        events.extend(step_events)
+        if getattr(game, "game_over", False) or any(name == "death" for name, _ in step_events):
+            break
+    return events
+
+
+def simulate_sessions(game_name, sessions, max_steps, seed=0, **params):
+    rng = random.Random(seed)
+    results = []
+    for _ in range(sessions):
+        random.seed(rng.random())
+        if game_name == "blocks":
+            game = BlocksGame(**params)
+            events = run(game, blocks_player(game, rng), max_steps)
+            results.append({"score": game.score, "level": game.level, "completed": game.game_over,
+                            "time": game.elapsed,
+                            "drops": sum(1 for name, _ in events if name == "drop")})
+        else:
+            game = SnakeGame(**params)
+            run(game, snake_player(game, rng), max_steps)
+            results.append({"score": game.snake.score, "level": game.snake.level,
+                            "time": game.steps / TICK_RATE, "length": len(game.snake.positions)})
+    return results
+
+
+def summarize(results):
+    summary = {"sessions": len(results)}
+    for key in results[0]:
+        values = sorted(float(r[key]) for r in results)
+        summary[key] = {"mean": sum(values) / len(values), "p50": values[len(values) // 2],
+                        "min": values[0], "max": values[-1]}
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación sin pantalla para ajustar la dificultad")
+    parser.add_argument("game", choices=["blocks", "snake"])
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--minutes", type=float, default=5, help="duración máxima de cada sesión")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--block-width-decrease", type=int, default=5)
+    parser.add_argument("--max-level", type=int, default=10)
+    parser.add_argument("--level-points", type=int, default=50)
+    args = parser.parse_args(argv)
+    if args.game == "blocks":
+        params = {"block_width_decrease": args.block_width_decrease, "max_level": args.max_level}
+    else:
+        params = {"level_points": args.level_points}
+    start = time.perf_counter()
+    results = simulate_sessions(args.game, args.sessions, int(args.minutes * 60 * TICK_RATE), args.seed, **params)
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+    summary["sessions_per_second"] = args.sessions / elapsed
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
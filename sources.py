@@ -0,0 +1,265 @@
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from landmarks import HandFrame
+from recording import SessionReader
+
+
+# Fuentes de frames intercambiables. Todas imitan la interfaz de
+# cv2.VideoCapture (isOpened/read/release) para que HandTracker pueda usarlas
+# sin distinguir entre cámara real y sesión grabada.
+class FrameSource:
+    # True si la fuente entrega landmarks ya calculados (no hace falta MediaPipe)
+    provides_landmarks = False
+    # True si la fuente debe consumirse frame a frame desde el bucle de juego
+    replay = False
+
+    def __init__(self):
+        self.finished = False
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        return False, None
+
+    def release(self):
+        pass
+
+    # Vuelve a abrir el dispositivo tras un error; False si no se puede
+    def reopen(self):
+        return False
+
+    # Instante grabado (segundos) del último frame leído; None si la fuente
+    # no tiene reloj propio
+    def read_time(self):
+        return None
+
+
+class CameraSource(FrameSource):
+    def __init__(self, index=0):
+        super().__init__()
+        self.index = index
+        self.cap = cv2.VideoCapture(index)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+    def reopen(self):
+        self.cap.release()
+        self.cap = cv2.VideoCapture(self.index)
+        return self.cap.isOpened()
+
+
+# Reproduce los frames al ritmo original si realtime=True, o tan rápido como se
+# pidan (modo benchmark) si realtime=False
+class _PacedSource(FrameSource):
+    def __init__(self, fps, loop, realtime):
+        super().__init__()
+        self.fps = fps or 30.0
+        self.loop = loop
+        self.realtime = realtime
+        self.replay = not realtime
+        self._next_time = None
+
+    def _pace(self):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._next_time is None:
+            self._next_time = now
+        elif self._next_time > now:
+            time.sleep(self._next_time - now)
+        self._next_time += 1.0 / self.fps
+
+
+class VideoFileSource(_PacedSource):
+    def __init__(self, path, loop=False, realtime=True):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS), loop, realtime)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        if self.finished:
+            return False, None
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            self.finished = True
+            return False, None
+        self._pace()
+        return True, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class FrameDirectorySource(_PacedSource):
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, path, fps=30.0, loop=False, realtime=True):
+        super().__init__(fps, loop, realtime)
+        self.files = sorted(f for f in glob.glob(os.path.join(path, "*"))
+                            if f.lower().endswith(self.EXTENSIONS))
+        self.index = 0
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def read(self):
+        if self.index >= len(self.files):
+            if not self.loop or not self.files:
+                self.finished = True
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.files[self.index])
+        self.index += 1
+        if frame is None:
+            return False, None
+        self._pace()
+        return True, frame
+
+
+# Sesión de landmarks grabada: archivo .lmk de SessionRecorder o .npz con
+# "timestamps" (N,) y "landmarks" (N, 21, 3); las filas con NaN son frames sin
+# mano. Se salta MediaPipe por completo y entrega un frame negro del tamaño
+# indicado.
+class RecordedLandmarkSource(_PacedSource):
+    provides_landmarks = True
+
+    def __init__(self, path, loop=False, realtime=True, frame_size=(480, 640)):
+        if path.endswith(".npz"):
+            data = np.load(path)
+            self.timestamps = np.asarray(data["timestamps"], dtype=np.float64)
+            self.landmarks = np.asarray(data["landmarks"], dtype=np.float32)
+        else:
+            reader = SessionReader(path)
+            self.timestamps = reader.timestamps
+            self.landmarks = reader.landmarks
+        # Intervalo típico (mediana): un .lmk con varias sesiones añadidas tiene
+        # huecos de horas entre una y otra
+        steps = np.diff(self.timestamps)
+        steps = steps[steps > 0]
+        fps = 1.0 / float(np.median(steps)) if len(steps) else 30.0
+        super().__init__(fps, loop, realtime)
+        self.blank = np.zeros((*frame_size, 3), dtype=np.uint8)
+        self.index = 0
+        self._current = None
+        self._time = None
+        # Con loop, cada vuelta sigue el reloj donde terminó la anterior
+        self._loop_offset = 0.0
+
+    def isOpened(self):
+        return len(self.timestamps) > 0
+
+    # Espera máxima entre dos registros en realtime, en periodos de frame
+    MAX_WAIT_FRAMES = 3
+
+    def _pace(self):
+        # Respetar los intervalos grabados en lugar de un fps fijo
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._next_time is None:
+            self._next_time = now - self.timestamps[self.index]
+        elif self.index:
+            # Un hueco largo (mano perdida, sesiones añadidas) se acorta: el
+            # reloj de reproducción se adelanta lo que sobra
+            gap = self.timestamps[self.index] - self.timestamps[self.index - 1]
+            excess = gap - self.MAX_WAIT_FRAMES / self.fps
+            if excess > 0:
+                self._next_time -= excess
+        delay = self._next_time + self.timestamps[self.index] - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def read(self):
+        if self.index >= len(self.timestamps):
+            if not self.loop:
+                self.finished = True
+                return False, None
+            self.index = 0
+            self._next_time = None
+            self._loop_offset += self.timestamps[-1] - self.timestamps[0] + 1.0 / self.fps
+        self._pace()
+        points = self.landmarks[self.index]
+        self._current = [] if np.isnan(points).any() else [HandFrame(points)]
+        self._time = float(self.timestamps[self.index]) + self._loop_offset
+        self.index += 1
+        return True, self.blank
+
+    def read_landmarks(self):
+        return self._current or []
+
+    def read_time(self):
+        return self._time
+
+
+# Varias fuentes en una sola imagen, una al lado de la otra: MediaPipe procesa
+# todas las cámaras con una sola inferencia por frame y cada persona aparece en
+# su franja de la pantalla. Cada imagen se escala a `height` px de alto.
+class TiledSource(FrameSource):
+    def __init__(self, sources, height=480):
+        super().__init__()
+        self.sources = sources
+        self.height = height
+        self.replay = all(source.replay for source in sources)
+
+    @property
+    def tiles(self):
+        return len(self.sources)
+
+    def isOpened(self):
+        return all(source.isOpened() for source in self.sources)
+
+    def read(self):
+        frames = []
+        for source in self.sources:
+            ret, frame = source.read()
+            if not ret:
+                self.finished = any(source.finished for source in self.sources)
+                return False, None
+            if frame.shape[0] != self.height:
+                width = round(frame.shape[1] * self.height / frame.shape[0])
+                frame = cv2.resize(frame, (width, self.height), interpolation=cv2.INTER_AREA)
+            frames.append(frame)
+        return True, np.hstack(frames)
+
+    def release(self):
+        for source in self.sources:
+            source.release()
+
+    def reopen(self):
+        return all(source.reopen() for source in self.sources)
+
+
+# Construye la fuente a partir de un índice de cámara o una ruta. Varias
+# separadas por comas ("0,1") se combinan en un TiledSource; "service" o
+# "service:DIRECCIÓN" se conecta al servicio de seguimiento compartido.
+def open_source(spec=0, loop=False, realtime=True):
+    if isinstance(spec, str) and spec.split(":", 1)[0] == "service":
+        from tracker_service import DEFAULT_ADDRESS, ServiceSource
+        return ServiceSource(spec.split(":", 1)[1] if ":" in spec else DEFAULT_ADDRESS)
+    if isinstance(spec, str) and "," in spec:
+        return TiledSource([open_source(part.strip(), loop, realtime) for part in spec.split(",")])
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+    if os.path.isdir(spec):
+        return FrameDirectorySource(spec, loop=loop, realtime=realtime)
+    if spec.endswith((".npz", ".lmk")):
+        return RecordedLandmarkSource(spec, loop=loop, realtime=realtime)
+    return VideoFileSource(spec, loop=loop, realtime=realtime)
@@ -0,0 +1,88 @@
+from functools import lru_cache
+
+import pygame
+
+
+# Pasos de cuantización: rotaciones y escalas cercanas comparten el mismo sprite
+ROTATION_STEP = 1.0
+SCALE_STEP = 0.02
+ALPHA_STEP = 16
+
+
+@lru_cache(maxsize=64)
+def _block_sprite(width, height, color, alpha):
+    block_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.rect(block_surface, (*color, alpha), (0, 0, width, height))
+    pygame.draw.rect(block_surface, (0, 0, 0, alpha), (0, 0, width, height), 2)
+    return block_surface
+
+
+@lru_cache(maxsize=256)
+def _transformed(surface, rotation, scale):
+    if scale != 1.0:
+        surface = pygame.transform.scale(surface, (int(surface.get_width() * scale),
+                                                   int(surface.get_height() * scale)))
+    if rotation:
+        surface = pygame.transform.rotate(surface, rotation)
+    return surface
+
+
+# Copia escalada y girada (en grados, antihorario) de un sprite que no cambia;
+# rotaciones y escalas cercanas comparten la misma copia
+def transformed_sprite(surface, rotation=0.0, scale=1.0):
+    rotation = round(rotation / ROTATION_STEP) * ROTATION_STEP
+    scale = round(scale / SCALE_STEP) * SCALE_STEP
+    if not rotation and scale == 1.0:
+        return surface
+    return _transformed(surface, rotation, scale)
+
+
+# Sprite de un bloque ya escalado y rotado; se reutiliza mientras no cambien
+# tamaño, color, rotación/escala cuantizadas ni alfa
+def get_block_sprite(width, height, color, rotation=0.0, scale=1.0, alpha=255):
+    return transformed_sprite(_block_sprite(width, height, tuple(color[:3]), alpha), rotation, scale)
+
+
+@lru_cache(maxsize=128)
+def _segment_sprite(size, color, alpha):
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.rect(sprite, (*color, alpha), (0, 0, size, size), border_radius=4)
+    border_color = (min(color[0]+50, 255), min(color[1]+50, 255), min(color[2]+50, 255), alpha)
+    pygame.draw.rect(sprite, border_color, (0, 0, size, size), 2, border_radius=4)
+    return sprite
+
+
+# Segmento de la serpiente (cuadrado redondeado con borde)
+def get_segment_sprite(size, color, alpha=255):
+    alpha = min(255, round(alpha / ALPHA_STEP) * ALPHA_STEP)
+    return _segment_sprite(size, tuple(color[:3]), alpha)
+
+
+# Capa compuesta de objetos estáticos (por ejemplo, los bloques ya colocados en
+# la torre). Se dibuja una sola vez en una superficie propia y solo se vuelve a
+# componer tras invalidate(). Los elementos deben ofrecer bounds() y
+# draw(surface, offset).
+class CachedLayer:
+    def __init__(self):
+        self.surface = None
+        self.rect = None
+        self.dirty = True
+
+    def invalidate(self):
+        self.dirty = True
+
+    def draw(self, surface, items):
+        if self.dirty:
+            self._compose(items)
+        if self.surface is not None:
+            surface.blit(self.surface, self.rect)
+
+    def _compose(self, items):
+        self.dirty = False
+        if not items:
+            self.surface = None
+            return
+        self.rect = items[0].bounds().unionall([item.bounds() for item in items[1:]])
+        self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        for item in items:
+            item.draw(self.surface, self.rect.topleft)
@@ -0,0 +1,21 @@
+import os
+import sys
+
+# Sin ventana ni audio reales: las pruebas corren en cualquier máquina
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import fonts
+
+
+# Las fuentes guardadas en fonts.py dejan de servir si una prueba anterior
+# cerró pygame (menu.main() sale con pygame.quit())
+@pytest.fixture(autouse=True)
+def fresh_fonts():
+    fonts.get_font.cache_clear()
+    fonts.render_text.cache_clear()
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from gestures import GestureEngine, measure
+from landmarks import HandFrame, INDEX_FINGER_TIP, THUMB_TIP
+
+# Base de cada dedo (pulgar, índice, medio, anular y meñique) respecto de la
+# muñeca, en tamaños de mano y con los dedos hacia arriba (y negativa)
+BASES = np.array([(-0.5, -0.4), (-0.3, -0.95), (0.0, -1.0), (0.25, -0.95), (0.45, -0.85)])
+STRAIGHT = (0.0,) * 5
+FIST = (2.4,) * 5
+
+
+# Mano sintética de 21 puntos: cada dedo sigue la dirección muñeca -> base y se
+# curva `bends[i]` radianes repartidos entre sus tres articulaciones. pinch fija
+# la distancia pulgar-índice; angle gira la mano sobre la muñeca (hacia la derecha)
+def synthetic_hand(bends=STRAIGHT, pinch=None, angle=0.0, size=0.1, wrist=(0.5, 0.7)):
+    local = np.zeros((21, 2))
+    for finger, (base, bend) in enumerate(zip(BASES, bends)):
+        first = 1 + 4 * finger
+        local[first] = base
+        heading = np.arctan2(base[1], base[0])
+        for joint in range(first + 1, first + 4):
+            heading += bend / 3
+            local[joint] = local[joint - 1] + 0.35 * np.array([np.cos(heading), np.sin(heading)])
+    if pinch is not None:
+        local[THUMB_TIP] = local[INDEX_FINGER_TIP] + (pinch, 0.0)
+    cos, sin = np.cos(angle), np.sin(angle)
+    rotated = np.stack([local[:, 0] * cos - local[:, 1] * sin, local[:, 0] * sin + local[:, 1] * cos], axis=1)
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[:, :2] = np.asarray(wrist) + rotated * size
+    return HandFrame(points)
+
+
+# Solo el índice (y el pulgar) estirados; angle en grados desde la vertical,
+# medido sobre la dirección del índice
+def pointing_hand(angle=0.0, **kwargs):
+    tilt = np.arctan2(-BASES[1][0], -BASES[1][1])
+    return synthetic_hand(bends=(0.0, 0.0, 2.4, 2.4, 2.4), angle=np.radians(angle) + tilt, **kwargs)
+
+
+def test_measure():
+    hand = synthetic_hand(bends=(0.3, 0.0, 1.2, 1.8, 2.4), pinch=0.4)
+    bend, pinch, pointing = measure(hand.points[None])
+    # El pulgar se movió para fijar la pinza: su flexión no es la pedida
+    np.testing.assert_allclose(bend[0, 1:], [0.0, 1.2, 1.8, 2.4], atol=1e-3)
+    assert pinch[0] == pytest.approx(0.4, abs=1e-3)
+    # Índice estirado: la punta está a 3 falanges de 0.35 más allá de su base
+    index = BASES[1]
+    np.testing.assert_allclose(pointing[0], index * (1 + 1.05 / np.hypot(*index)), atol=1e-3)
+    # Con varias cámaras en franjas la x se estira: mide lo mismo en cada una
+    narrow = synthetic_hand(pinch=0.4).points.copy()
+    narrow[:, 0] = narrow[:, 0] / 2
+    assert measure(narrow[None], x_scale=2.0)[1][0] == pytest.approx(0.4, abs=1e-3)
+
+
+@pytest.mark.parametrize("hand, name", [
+    (synthetic_hand(), "open"),
+    (pointing_hand(), "point"),
+    (synthetic_hand(FIST), "none"),
+    (synthetic_hand(pinch=0.2), "pinch"),
+])
+def test_gesture_names(hand, name):
+    gesture = GestureEngine().update([hand])[0]
+    assert gesture.name == name
+    assert gesture.pinching == (name == "pinch")
+
+
+def test_pinch_pointer_is_midpoint():
+    hand = synthetic_hand(pinch=0.2)
+    gesture = GestureEngine().update([hand])[0]
+    expected = (hand.points[INDEX_FINGER_TIP, :2] + hand.points[THUMB_TIP, :2]) / 2
+    np.testing.assert_allclose(gesture.pointer, expected, atol=1e-6)
+
+
+# La pinza se cierra por debajo de pinch_on (0.35) y solo se abre por encima de
+# pinch_off (0.55)
+def test_pinch_hysteresis():
+    engine = GestureEngine()
+    states = [engine.update([synthetic_hand(pinch=d)])[0].pinching for d in (0.5, 0.3, 0.5, 0.54, 0.6, 0.45, 0.36)]
+    assert states == [False, True, True, True, False, False, False]
+
+
+# Un dedo cuenta como estirado por debajo de extend_on (1.0) y como doblado por
+# encima de extend_off (1.6)
+def test_finger_hysteresis():
+    engine = GestureEngine()
+    names = [engine.update([synthetic_hand((0.0, 0.0, bend, bend, bend))])[0].name
+             for bend in (0.0, 1.3, 1.5, 1.7, 1.3, 1.1, 0.9)]
+    assert names == ["open", "open", "open", "point", "point", "point", "open"]
+
+
+# El temblor entre los dos umbrales nunca cambia el gesto, sea cual sea el
+# estado de partida
+@pytest.mark.parametrize("start", [0.2, 0.7])
+def test_jitter_does_not_flip_pinch(start):
+    rng = np.random.default_rng(3)
+    engine = GestureEngine()
+    pinching = engine.update([synthetic_hand(pinch=start)])[0].pinching
+    for d in 0.45 + rng.uniform(-0.09, 0.09, 200):
+        assert engine.update([synthetic_hand(pinch=d)])[0].pinching == pinching
+
+
+@pytest.mark.parametrize("start, name", [(0.0, "open"), (2.4, "point")])
+def test_jitter_does_not_flip_fingers(start, name):
+    rng = np.random.default_rng(4)
+    engine = GestureEngine()
+    engine.update([synthetic_hand((0.0, 0.0, start, start, start))])
+    for bend in 1.3 + rng.uniform(-0.25, 0.25, 200):
+        assert engine.update([synthetic_hand((0.0, 0.0, bend, bend, bend))])[0].name == name
+
+
+# La dirección solo pasa a otro eje si este supera al anterior por
+# direction_margin: a 47° se mantiene la que había, a 60° cambia
+def test_direction_hysteresis():
+    engine = GestureEngine()
+    directions = [engine.update([pointing_hand(angle)])[0].direction
+                  for angle in (0, 47, 60, 47, 0, -47, -60)]
+    assert directions == [(0, -1), (0, -1), (1, 0), (1, 0), (0, -1), (0, -1), (-1, 0)]
+
+
+# Cada mano tiene su estado; una mano que desaparece empieza de cero
+def test_state_per_hand():
+    engine = GestureEngine(2)
+    first, second = engine.update([synthetic_hand(pinch=0.2), synthetic_hand(pinch=0.45)])
+    assert first.pinching and not second.pinching
+    first, second = engine.update([synthetic_hand(pinch=0.45), None])
+    assert first.pinching and second is None
+    first, _ = engine.update([None, None])
+    assert first is None
+    assert not engine.update([synthetic_hand(pinch=0.45)])[0].pinching
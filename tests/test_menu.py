@@ -0,0 +1,253 @@
+import sqlite3
+import time
+
+import numpy as np
+import pygame
+import pytest
+
+import menu
+from assets import AssetManager
+from filters import LandmarkSmoother
+from kinematics import KinematicsStream, analyze
+from landmarks import HandFrame
+from metrics import MetricsStore
+from players import HandAssigner
+from sources import FrameSource, RecordedLandmarkSource
+from tracking import BackgroundLoader, HandResults, HandTracker, TrackedFrame
+
+
+# Cámara en vivo simulada: frames negros a ~200 FPS, sin reproducción
+class LiveSource(FrameSource):
+    def read(self):
+        time.sleep(0.005)
+        return True, np.zeros((120, 160, 3), dtype=np.uint8)
+
+
+# Grabación reproducida frame a frame (--fast)
+class RecordedSource(FrameSource):
+    replay = True
+    fps = 30.0
+
+
+class NoHands:
+    def process(self, rgb):
+        return HandResults([])
+
+
+# Ventana nueva para cada prueba (init_display solo la abre una vez)
+@pytest.fixture
+def display(monkeypatch):
+    monkeypatch.setattr(menu, "screen", None)
+    monkeypatch.setattr(menu, "canvas", None)
+    monkeypatch.setattr(menu, "hands", None)
+    monkeypatch.setattr(menu, "warm_up", None)
+    # main() cambia estas opciones globales
+    for name in ("players", "grab_mode", "landmark_filter", "adaptive_tracking", "metrics", "pacer"):
+        monkeypatch.setattr(menu, name, getattr(menu, name))
+    # Las imágenes convertidas pertenecen a la ventana anterior
+    monkeypatch.setattr(menu, "assets", AssetManager())
+    menu.welcome_background.cache_clear()
+    yield
+    menu.welcome_background.cache_clear()
+    menu.stop_tracking()
+    menu.renderer.canvas = None
+    pygame.display.quit()
+
+
+# Sesión grabada de una mano quieta en el centro de la imagen
+@pytest.fixture
+def session(tmp_path):
+    path = tmp_path / "sesion.npz"
+    frames = 30
+    landmarks = np.full((frames, 21, 3), 0.5, dtype=np.float32)
+    np.savez(path, timestamps=np.arange(frames) / 30.0, landmarks=landmarks)
+    return str(path)
+
+
+# Reemplaza wait_events: cada llamada entrega el siguiente grupo de eventos del
+# guion y, cuando se acaba, QUIT
+def script_events(monkeypatch, script):
+    script = list(script)
+
+    def wait_events(timeout=0):
+        pygame.event.get()
+        return script.pop(0) if script else [pygame.event.Event(pygame.QUIT)]
+    monkeypatch.setattr(menu, "wait_events", wait_events)
+
+
+def click(pos):
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1))
+
+
+def test_game_selection_with_live_source(display):
+    menu.init_display()
+    menu.warm_up = BackgroundLoader(NoHands).start()
+    menu.warm_up.get()
+    source = LiveSource()
+    click((menu.WIDTH // 2, menu.HEIGHT // 2 - 75))
+    assert menu.show_game_selection(source) == "snake"
+    # El menú usó el seguimiento de la sesión y lo dejó en pausa
+    assert menu.session_tracker is not None and menu.session_tracker.source is source
+    assert menu.session_tracker.paused
+
+
+# Arranque interactivo completo: bienvenida, menú principal, Torre de Bloques
+# (con su menú) hasta que se acaba la grabación, y QUIT en la bienvenida
+@pytest.mark.parametrize("backend", ["software", "sdl2-software"])
+def test_interactive_startup(display, monkeypatch, session, backend):
+    blocks = (menu.WIDTH // 2, menu.HEIGHT // 2 + 75)
+    script_events(monkeypatch, [
+        [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)],
+        [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=blocks, button=1),
+         pygame.event.Event(pygame.MOUSEBUTTONUP, pos=blocks, button=1)],
+    ])
+    played = []
+    play_blocks = menu.play_blocks
+
+    def spy(*args, **kwargs):
+        played.append(args)
+        return play_blocks(*args, **kwargs)
+    monkeypatch.setattr(menu, "play_blocks", spy)
+    with pytest.raises(SystemExit):
+        menu.main(["--source", session, "--fast", "--backend", backend, "--db", ""])
+    assert played
+    assert menu.canvas.accelerated == (backend != "software")
+    assert menu.welcome_background() is not None
+
+
+# En reproducción el filtro usa el reloj de la grabación: el mismo recorrido
+# da las mismas manos aunque los frames se hayan leído a otro ritmo
+def test_replay_filter_ignores_read_time():
+    tracker = HandTracker(RecordedSource(), None)
+    path = np.linspace(0.2, 0.8, 20)
+
+    def replay(read_period):
+        smoother = LandmarkSmoother("euro")
+        result = []
+        for seq, x in enumerate(path, 1):
+            points = np.full((21, 3), x, dtype=np.float32)
+            tracked = TrackedFrame(seq, seq * read_period, None, [HandFrame(points)])
+            result.append(menu.current_hands(tracker, tracked, smoother, True)[0].points)
+        return np.array(result)
+    np.testing.assert_array_equal(replay(0.0001), replay(0.5))
+
+
+# Un jugador que pierde la mano más que el timeout del reparto (medido en la
+# grabación) libera su lugar aunque la reproducción lo recorra en milisegundos
+def test_replay_assigner_timeout_uses_recording_clock():
+    tracker = HandTracker(RecordedSource(), None)
+    left = HandFrame(np.full((21, 3), 0.2, dtype=np.float32))
+    right = HandFrame(np.full((21, 3), 0.8, dtype=np.float32))
+    frames = [[left]] + [[]] * 90 + [[right]]
+    for read_period in (0.0001, 0.5):
+        assigner = HandAssigner(2)
+        for seq, hands in enumerate(frames, 1):
+            tracked = TrackedFrame(seq, seq * read_period, None, hands)
+            slots = menu.current_hands(tracker, tracked, None, True, assigner)
+        assert slots[0] is right and slots[1] is None
+
+
+class ClosedSource(FrameSource):
+    def isOpened(self):
+        return False
+
+
+# Sin cámara no se juega: no debe quedar una sesión vacía en la base
+@pytest.mark.parametrize("play", ["play_blocks", "play_snake"])
+def test_no_session_without_tracking(display, monkeypatch, tmp_path, play):
+    path = str(tmp_path / "metricas.db")
+    monkeypatch.setattr(menu, "metrics", MetricsStore(path))
+    menu.init_display()
+    getattr(menu, play)(ClosedSource(), interactive=False)
+    menu.metrics.close()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 0
+
+
+# Partida sin menús con una grabación (--game --fast), en cada backend; las
+# métricas de la partida quedan guardadas al salir
+@pytest.mark.parametrize("backend", ["software", "sdl2-software"])
+@pytest.mark.parametrize("game", ["snake", "blocks"])
+def test_main_plays_recording(display, tmp_path, session, backend, game):
+    path = str(tmp_path / "metricas.db")
+    menu.main(["--game", game, "--source", session, "--fast", "--seed", "1", "--backend", backend,
+               "--players", "2", "--db", path])
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT game, ended IS NOT NULL FROM sessions").fetchall() == [(game, 1)]
+
+
+# Temblor de 6 Hz grabado en dos tramos de 10 s separados por 20 s sin grabar
+# (dos partidas agregadas al mismo archivo)
+def tremor_recording(path):
+    t = np.concatenate([np.arange(300) / 30, 30 + np.arange(300) / 30])
+    landmarks = np.full((len(t), 21, 3), 0.5, dtype=np.float32)
+    landmarks[:, :, 0] += (0.01 * np.sin(2 * np.pi * 6 * t))[:, None]
+    np.savez(path, timestamps=t, landmarks=landmarks)
+    return t, landmarks
+
+
+# El análisis en vivo de una reproducción usa los instantes grabados: da lo
+# mismo que kinematics.analyze() sobre el archivo completo
+def test_replay_motion_matches_batch_analysis(tmp_path):
+    path = str(tmp_path / "temblor.npz")
+    expected = analyze(*tremor_recording(path))
+    tracker = HandTracker(RecordedLandmarkSource(path, realtime=False), None)
+    motion = [KinematicsStream()]
+    while True:
+        tracked = tracker.latest()
+        if tracker.finished:
+            break
+        menu.update_motion(motion, tracker, tracked, None)
+    summary = motion[0].summary()
+    assert expected["tremor_hz"] == summary["tremor_hz"] == 6.0
+    for key in ("path_length", "active_time", "mean_velocity"):
+        assert summary[key] == pytest.approx(expected[key])
+
+
+# Un hueco de 3 s en la grabación (un solo frame después) vence el timeout del
+# reparto de manos y la mano que aparece lejos vuelve al jugador 1
+def test_replay_gap_expires_hand_assignment(tmp_path):
+    path = str(tmp_path / "hueco.npz")
+    t = np.append(np.arange(31) / 30, 4.0)
+    landmarks = np.full((len(t), 21, 3), 0.2, dtype=np.float32)
+    landmarks[-1] = 0.8
+    np.savez(path, timestamps=t, landmarks=landmarks)
+    tracker = HandTracker(RecordedLandmarkSource(path, realtime=False), None)
+    assigner = HandAssigner(2)
+    while True:
+        tracked = tracker.latest()
+        if tracker.finished:
+            break
+        slots = menu.current_hands(tracker, tracked, None, True, assigner)
+    assert slots[0] is not None and slots[0].points[0, 0] == pytest.approx(0.8)
+    assert slots[1] is None
+
+
+# Al repetir la grabación (--loop) el reloj sigue avanzando: los filtros nunca
+# ven un intervalo negativo
+def test_looped_replay_clock_is_monotonic(tmp_path):
+    path = str(tmp_path / "temblor.npz")
+    recorded, _ = tremor_recording(path)
+    tracker = HandTracker(RecordedLandmarkSource(path, loop=True, realtime=False), None)
+    times = [menu.frame_time(tracker, tracker.latest()) for _ in range(3 * len(recorded))]
+    assert np.all(np.diff(times) > 0)
+    np.testing.assert_allclose(times[:len(recorded)], recorded)
+
+
+# Con el menú de la Torre de Bloques abierto una reproducción no avanza: el
+# bucle espera eventos sin leer frames, y la partida empieza desde el primero
+def test_blocks_menu_does_not_consume_replay(display, monkeypatch, session):
+    menu.init_display()
+    source = RecordedLandmarkSource(session, realtime=False)
+    script = [[], [pygame.event.Event(pygame.WINDOWEXPOSED)], [],
+              [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_r)]]
+    read_during_menu = []
+
+    def wait_events(timeout=0):
+        read_during_menu.append(source.index)
+        return script.pop(0)
+    monkeypatch.setattr(menu, "wait_events", wait_events)
+    menu.play_blocks(source, interactive=True)
+    assert read_during_menu == [0, 0, 0, 0]
+    assert source.finished and source.index == len(source.timestamps)
@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+import pytest
+
+import recording
+from landmarks import HandFrame
+from recording import HEADER_DTYPE, RECORD_DTYPES, SessionReader, SessionRecorder
+from sources import RecordedLandmarkSource
+
+HAND = HandFrame(np.full((21, 3), 0.5, dtype=np.float32))
+
+
+def record(path, frames, start=None):
+    recorder = SessionRecorder(str(path))
+    start = time.perf_counter() if start is None else start
+    for i in range(frames):
+        recorder.write(start + i / 30, HAND if i % 2 == 0 else None)
+    recorder.close()
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "sesion.lmk"
+    record(path, 10)
+    reader = SessionReader(str(path))
+    assert len(reader) == 10 and reader.version == recording.VERSION
+    np.testing.assert_allclose(np.diff(reader.timestamps), 1 / 30, atol=1e-9)
+    assert reader.detected.tolist() == [i % 2 == 0 for i in range(10)]
+    np.testing.assert_array_equal(reader.landmarks[0], HAND.points)
+    source = RecordedLandmarkSource(str(path), realtime=False)
+    assert source.read()[0] and len(source.read_landmarks()) == 1
+
+
+# Una sesión agregada un mes después de start_time conserva los intervalos
+# entre frames (en float32 los segundos se redondearían a 0.25 s)
+def test_append_keeps_precision(tmp_path):
+    path = tmp_path / "sesion.lmk"
+    with open(path, "wb") as f:
+        f.write(recording._header(time.time() - 30 * 86400))
+    record(path, 10)
+    reader = SessionReader(str(path))
+    assert reader.timestamps[0] > 30 * 86400 - 60
+    np.testing.assert_allclose(np.diff(reader.timestamps), 1 / 30, atol=1e-6)
+
+
+# Los archivos de la versión 1 (t en float32) se leen igual y se pasan al
+# formato actual antes de agregarles frames
+def test_version_1_files(tmp_path):
+    path = tmp_path / "viejo.lmk"
+    header = np.frombuffer(recording._header(time.time() - 60), dtype=HEADER_DTYPE).copy()
+    header["version"] = 1
+    old = np.zeros(3, dtype=RECORD_DTYPES[1])
+    old["t"] = [0.0, 0.5, 1.0]
+    old["points"] = HAND.points
+    path.write_bytes(header.tobytes() + old.tobytes())
+    reader = SessionReader(str(path))
+    assert reader.version == 1
+    np.testing.assert_array_equal(reader.timestamps, [0.0, 0.5, 1.0])
+    del reader
+    record(path, 2)
+    reader = SessionReader(str(path))
+    assert reader.version == recording.VERSION and len(reader) == 5
+    np.testing.assert_array_equal(reader.timestamps[:3], [0.0, 0.5, 1.0])
+    assert reader.timestamps[3] > 59
+    np.testing.assert_array_equal(reader.landmarks[:3], np.broadcast_to(HAND.points, (3, 21, 3)))
+
+
+# En tiempo real, el hueco de una hora entre dos sesiones añadidas se reproduce
+# como unos pocos frames, sin perder el instante grabado
+def test_realtime_replay_skips_long_gaps(tmp_path):
+    path = tmp_path / "sesion.lmk"
+    start = time.perf_counter()
+    record(path, 5, start)
+    record(path, 5, start + 3600)
+    source = RecordedLandmarkSource(str(path), realtime=True)
+    assert source.fps == pytest.approx(30)
+    began = time.perf_counter()
+    times = []
+    while source.read()[0]:
+        times.append(source.read_time())
+    assert time.perf_counter() - began < 1.0
+    assert len(times) == 10 and times[5] - times[4] > 3599
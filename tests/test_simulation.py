@@ -0,0 +1,32 @@
+import random
+from functools import partial
+
+from simulation import FOOD_CELLS, FoodState, SnakeGame, SnakeState, player_starts
+
+
+def shared_board(players=2):
+    food = FoodState()
+    games = [SnakeGame(snake_factory=partial(SnakeState, start), food=food) for start in player_starts(players)]
+    return food, games
+
+
+# La comida compartida nunca aparece sobre otra serpiente: con el tablero
+# ocupado salvo una celda, es la única que se puede elegir
+def test_shared_food_avoids_other_snakes():
+    food, (first, second) = shared_board()
+    target = FOOD_CELLS[len(FOOD_CELLS) // 3]
+    second.snake.occupied = set(FOOD_CELLS) - {target}
+    for seed in range(20):
+        random.seed(seed)
+        food.positions = []
+        food.spawn_food(first.snake)
+        assert food.positions == [target]
+
+
+def test_shared_food_on_full_board():
+    food, (first, second) = shared_board()
+    second.snake.occupied = set(FOOD_CELLS)
+    food.positions = []
+    food.spawn_food(first.snake)
+    assert food.positions == []
+
@@ -0,0 +1,154 @@
+import os
+import socket
+import threading
+from multiprocessing.connection import Client
+
+import numpy as np
+import pytest
+
+from sources import RecordedLandmarkSource
+from tracker_service import LandmarkRing, ServiceSource, TrackerService, private_dir, remove_stale_socket
+
+unix_only = pytest.mark.skipif(os.name == "nt", reason="sockets Unix")
+
+
+@pytest.fixture
+def ring():
+    ring = LandmarkRing.create(slots=4, max_hands=2, frame_shape=(6, 8, 3))
+    yield ring
+    ring.close()
+
+
+def hand(value):
+    return np.full((21, 3), value, dtype=np.float32)
+
+
+def frame(value, shape=(6, 8, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_ring_read_write(ring):
+    assert ring.latest_seq == 0
+    seq = ring.write(1.5, [hand(0.25), hand(0.75)], ["Left", "Right"], frame(7))
+    assert seq == ring.latest_seq == 1
+    timestamp, landmarks, handedness, image = ring.read(seq)
+    assert timestamp == 1.5
+    np.testing.assert_array_equal(landmarks, [hand(0.25), hand(0.75)])
+    assert handedness == ["Left", "Right"]
+    np.testing.assert_array_equal(image, frame(7))
+    # El frame se puede copiar en un buffer propio
+    out = np.empty((6, 8, 3), dtype=np.uint8)
+    assert ring.read(seq, out)[3] is out
+
+
+def test_ring_clips_hands_and_resizes_frames(ring):
+    seq = ring.write(0.0, [hand(0.1), hand(0.2), hand(0.3)], None, frame(9, (12, 16, 3)))
+    _, landmarks, handedness, image = ring.read(seq)
+    assert len(landmarks) == 2 and handedness == [None, None]
+    np.testing.assert_array_equal(image, frame(9))
+
+
+def test_ring_overwrite(ring):
+    for i in range(1, 6):
+        ring.write(float(i), [hand(i / 10)], None, frame(i))
+    # Con 4 ranuras el frame 5 ocupa la del 1: ese ya no se puede leer
+    assert ring.read(1) is None
+    for seq in range(2, 6):
+        timestamp, landmarks, _, image = ring.read(seq)
+        assert timestamp == seq and image[0, 0, 0] == seq
+        np.testing.assert_array_equal(landmarks[0], hand(seq / 10))
+    assert ring.read(6) is None
+
+
+def test_ring_slot_being_written(ring):
+    seq = ring.write(0.0, [hand(0.5)], None, frame(1))
+    ring.records[seq % ring.slots]["seq"] = -1
+    assert ring.read(seq) is None
+
+
+@pytest.fixture
+def service(tmp_path):
+    path = tmp_path / "sesion.npz"
+    np.savez(path, timestamps=np.arange(10) / 30.0, landmarks=np.full((10, 21, 3), 0.5, dtype=np.float32))
+    address = str(tmp_path / "tracker.sock")
+    service = TrackerService(RecordedLandmarkSource(str(path), loop=True), address=address,
+                             frame_shape=(48, 64, 3))
+    thread = threading.Thread(target=service.run, daemon=True)
+    thread.start()
+    while not os.path.exists(address):
+        thread.join(0.01)
+    yield service
+    service.stop()
+    thread.join(2)
+
+
+@unix_only
+def test_client_reads_frames(service):
+    source = ServiceSource(service.address)
+    try:
+        assert source.isOpened()
+        ret, frame = source.read()
+        assert ret and frame.shape == (48, 64, 3)
+        assert len(source.read_landmarks()) == 1
+        assert source.stats()["clients"] == 1
+    finally:
+        source.release()
+    assert os.stat(service.address).st_mode & 0o777 == 0o600
+
+
+exploited = []
+
+
+def exploit():
+    exploited.append(True)
+
+
+# Si el servicio usara pickle, recibir esto ejecutaría código
+class Exploit:
+    def __reduce__(self):
+        return (exploit, ())
+
+
+@unix_only
+def test_pickle_is_never_loaded(service):
+    with Client(service.address) as conn:
+        conn.send(Exploit())
+        with pytest.raises((EOFError, OSError)):
+            conn.recv_bytes()
+    assert not exploited
+    # El servicio sigue atendiendo a los demás
+    source = ServiceSource(service.address)
+    assert source.isOpened()
+    source.release()
+
+
+@unix_only
+def test_remove_stale_socket(tmp_path):
+    assert remove_stale_socket(str(tmp_path / "nada.sock"))
+    other = tmp_path / "otro"
+    other.write_text("no es un socket")
+    assert not remove_stale_socket(str(other))
+    assert other.exists()
+    stale = str(tmp_path / "viejo.sock")
+    sock = socket.socket(socket.AF_UNIX)
+    sock.bind(stale)
+    sock.close()
+    assert remove_stale_socket(stale)
+    assert not os.path.exists(stale)
+
+
+@unix_only
+def test_live_socket_is_kept(service):
+    assert not remove_stale_socket(service.address)
+    assert os.path.exists(service.address)
+
+
+@unix_only
+def test_private_dir(tmp_path):
+    path = private_dir(str(tmp_path / "neurogame"))
+    assert os.stat(path).st_mode & 0o777 == 0o700
+    shared = tmp_path / "compartido"
+    shared.mkdir(mode=0o777)
+    os.chmod(shared, 0o777)
+    with pytest.raises(PermissionError):
+        private_dir(str(shared))
@@ -0,0 +1,182 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from landmarks import HandFrame
+from sources import FrameSource
+from tracking import AdaptiveHands, HandResults, HandTracker
+
+FRAME = (480, 640, 3)
+
+
+# Modelo falso: la "mano" es el cuadrado blanco de la imagen y sus landmarks
+# van de una esquina a la otra, en coordenadas normalizadas de lo que recibe
+class MarkerHands:
+    def __init__(self):
+        self.shapes = []
+
+    def process(self, rgb):
+        self.shapes.append(rgb.shape)
+        ys, xs = np.nonzero(rgb[..., 0] > 127)
+        if not len(xs):
+            return HandResults([])
+        h, w = rgb.shape[:2]
+        points = np.zeros((21, 3), dtype=np.float32)
+        points[:, 0] = np.linspace(xs.min(), xs.max() + 1, 21) / w
+        points[:, 1] = np.linspace(ys.min(), ys.max() + 1, 21) / h
+        points[:, 2] = 0.1
+        return HandResults([HandFrame(points)])
+
+
+def frame_with_marker(x, y, size=40):
+    frame = np.zeros(FRAME, dtype=np.uint8)
+    frame[y:y + size, x:x + size] = 255
+    return frame
+
+
+# Esquinas del cuadrado en coordenadas normalizadas del frame completo
+def assert_marker(results, x, y, size=40, tolerance=2.5):
+    points = results.multi_hand_landmarks[0].points
+    h, w = FRAME[:2]
+    np.testing.assert_allclose(points[[0, -1], 0], [x / w, (x + size) / w], atol=tolerance / w)
+    np.testing.assert_allclose(points[[0, -1], 1], [y / h, (y + size) / h], atol=tolerance / h)
+
+
+@pytest.fixture
+def model():
+    return MarkerHands()
+
+
+def test_first_inference_uses_scaled_full_frame(model):
+    adaptive = AdaptiveHands(model, max_stride=1, idle_interval=1)
+    results = adaptive.process(frame_with_marker(400, 100))
+    assert max(model.shapes[0][:2]) == adaptive.inference_size
+    assert_marker(results, 400, 100)
+    x0, y0, x1, y1 = adaptive.roi
+    assert x0 < 400 / 640 and (440 / 640) < x1 and y0 < 100 / 480 and (140 / 480) < y1
+
+
+def test_roi_crop_maps_back_to_frame(model):
+    adaptive = AdaptiveHands(model, max_stride=1, idle_interval=1)
+    adaptive.process(frame_with_marker(400, 100))
+    results = adaptive.process(frame_with_marker(410, 104))
+    # Solo se infirió sobre el recorte alrededor de la mano, sin escalar
+    crop = model.shapes[-1]
+    assert len(model.shapes) == 2 and crop[0] < FRAME[0] and crop[1] < FRAME[1]
+    assert max(crop[:2]) < adaptive.inference_size
+    assert_marker(results, 410, 104, tolerance=1)
+    # z se escala como x: con el ancho del recorte respecto al frame
+    np.testing.assert_allclose(results.multi_hand_landmarks[0].points[:, 2], 0.1 * crop[1] / FRAME[1], rtol=1e-3)
+
+
+def test_hand_outside_roi_searches_full_frame(model):
+    adaptive = AdaptiveHands(model, max_stride=1, idle_interval=1)
+    adaptive.process(frame_with_marker(400, 100))
+    results = adaptive.process(frame_with_marker(60, 380))
+    # Primero el recorte (vacío) y después el frame completo
+    assert len(model.shapes) == 3 and model.shapes[-1][:2] == (240, 320)
+    assert_marker(results, 60, 380)
+
+
+def test_lost_hand_clears_roi(model):
+    adaptive = AdaptiveHands(model, max_stride=1, idle_interval=3)
+    adaptive.process(frame_with_marker(400, 100))
+    assert not adaptive.process(np.zeros(FRAME, dtype=np.uint8)).multi_hand_landmarks
+    assert adaptive.roi is None and adaptive.last is None
+    # Sin mano solo se busca cada idle_interval frames
+    calls = len(model.shapes)
+    adaptive.process(np.zeros(FRAME, dtype=np.uint8))
+    adaptive.process(np.zeros(FRAME, dtype=np.uint8))
+    assert len(model.shapes) == calls
+    adaptive.process(frame_with_marker(400, 100))
+    assert len(model.shapes) == calls + 1
+
+
+# Mano quieta: entre inferencias se devuelven los landmarks extrapolados
+def test_stable_hand_skips_inference(model):
+    adaptive = AdaptiveHands(model, max_stride=4, latency_budget=1.0, idle_interval=1)
+    first = adaptive.process(frame_with_marker(400, 100))
+    second = adaptive.process(frame_with_marker(400, 100))
+    assert len(model.shapes) == 1
+    np.testing.assert_array_equal(second.multi_hand_landmarks[0].points, first.multi_hand_landmarks[0].points)
+
+
+# Cámara falsa: siempre entrega el mismo frame pequeño
+class BlankSource(FrameSource):
+    def read(self):
+        return True, np.zeros((8, 8, 3), dtype=np.uint8)
+
+
+# Modelo lento que anota si hay un process() en curso y en qué hilo se
+# reinicia; `errors` process() seguidos fallan con RuntimeError
+class SlowHands:
+    def __init__(self, delay=0.01, errors=0):
+        self.delay = delay
+        self.errors = errors
+        self.busy = False
+        self.calls = 0
+        self.reset_threads = []
+
+    def process(self, rgb):
+        self.busy = True
+        time.sleep(self.delay)
+        self.busy = False
+        self.calls += 1
+        if self.errors:
+            self.errors -= 1
+            raise RuntimeError("modelo roto")
+        return HandResults([])
+
+    def reset(self):
+        assert not self.busy
+        self.reset_threads.append(threading.current_thread())
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_pause_waits_for_frame_in_progress():
+    hands = SlowHands()
+    tracker = HandTracker(BlankSource(), hands).start()
+    try:
+        for _ in range(10):
+            tracker.resume()
+            assert wait_for(lambda: hands.busy)
+            assert tracker.pause()
+            assert not hands.busy
+            calls = hands.calls
+            time.sleep(0.03)
+            assert hands.calls == calls
+    finally:
+        tracker.stop()
+
+
+def test_model_reset_runs_on_capture_thread():
+    hands = SlowHands()
+    tracker = HandTracker(BlankSource(), hands).start()
+    try:
+        for _ in range(5):
+            assert wait_for(lambda: hands.busy)
+            tracker.reset()
+        assert wait_for(lambda: hands.reset_threads)
+        assert all(thread is tracker._thread for thread in hands.reset_threads)
+    finally:
+        tracker.stop()
+
+
+def test_model_errors_do_not_stop_capture(capsys):
+    hands = SlowHands(delay=0.0, errors=3)
+    tracker = HandTracker(BlankSource(), hands).start()
+    try:
+        assert wait_for(lambda: tracker.latest() is not None)
+        assert tracker._thread.is_alive()
+    finally:
+        tracker.stop()
+    # Un solo aviso por racha de errores
+    assert capsys.readouterr().out.count("Aviso") == 1
@@ -0,0 +1,88 @@
+import pygame
+import pytest
+
+from widgets import Button, Label, Menu
+
+
+@pytest.fixture(scope="module", autouse=True)
+def fonts():
+    pygame.font.init()
+    yield
+    pygame.font.quit()
+
+
+def make_menu():
+    menu = Menu((400, 300), (0, 0, 0), dwell_time=1.5)
+    start = menu.add(Button((50, 50, 100, 40), "Comenzar", (0, 100, 0), (0, 200, 0), lambda: "start"))
+    other = menu.add(Button((200, 50, 100, 40), "Otro", (100, 0, 0), (200, 0, 0), lambda: "other"))
+    return menu, start, other
+
+
+def test_dwell_fires_once_after_dwell_time():
+    menu, start, _ = make_menu()
+    assert menu.point((60, 60), now=0.0) is None
+    assert menu.point((70, 60), now=0.75) is None
+    assert start.hovered and start.progress == pytest.approx(0.5)
+    assert menu.point((70, 60), now=1.6) == "start"
+    assert start.progress == 0.0
+    # Sigue encima: no se repite
+    assert menu.point((70, 60), now=4.0) is None
+    assert start.progress == 0.0
+
+
+def test_dwell_rearms_after_leaving():
+    menu, start, _ = make_menu()
+    menu.point((60, 60), now=0.0)
+    assert menu.point((60, 60), now=1.5) == "start"
+    assert menu.point(None, now=2.0) is None
+    assert menu.point((60, 60), now=2.5) is None
+    assert menu.point((60, 60), now=3.9) is None
+    assert menu.point((60, 60), now=4.0) == "start"
+
+
+def test_dwell_restarts_on_another_button():
+    menu, start, other = make_menu()
+    menu.point((60, 60), now=0.0)
+    menu.point((60, 60), now=1.0)
+    assert menu.point((210, 60), now=1.2) is None
+    assert start.progress == 0.0 and not start.hovered and other.hovered
+    assert menu.point((210, 60), now=2.6) is None
+    assert menu.point((210, 60), now=2.7) == "other"
+
+
+def test_dwell_ignores_labels_and_background():
+    menu, _, _ = make_menu()
+    menu.add(Label(pygame.Surface((100, 40)), (100, 200)))
+    for t in range(5):
+        assert menu.point((100, 200), now=float(t)) is None
+        assert menu.point((390, 290), now=t + 0.5) is None
+
+
+def event(kind, pos):
+    return pygame.event.Event(kind, pos=pos, button=1)
+
+
+def test_click_needs_press_and_release_on_same_button():
+    menu, _, _ = make_menu()
+    assert menu.handle(event(pygame.MOUSEBUTTONDOWN, (60, 60))) is None
+    assert menu.handle(event(pygame.MOUSEBUTTONUP, (60, 60))) == "start"
+    menu.handle(event(pygame.MOUSEBUTTONDOWN, (60, 60)))
+    assert menu.handle(event(pygame.MOUSEBUTTONUP, (210, 60))) is None
+    # Soltar sin haber presionado tampoco cuenta
+    assert menu.handle(event(pygame.MOUSEBUTTONUP, (210, 60))) is None
+
+
+def test_draw_returns_only_changed_rects():
+    menu, start, other = make_menu()
+    surface = pygame.Surface(menu.size)
+    assert menu.draw(surface) == [surface.get_rect()]
+    menu.full = False
+    assert menu.draw(surface) == []
+    menu.point((60, 60), now=0.0)
+    dirty = menu.draw(surface)
+    assert start.rect in dirty and other.rect not in dirty
+    cursor = dirty[-1]
+    assert cursor.center == (60, 60)
+    # Sin mano solo se repinta donde estaba el cursor
+    menu.point(None, now=0.1)
+    assert menu.draw(surface) == [cursor]
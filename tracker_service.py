@@ -0,0 +1,415 @@
+import argparse
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener
+
+import cv2
+import numpy as np
+
+from landmarks import NUM_LANDMARKS, DIMS, HandFrame, hand_frames
+from sources import FrameSource, open_source
+
+
+# Servicio de seguimiento compartido: un proceso es dueño de la cámara y del
+# modelo de MediaPipe y publica cada frame (imagen original de la cámara +
+# landmarks ya calculados) en un anillo de memoria compartida. Cualquier número
+# de juegos o paneles locales lo leen sin volver a inferir. El canal de control
+# es un socket Unix (tubería con nombre en Windows) por el que el cliente pide
+# el nombre del bloque de memoria y la forma del anillo. El socket vive en un
+# directorio del usuario ($XDG_RUNTIME_DIR o uno propio con permisos 0700) y
+# los mensajes son JSON: nunca se deserializa con pickle lo que llega por él.
+if sys.platform == "win32":
+    RUNTIME_DIR = None
+    DEFAULT_ADDRESS = r"\\.\pipe\neurogame-tracker-" + os.environ.get("USERNAME", "")
+else:
+    RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(tempfile.gettempdir(),
+                                                                    f"neurogame-{os.getuid()}")
+    DEFAULT_ADDRESS = os.path.join(RUNTIME_DIR, "neurogame-tracker.sock")
+# Tamaño máximo de un mensaje de control
+MAX_MESSAGE = 4096
+
+HANDEDNESS = {None: 0, "Left": 1, "Right": 2}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS.items()}
+# Cabecera del bloque: [último seq escrito, número de ranuras, 6 reservados]
+HEADER_SIZE = 64
+
+
+def send_message(conn, message):
+    conn.send_bytes(json.dumps(message).encode())
+
+
+# ValueError si no es JSON; OSError si supera MAX_MESSAGE
+def recv_message(conn):
+    message = json.loads(conn.recv_bytes(MAX_MESSAGE))
+    return message if isinstance(message, dict) else {}
+
+
+# Directorio privado del usuario para el socket: se crea con permisos 0700 y
+# se rechaza si es de otro usuario o si otros pueden escribir en él
+def private_dir(path):
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} no es un directorio privado del usuario")
+    return path
+
+
+# Borra el socket que dejó un servicio anterior que no se cerró bien. Devuelve
+# False (sin tocar nada) si la ruta no es un socket del usuario o si todavía
+# hay un servicio escuchando en ella.
+def remove_stale_socket(address):
+    try:
+        info = os.lstat(address)
+    except FileNotFoundError:
+        return True
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        return False
+    try:
+        Client(address).close()
+        return False
+    except OSError:
+        os.unlink(address)
+        return True
+
+
+def ring_dtype(max_hands, frame_shape):
+    return np.dtype([
+        ("seq", "<i8"),
+        ("timestamp", "<f8"),
+        ("count", "<i4"),
+        ("handedness", "u1", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, NUM_LANDMARKS, DIMS)),
+        ("frame", "u1", tuple(frame_shape)),
+    ], align=True)
+
+
+# Anillo de frames en memoria compartida. Un solo escritor; cada ranura lleva
+# su seq, que vale -1 mientras se escribe: el lector copia la ranura y solo la
+# acepta si el seq era el pedido antes y después de copiar.
+class LandmarkRing:
+    def __init__(self, shm, slots, max_hands, frame_shape, owner):
+        self.shm = shm
+        self.slots = slots
+        self.max_hands = max_hands
+        self.frame_shape = tuple(frame_shape)
+        self.owner = owner
+        self.header = np.ndarray((8,), dtype="<i8", buffer=shm.buf)
+        self.records = np.ndarray((slots,), dtype=ring_dtype(max_hands, frame_shape), buffer=shm.buf,
+                                  offset=HEADER_SIZE)
+
+    @classmethod
+    def create(cls, slots=8, max_hands=2, frame_shape=(480, 640, 3)):
+        size = HEADER_SIZE + slots * ring_dtype(max_hands, frame_shape).itemsize
+        ring = cls(shared_memory.SharedMemory(create=True, size=size), slots, max_hands, frame_shape, True)
+        ring.header[:] = 0
+        ring.header[1] = slots
+        ring.records["seq"] = -1
+        return ring
+
+    @classmethod
+    def attach(cls, name, slots, max_hands, frame_shape):
+        shm = shared_memory.SharedMemory(name=name)
+        if sys.platform != "win32":
+            # El bloque es del servicio: que el cliente no lo borre al salir
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, slots, max_hands, frame_shape, False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def latest_seq(self):
+        return int(self.header[0])
+
+    def write(self, timestamp, hands, handedness, frame):
+        seq = self.latest_seq + 1
+        record = self.records[seq % self.slots]
+        record["seq"] = -1
+        record["timestamp"] = timestamp
+        count = min(len(hands), self.max_hands)
+        record["count"] = count
+        for i in range(count):
+            record["landmarks"][i] = hands[i]
+            record["handedness"][i] = HANDEDNESS.get(handedness[i] if handedness else None, 0)
+        if frame.shape == self.frame_shape:
+            record["frame"][...] = frame
+        else:
+            cv2.resize(frame, (self.frame_shape[1], self.frame_shape[0]), dst=record["frame"])
+        record["seq"] = seq
+        self.header[0] = seq
+        return seq
+
+    # Copia de la ranura `seq` o None si ya fue sobrescrita (o se está escribiendo)
+    def read(self, seq, frame_out=None):
+        record = self.records[seq % self.slots]
+        if record["seq"] != seq:
+            return None
+        count = int(record["count"])
+        timestamp = float(record["timestamp"])
+        landmarks = record["landmarks"][:count].copy()
+        handedness = [HANDEDNESS_LABELS.get(int(code)) for code in record["handedness"][:count]]
+        if frame_out is None:
+            frame_out = record["frame"].copy()
+        else:
+            np.copyto(frame_out, record["frame"])
+        if record["seq"] != seq:
+            return None
+        return timestamp, landmarks, handedness, frame_out
+
+    def close(self):
+        self.header = self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class TrackerService:
+    def __init__(self, source, hands=None, address=DEFAULT_ADDRESS, slots=8, max_hands=2,
+                 frame_shape=(480, 640, 3)):
+        self.source = source
+        self.hands = hands
+        self.address = address
+        self.ring = LandmarkRing.create(slots, max_hands, frame_shape)
+        self.frames = 0
+        self.clients = 0
+        self._lock = threading.Lock()
+        self._has_clients = threading.Event()
+        self._stop = threading.Event()
+        self._listener = None
+        self._started = time.perf_counter()
+        self._rgb = None
+        self._scratch = None
+
+    def info(self):
+        return {"shm": self.ring.name, "slots": self.ring.slots, "max_hands": self.ring.max_hands,
+                "frame_shape": list(self.ring.frame_shape)}
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started
+        return {"frames": self.frames, "clients": self.clients, "fps": self.frames / elapsed if elapsed else 0.0}
+
+    # Canal de control: una conexión por cliente. Mientras no haya clientes la
+    # captura queda en pausa.
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                break
+            if self._stop.is_set():
+                conn.close()
+                break
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with self._lock:
+            self.clients += 1
+            self._has_clients.set()
+        try:
+            while True:
+                command = recv_message(conn).get("cmd")
+                if command == "hello":
+                    send_message(conn, self.info())
+                elif command == "stats":
+                    send_message(conn, self.stats())
+                elif command == "stop":
+                    send_message(conn, {"ok": True})
+                    self.stop()
+                    break
+                else:
+                    break
+        except (EOFError, OSError, ValueError):
+            pass
+        finally:
+            conn.close()
+            with self._lock:
+                self.clients -= 1
+                if not self.clients:
+                    self._has_clients.clear()
+
+    def capture_once(self):
+        ret, frame = self.source.read()
+        if not ret:
+            return False
+        timestamp = time.perf_counter()
+        handedness = None
+        if getattr(self.source, "provides_landmarks", False):
+            detected = hand_frames(self.source.read_landmarks())
+        else:
+            # Misma conversión que HandTracker: los landmarks quedan en
+            # coordenadas de la imagen volteada, como los espera el juego
+            if self._rgb is None or self._rgb.shape != frame.shape:
+                self._rgb = np.empty(frame.shape, dtype=np.uint8)
+                self._scratch = np.empty(frame.shape, dtype=np.uint8)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._scratch)
+            cv2.flip(self._scratch, 1, dst=self._rgb)
+            results = self.hands.process(self._rgb)
+            detected = hand_frames(results.multi_hand_landmarks)
+            if results.multi_handedness:
+                handedness = [hand.classification[0].label for hand in results.multi_handedness]
+        self.ring.write(timestamp, [hand.points for hand in detected], handedness, frame)
+        self.frames += 1
+        return True
+
+    def run(self):
+        self._listener = Listener(self.address)
+        if sys.platform != "win32":
+            os.chmod(self.address, 0o600)
+        threading.Thread(target=self._serve, name="tracker-control", daemon=True).start()
+        try:
+            while not self._stop.is_set() and not getattr(self.source, "finished", False):
+                if not self._has_clients.wait(0.1):
+                    continue
+                if not self.capture_once():
+                    if getattr(self.source, "finished", False) or not self.source.reopen():
+                        self._stop.wait(0.05)
+        finally:
+            self.close()
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        # accept() no se interrumpe al cerrar el socket: despertarlo con una conexión
+        try:
+            Client(self.address).close()
+        except OSError:
+            pass
+
+    def close(self):
+        self.stop()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        self.source.release()
+        self.ring.close()
+
+
+# Cliente del servicio con la interfaz de FrameSource: entrega la imagen original
+# de la cámara y, en read_landmarks(), las manos ya calculadas por el servicio.
+# read() espera hasta `timeout` segundos un frame nuevo; si el servicio se cae
+# devuelve False y reopen() vuelve a conectarse.
+class ServiceSource(FrameSource):
+    provides_landmarks = True
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=2.0, poll_interval=0.002):
+        super().__init__()
+        self.address = address
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.conn = None
+        self.ring = None
+        self._hands = []
+        self._handedness = None
+        self._frame = None
+        self.timestamp = None
+        self._connect()
+
+    def _connect(self):
+        try:
+            self.conn = Client(self.address)
+            send_message(self.conn, {"cmd": "hello"})
+            info = recv_message(self.conn)
+        except (OSError, EOFError, ValueError):
+            self.conn = None
+            return False
+        self.ring = LandmarkRing.attach(info["shm"], info["slots"], info["max_hands"], info["frame_shape"])
+        self._frame = np.empty(self.ring.frame_shape, dtype=np.uint8)
+        self.last_seq = self.ring.latest_seq
+        return True
+
+    def isOpened(self):
+        return self.ring is not None
+
+    def read(self):
+        if self.ring is None:
+            return False, None
+        deadline = time.perf_counter() + self.timeout
+        while time.perf_counter() < deadline:
+            seq = self.ring.latest_seq
+            if seq > self.last_seq:
+                data = self.ring.read(seq, self._frame)
+                if data is not None:
+                    self.last_seq = seq
+                    self.timestamp, landmarks, self._handedness, frame = data
+                    self._hands = [HandFrame(points) for points in landmarks]
+                    return True, frame
+            time.sleep(self.poll_interval)
+        return False, None
+
+    def read_landmarks(self):
+        return self._hands
+
+    def read_handedness(self):
+        return self._handedness
+
+    def stats(self):
+        send_message(self.conn, {"cmd": "stats"})
+        return recv_message(self.conn)
+
+    def release(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except OSError:
+                pass
+            self.conn = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def reopen(self):
+        self.release()
+        return self._connect()
+
+
+def load_model(max_hands):
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(max_num_hands=max_hands, min_detection_confidence=0.7,
+                                    min_tracking_confidence=0.5)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local de seguimiento de manos compartido")
+    parser.add_argument("--source", default="0",
+                        help="índice de cámara, archivo de video, carpeta de imágenes o sesión .lmk/.npz")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="socket de control")
+    parser.add_argument("--hands", type=int, default=2, help="manos máximas por frame")
+    parser.add_argument("--slots", type=int, default=8, help="frames guardados en el anillo")
+    parser.add_argument("--size", default="480x640", help="alto x ancho de la imagen publicada")
+    parser.add_argument("--loop", action="store_true", help="repetir la fuente al terminar")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    height, width = (int(value) for value in args.size.lower().split("x"))
+    source = open_source(args.source, loop=args.loop)
+    if not source.isOpened():
+        print("Error: No se pudo abrir la fuente")
+        return 1
+    if sys.platform != "win32":
+        if args.address == DEFAULT_ADDRESS:
+            private_dir(RUNTIME_DIR)
+        if not remove_stale_socket(args.address):
+            print(f"Error: {args.address} está en uso o no es un socket del servicio")
+            return 1
+    hands = None if getattr(source, "provides_landmarks", False) else load_model(args.hands)
+    service = TrackerService(source, hands, args.address, args.slots, args.hands, (height, width, 3))
+    print(f"Servicio de seguimiento en {args.address}")
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
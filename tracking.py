@@ -0,0 +1,370 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from profiler import FrameProfiler
+from landmarks import HandFrame, hand_frames
+
+
+# Resultado de una captura: frame RGB ya volteado, manos detectadas (HandFrame), su
+# lateralidad ("Left"/"Right", si el modelo la da), el instante
+# (time.perf_counter) en que se leyó de la cámara y, en las grabaciones, el
+# instante grabado del frame (source.read_time())
+class TrackedFrame:
+    __slots__ = ("seq", "timestamp", "frame", "landmarks", "handedness", "source_time")
+
+    def __init__(self, seq, timestamp, frame, landmarks, handedness=None, source_time=None):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.frame = frame
+        self.landmarks = landmarks
+        self.handedness = handedness
+        self.source_time = source_time
+
+
+# Buffer de un solo elemento: el hilo de captura reemplaza la referencia y el
+# bucle de juego siempre lee el último resultado publicado. La asignación de un
+# atributo es atómica en CPython, así que no hace falta ningún lock y ninguno de
+# los dos lados se bloquea esperando al otro.
+class LatestSlot:
+    def __init__(self):
+        self._item = None
+
+    def publish(self, item):
+        self._item = item
+
+    def latest(self):
+        return self._item
+
+
+# Hilo de captura + inferencia desacoplado del bucle de render. Con fuentes de
+# reproducción (source.replay) no se lanza el hilo: cada llamada a latest()
+# procesa exactamente un frame, así una sesión grabada se reproduce siempre igual.
+# Está pensado para vivir toda la sesión: pause() detiene la captura sin cerrar
+# la cámara (menús) y, si la cámara falla max_failures lecturas seguidas, se
+# vuelve a abrir con esperas crecientes desde retry_interval. interval limita
+# el ritmo de inferencia (segundos mínimos entre frames procesados; 0 sin límite).
+# draw, recorder y el modelo solo se cambian con la captura en pausa: pause()
+# espera a que termine el frame en curso, y el reinicio del modelo (reset())
+# lo aplica el propio hilo de captura antes de su siguiente frame.
+class HandTracker:
+    BUFFERS = 3
+
+    def __init__(self, source, hands, draw=None, recorder=None, profiler=None,
+                 max_failures=30, retry_interval=0.5, max_retry_interval=5.0, interval=0.0):
+        self.source = source
+        self.hands = hands
+        self.draw = draw
+        self.recorder = recorder
+        self.profiler = profiler or FrameProfiler(enabled=False)
+        self.max_failures = max_failures
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.interval = interval
+        self._last_capture = 0.0
+        self.synchronous = getattr(source, "replay", False)
+        self.slot = LatestSlot()
+        self.seq = 0
+        self.reopens = 0
+        # Buffers RGB preasignados en rotación: el bucle de juego puede seguir
+        # leyendo el frame publicado mientras se llena el siguiente
+        self._buffers = []
+        self._scratch = None
+        self._stop = threading.Event()
+        self._active = threading.Event()
+        self._active.set()
+        # Puesto mientras el hilo no está dentro de capture_once()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._reset_model = False
+        self._thread = None
+
+    @property
+    def finished(self):
+        return getattr(self.source, "finished", False)
+
+    def start(self):
+        if self._thread is None and not self.synchronous:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="hand-tracker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        self._active.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        self.source.release()
+
+    # Devuelve False si el frame en curso no terminó en `timeout` segundos
+    def pause(self, timeout=1.0):
+        self._active.clear()
+        if self._thread is None or self._thread is threading.current_thread():
+            return True
+        return self._idle.wait(timeout)
+
+    def resume(self):
+        self._active.set()
+
+    @property
+    def paused(self):
+        return not self._active.is_set()
+
+    # Al empezar un juego: descartar el último frame y el estado de seguimiento
+    # del modelo (la mano del juego anterior no debe arrastrarse al siguiente)
+    def reset(self):
+        self.slot.publish(None)
+        self._reset_model = True
+
+    def latest(self):
+        if self.synchronous and not self.finished and not self.paused:
+            self.capture_once()
+        return self.slot.latest()
+
+    def _next_buffer(self, shape):
+        if not self._buffers or self._buffers[0].shape != shape:
+            self._buffers = [np.empty(shape, dtype=np.uint8) for _ in range(self.BUFFERS)]
+            self._scratch = np.empty(shape, dtype=np.uint8)
+        self._buffers.append(self._buffers.pop(0))
+        return self._buffers[-1]
+
+    def capture_once(self):
+        profiler = self.profiler
+        recorder = self.recorder
+        if self._reset_model:
+            self._reset_model = False
+            reset_model = getattr(self.hands, "reset", None)
+            if reset_model:
+                reset_model()
+        with profiler.stage("capture"):
+            ret, frame = self.source.read()
+        if not ret:
+            return False
+        timestamp = time.perf_counter()
+        # Con un ritmo de inferencia limitado los frames intermedios se leen igual
+        # (para no quedarse con imágenes viejas en el buffer de la cámara) y se
+        # descartan; el margen evita saltarse uno por el jitter de la cámara
+        if self.interval and not self.synchronous:
+            if timestamp - self._last_capture < 0.9 * self.interval:
+                return True
+            self._last_capture = timestamp
+        # Una sola conversión de color; el mismo buffer RGB lo usan MediaPipe y
+        # la pantalla
+        with profiler.stage("convert"):
+            rgb = self._next_buffer(frame.shape)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._scratch)
+            cv2.flip(self._scratch, 1, dst=rgb)
+        handedness = None
+        if getattr(self.source, "provides_landmarks", False):
+            landmarks = hand_frames(self.source.read_landmarks())
+            read_handedness = getattr(self.source, "read_handedness", None)
+            handedness = read_handedness() if read_handedness else None
+        else:
+            # Solo lectura: MediaPipe puede usar el buffer sin copiarlo
+            rgb.flags.writeable = False
+            try:
+                with profiler.stage("hands.process"):
+                    results = self.hands.process(rgb)
+            finally:
+                rgb.flags.writeable = True
+            # Única conversión del protobuf: desde aquí todo son HandFrame
+            landmarks = hand_frames(results.multi_hand_landmarks)
+            if results.multi_handedness:
+                handedness = [hand.classification[0].label for hand in results.multi_handedness]
+        if recorder:
+            recorder.write(timestamp, landmarks[0] if landmarks else None)
+        if self.draw:
+            for hand_landmarks in landmarks:
+                self.draw(rgb, hand_landmarks)
+        read_time = getattr(self.source, "read_time", None)
+        self.seq += 1
+        self.slot.publish(TrackedFrame(self.seq, timestamp, rgb, landmarks, handedness,
+                                       read_time() if read_time else None))
+        return True
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set() and not self.finished:
+            # Se marca ocupado antes de mirar _active: si pause() llega después,
+            # espera a que termine este frame
+            self._idle.clear()
+            if not self._active.is_set():
+                self._idle.set()
+                self._active.wait()
+                continue
+            try:
+                captured = self.capture_once()
+            except cv2.error:
+                captured = False
+            except Exception as e:
+                # Un error del modelo o del grabador no debe matar el hilo: el
+                # juego se quedaría sin frames
+                if not failures:
+                    print(f"Aviso: error en el seguimiento de la mano ({e!r})")
+                captured = False
+            finally:
+                self._idle.set()
+            if captured:
+                failures = 0
+                continue
+            failures += 1
+            if failures < self.max_failures:
+                self._stop.wait(0.01)
+            elif self._reopen():
+                failures = 0
+
+    # Cierra y vuelve a abrir la fuente hasta que funcione (o hasta stop())
+    def _reopen(self):
+        delay = self.retry_interval
+        while not self._stop.is_set() and not self.finished:
+            if self.source.reopen():
+                self.reopens += 1
+                return True
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, self.max_retry_interval)
+        return False
+
+
+# Construye en otro hilo un objeto costoso de crear (el modelo de MediaPipe)
+# para que la ventana y los menús aparezcan sin esperarlo. get() solo bloquea
+# si la carga no terminó todavía; un error durante la carga se relanza ahí.
+class BackgroundLoader:
+    def __init__(self, factory, name="loader"):
+        self.factory = factory
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        if not self._thread.is_alive() and not self._done.is_set():
+            self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self._value = self.factory()
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def get(self):
+        self.start()
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class HandResults:
+    __slots__ = ("multi_hand_landmarks", "multi_handedness")
+
+    def __init__(self, multi_hand_landmarks, multi_handedness=None):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+
+
+# Envoltorio adaptativo sobre hands.process() con la misma interfaz:
+#  - recorta la imagen alrededor de la última caja de la mano (con margen) y la
+#    reduce a inference_size px antes de inferir;
+#  - si la mano está quieta infiere solo cada N frames (N limitado por
+#    latency_budget) y extrapola los landmarks con su velocidad en los demás;
+#  - sin mano visible, solo busca una vez cada idle_interval frames.
+class AdaptiveHands:
+    def __init__(self, hands, max_stride=4, latency_budget=0.1, idle_interval=5,
+                 inference_size=320, roi_margin=0.3, stable_speed=0.004):
+        self.hands = hands
+        self.max_stride = max_stride
+        self.latency_budget = latency_budget
+        self.idle_interval = idle_interval
+        self.inference_size = inference_size
+        self.roi_margin = roi_margin
+        self.stable_speed = stable_speed
+        self.frame_period = 1 / 30
+        self.inferences = 0
+        self.reset()
+
+    def reset(self):
+        self.last = None          # landmarks (manos, 21, 3) de la última inferencia
+        self.handedness = None
+        self.velocity = None      # desplazamiento por frame
+        self.roi = None           # (x0, y0, x1, y1) normalizado
+        self.frames_since = self.idle_interval - 1  # buscar la mano en el primer frame
+        self._last_call = None
+
+    def _stride(self):
+        if self.velocity is None or np.abs(self.velocity[..., :2]).max() > self.stable_speed:
+            return 1
+        budget_frames = int(self.latency_budget / self.frame_period)
+        return max(1, min(self.max_stride, budget_frames))
+
+    def process(self, rgb):
+        now = time.perf_counter()
+        if self._last_call is not None:
+            self.frame_period += 0.1 * (now - self._last_call - self.frame_period)
+        self._last_call = now
+        self.frames_since += 1
+        if self.last is None:
+            if self.frames_since < self.idle_interval:
+                return HandResults([])
+            return self._infer(rgb, None)
+        if self.frames_since < self._stride():
+            predicted = self.last + self.velocity * self.frames_since
+            return HandResults([HandFrame(points) for points in predicted], self.handedness)
+        roi = self.roi
+        results = self._infer(rgb, roi)
+        # _infer() borra el recorte si no encontró la mano
+        if not results.multi_hand_landmarks and roi is not None:
+            # La mano salió del recorte: buscar en el frame completo
+            results = self._infer(rgb, None)
+        return results
+
+    def _infer(self, rgb, roi):
+        h, w = rgb.shape[:2]
+        x0, y0, x1, y1 = 0, 0, w, h
+        if roi is not None:
+            x0, y0 = int(roi[0] * w), int(roi[1] * h)
+            x1, y1 = max(x0 + 1, int(roi[2] * w)), max(y0 + 1, int(roi[3] * h))
+        crop = rgb[y0:y1, x0:x1]
+        scale = self.inference_size / max(crop.shape[:2])
+        if scale < 1:
+            crop = cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))),
+                              interpolation=cv2.INTER_AREA)
+        else:
+            crop = np.ascontiguousarray(crop)
+        self.inferences += 1
+        results = self.hands.process(crop)
+        elapsed = self.frames_since
+        self.frames_since = 0
+        if not results.multi_hand_landmarks:
+            self.last = self.velocity = self.roi = None
+            return HandResults([])
+        points = np.stack([hand.points for hand in hand_frames(results.multi_hand_landmarks)])
+        # Volver a coordenadas normalizadas del frame completo
+        points[..., 0] = (points[..., 0] * (x1 - x0) + x0) / w
+        points[..., 1] = (points[..., 1] * (y1 - y0) + y0) / h
+        points[..., 2] *= (x1 - x0) / w
+        if self.last is not None and self.last.shape == points.shape and elapsed:
+            self.velocity = (points - self.last) / elapsed
+        else:
+            self.velocity = np.zeros_like(points)
+        self.last = points
+        self.handedness = results.multi_handedness
+        low = points[..., :2].reshape(-1, 2).min(axis=0)
+        high = points[..., :2].reshape(-1, 2).max(axis=0)
+        margin = (high - low).max() * self.roi_margin + 0.05
+        self.roi = (*np.clip(low - margin, 0, 1).tolist(), *np.clip(high + margin, 0, 1).tolist())
+        return HandResults([HandFrame(p) for p in points], self.handedness)
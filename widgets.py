@@ -0,0 +1,223 @@
+import time
+
+import pygame
+
+from fonts import render_text
+
+
+# Capa de interfaz en modo retenido para los menús. Cada widget guarda sus
+# superficies ya renderizadas (normal, hover, seleccionado) y solo se vuelve a
+# pintar cuando cambia su estado; Menu compone los widgets sobre un lienzo y
+# entrega a la pantalla únicamente los rectángulos que cambiaron.
+class Label:
+    clickable = False
+
+    def __init__(self, surface, center):
+        self.surface = surface
+        self.rect = surface.get_rect(center=center)
+        self.dirty = True
+
+    def draw(self, surface):
+        self.dirty = False
+        return surface.blit(self.surface, self.rect)
+
+
+class Button:
+    clickable = True
+
+    def __init__(self, rect, text, color, hover_color, on_click=None, text_color=(255, 255, 255),
+                 font_size=24, bold=False, border=2, radius=10, selected_color=None):
+        self.rect = pygame.Rect(rect)
+        self.text = text
+        self.color = color
+        self.hover_color = hover_color
+        self.selected_color = selected_color
+        self.text_color = text_color
+        self.font_size = font_size
+        self.bold = bold
+        self.border = border
+        self.radius = radius
+        self.on_click = on_click
+        self.hovered = False
+        self.selected = False
+        # Avance de la selección por permanencia del puntero de la mano (0-1)
+        self.progress = 0.0
+        self.dirty = True
+        self._surfaces = {}
+
+    def _set(self, name, value):
+        if getattr(self, name) != value:
+            setattr(self, name, value)
+            self.dirty = True
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self._surfaces.clear()
+            self.dirty = True
+
+    def set_hovered(self, hovered):
+        self._set("hovered", hovered)
+
+    def set_selected(self, selected):
+        self._set("selected", selected)
+
+    def set_progress(self, progress):
+        self._set("progress", progress)
+
+    def surface(self):
+        key = (self.hovered, self.selected)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            if self.hovered:
+                color = self.hover_color
+            elif self.selected and self.selected_color:
+                color = self.selected_color
+            else:
+                color = self.color
+            surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            area = surface.get_rect()
+            pygame.draw.rect(surface, color, area, border_radius=self.radius)
+            if self.border:
+                pygame.draw.rect(surface, (0, 0, 0), area, self.border, border_radius=self.radius)
+            text = render_text(self.text, self.font_size, self.text_color, self.bold)
+            surface.blit(text, text.get_rect(center=area.center))
+            self._surfaces[key] = surface
+        return surface
+
+    def draw(self, surface):
+        self.dirty = False
+        rect = surface.blit(self.surface(), self.rect)
+        if self.progress > 0:
+            bar = pygame.Rect(self.rect.x + 8, self.rect.bottom - 9, int((self.rect.width - 16) * self.progress), 5)
+            pygame.draw.rect(surface, self.text_color, bar, border_radius=2)
+        return rect
+
+
+# Árbol de widgets de una pantalla de menú. Los clics llegan por eventos: un
+# botón se activa al soltar el botón del mouse sobre el mismo widget en el que
+# se presionó, así un clic nunca se repite por mantenerlo apretado. point()
+# recibe el puntero de la mano: dejarlo dwell_time segundos sobre un botón
+# equivale a un clic, y no vuelve a dispararse hasta que el puntero salga.
+class Menu:
+    def __init__(self, size, background, dwell_time=1.5, cursor_color=(255, 255, 255)):
+        self.size = size
+        self.background = background
+        self.dwell_time = dwell_time
+        self.cursor_color = cursor_color
+        self.widgets = []
+        self.canvas = pygame.Surface(size)
+        self.full = True
+        self.hovered = None
+        self.pressed = None
+        self.pointer = None
+        self._cursor_rect = None
+        self._dwell_target = None
+        self._dwell_start = 0.0
+        self._dwell_armed = False
+
+    def add(self, widget):
+        self.widgets.append(widget)
+        self.full = True
+        return widget
+
+    def set_background(self, background):
+        if background != self.background:
+            self.background = background
+            self.full = True
+
+    def invalidate(self):
+        self.full = True
+
+    def widget_at(self, pos):
+        for widget in reversed(self.widgets):
+            if widget.clickable and widget.rect.collidepoint(pos):
+                return widget
+        return None
+
+    def _hover(self, widget):
+        if widget is not self.hovered:
+            if self.hovered is not None:
+                self.hovered.set_hovered(False)
+            if widget is not None:
+                widget.set_hovered(True)
+            self.hovered = widget
+
+    def _click(self, widget):
+        return widget.on_click() if widget.on_click else None
+
+    # Devuelve lo que devuelva on_click del botón activado, o None
+    def handle(self, event):
+        if event.type == pygame.MOUSEMOTION:
+            self._hover(self.widget_at(event.pos))
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.pressed = self.widget_at(event.pos)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            widget = self.widget_at(event.pos)
+            pressed, self.pressed = self.pressed, None
+            if widget is not None and widget is pressed:
+                return self._click(widget)
+        return None
+
+    # pos: posición en pantalla del puntero de la mano, o None sin mano
+    def point(self, pos, now=None):
+        now = time.perf_counter() if now is None else now
+        if pos != self.pointer:
+            self.pointer = pos
+        widget = self.widget_at(pos) if pos is not None else None
+        if widget is not self._dwell_target:
+            if self._dwell_target is not None:
+                self._dwell_target.set_progress(0.0)
+            self._dwell_target = widget
+            self._dwell_start = now
+            self._dwell_armed = True
+        if widget is None:
+            return None
+        self._hover(widget)
+        if not self._dwell_armed:
+            return None
+        progress = (now - self._dwell_start) / self.dwell_time
+        if progress < 1.0:
+            widget.set_progress(progress)
+            return None
+        self._dwell_armed = False
+        widget.set_progress(0.0)
+        return self._click(widget)
+
+    def _paint_background(self, rect):
+        if isinstance(self.background, pygame.Surface):
+            self.canvas.blit(self.background, rect, rect)
+        else:
+            self.canvas.fill(self.background, rect)
+
+    # Compone en el lienzo los widgets que cambiaron y copia a `surface` solo
+    # esas zonas (más el cursor de la mano). Devuelve los rectángulos tocados.
+    def draw(self, surface):
+        if self.full:
+            self._paint_background(self.canvas.get_rect())
+            for widget in self.widgets:
+                widget.draw(self.canvas)
+            dirty = [surface.blit(self.canvas, (0, 0))]
+        else:
+            dirty = []
+            for widget in self.widgets:
+                if widget.dirty:
+                    self._paint_background(widget.rect)
+                    widget.draw(self.canvas)
+                    dirty.append(widget.rect)
+            if self._cursor_rect is not None:
+                dirty.append(self._cursor_rect)
+            for rect in dirty:
+                surface.blit(self.canvas, rect, rect)
+        self._cursor_rect = None
+        if self.pointer is not None:
+            self._cursor_rect = pygame.draw.circle(surface, self.cursor_color, self.pointer, 14, 3)
+            dirty.append(self._cursor_rect)
+        return dirty
+
+    def present(self, surface, renderer):
+        if self.full:
+            renderer.invalidate()
+        renderer.mark("hud", self.draw(surface))
+        renderer.present()
+        self.full = False